@@ -0,0 +1,64 @@
+#!/usr/bin/env python
+
+"""
+Compare the speed of the matcher engines (see numerals/matchers.py):
+the regular expression and the token lookups, for growing ranges of
+numerals. The matches of both engines are checked to be the same.
+
+Usage (from the project root directory):
+
+    python benchmarks/bench_matchers.py [--lines=N] [--max=10,100,1000,10000] [--corpus=FILE]
+"""
+
+from __future__ import print_function
+
+import os, sys
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.realpath(__file__))),'numerals'))
+import argparse
+import timeit
+
+from bench_regex import sentences
+from corpus import open_corpus
+from languages import English
+from matchers import engines
+
+
+def benchmark(matcher, lines, repeat):
+    '''Time matching all lines with matcher.
+    Result: the best time (in seconds) of `repeat` runs.
+    '''
+    def run():
+        for line in lines:
+            for m in matcher.finditer(line):
+                pass
+    return min(timeit.repeat(run, number=1, repeat=repeat))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Matcher engine benchmark')
+    parser.add_argument("--lines", default = 5000, type = int,
+                        help = 'number of sentences to match')
+    parser.add_argument("--max", default = '10,100,1000,10000',
+                        help = 'comma separated list of maximal numerals')
+    parser.add_argument("--corpus", default = None, metavar = 'FILE',
+                        help = 'match the first sentences of this corpus file '
+                        'instead of generated ones')
+    parser.add_argument("--repeat", default = 3, type = int,
+                        help = 'number of repetitions (the best one is reported)')
+    args = parser.parse_args()
+
+    if args.corpus:
+        with open_corpus(args.corpus) as f:
+            lines = [line for _, line in zip(range(args.lines), f)]
+    else:
+        lines = sentences(args.lines)
+    print("{:>8} {:>13} {:>14} {:>8} {:>8}".format(
+        'max', 'regex lines/s', 'tokens lines/s', 'speedup', 'same'))
+    for max in [int(m) for m in args.max.split(',')]:
+        language = English()
+        language.precompile_regex(1, max)
+        regex, tokens = engines['regex'](language), engines['tokens'](language)
+        same = all(list(regex.finditer(line)) == list(tokens.finditer(line)) for line in lines)
+        row = [len(lines) / benchmark(matcher, lines, args.repeat) for matcher in (regex, tokens)]
+        print("{:>8} {:>13.0f} {:>14.0f} {:>7.1f}x {:>8}".format(
+            max, row[0], row[1], row[1] / row[0], 'yes' if same else 'NO'))
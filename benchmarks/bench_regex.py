@@ -0,0 +1,75 @@
+#!/usr/bin/env python
+
+"""
+Compare the speed of the flat number word alternation with the
+trie-compiled regular expression for growing ranges of numerals.
+
+Usage (from the project root directory):
+
+    python benchmarks/bench_regex.py [--lines=N] [--max=10,100,1000,10000]
+"""
+
+from __future__ import print_function
+
+import os, sys
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.realpath(__file__))),'numerals'))
+import argparse
+import random
+import timeit
+
+from languages import English
+
+WORDS = ['the', 'people', 'said', 'that', 'about', 'over', 'years', 'and',
+         'dollars', 'in', 'some', 'of', 'percent', 'company', 'more than']
+
+
+def sentences(count, seed=0):
+    '''Generate simple sentences, every fourth one containing a numeral.
+    '''
+    rand = random.Random(seed)
+    result = []
+    for i in range(count):
+        words = [rand.choice(WORDS) for _ in range(rand.randint(8, 25))]
+        if i % 4 == 0:
+            words.insert(rand.randrange(len(words)), rand.choice(
+                [str(rand.randint(1, 2000)), 'twenty-one', 'five', 'one hundred']))
+        result.append(' '.join(words))
+    return result
+
+
+def benchmark(language, lines, repeat):
+    '''Time matching all lines with the complex regex of language.
+    Result: the best time (in seconds) of `repeat` runs.
+    '''
+    regex = language._complex_regex
+    def run():
+        for line in lines:
+            for m in regex.finditer(line):
+                pass
+    return min(timeit.repeat(run, number=1, repeat=repeat))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Number word regex benchmark')
+    parser.add_argument("--lines", default = 5000, type = int,
+                        help = 'number of sentences to match')
+    parser.add_argument("--max", default = '10,100,1000,10000',
+                        help = 'comma separated list of maximal numerals')
+    parser.add_argument("--repeat", default = 3, type = int,
+                        help = 'number of repetitions (the best one is reported)')
+    args = parser.parse_args()
+
+    lines = sentences(args.lines)
+    print("{:>8} {:>12} {:>12} {:>12} {:>12} {:>8}".format(
+        'max', 'flat compile', 'flat lines/s', 'trie compile', 'trie lines/s', 'speedup'))
+    for max in [int(m) for m in args.max.split(',')]:
+        row = [max]
+        for trie in (False, True):
+            language = English()
+            language._use_trie_flag = trie
+            start = timeit.default_timer()
+            language.precompile_regex(1, max)
+            row.append(timeit.default_timer() - start)
+            row.append(len(lines) / benchmark(language, lines, args.repeat))
+        print("{:>8} {:>11.3f}s {:>12.0f} {:>11.3f}s {:>12.0f} {:>7.1f}x".format(
+            *(row + [row[4] / row[2]])))
@@ -0,0 +1,244 @@
+#!/usr/bin/env python
+
+"""
+Measure the throughput of the main processing steps on synthetic
+corpora (see synthetic.py) and record the results as JSON, so that
+they can be compared between commits.
+
+The following cases are measured for every value of --max:
+
+    compile   Language.precompile_regex()
+    match     Language.match_expression() on --lines sentences
+    category  the unit category lookup (Language.unit_category())
+              and Language.is_in_category() (only with WordNet)
+    process   Processor.processFile() on a corpus file, for every
+              size given by --sizes
+
+Every case runs in a separate process to measure its peak memory
+usage (RSS). If WordNet is not available, the units of the synthetic
+corpora are entered into the unit index beforehand.
+
+Usage (from the project root directory):
+
+    python benchmarks/bench_suite.py [--sizes=10000,100000] [--max=100,1000]
+                                     [--output=FILE] [--compare=FILE]
+"""
+
+from __future__ import print_function
+
+import os, sys
+BENCHMARKS = os.path.dirname(os.path.realpath(__file__))
+sys.path.append(os.path.join(os.path.dirname(BENCHMARKS), 'numerals'))
+import io
+import json
+import shutil
+import platform
+import argparse
+import datetime
+import tempfile
+import subprocess
+import timeit
+
+try:
+    import resource
+except ImportError: # Windows
+    resource = None
+
+import synthetic
+
+
+def peak_rss():
+    '''The peak resident set size of this process (in KiB), None
+    if it can not be determined.
+    '''
+    if resource is None:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss // 1024 if sys.platform == 'darwin' else rss
+
+
+def commit():
+    '''The current git commit (None if not in a git repository).
+    '''
+    try:
+        return subprocess.check_output(['git', 'rev-parse', 'HEAD'], cwd=BENCHMARKS,
+                                       stderr=subprocess.STDOUT).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def language(max):
+    '''Create an English language object for the range 1 to max.
+    '''
+    from languages import English
+    english = English()
+    if english.wn is None:
+        english.unit_index.update(synthetic.unit_items())
+    english.precompile_regex(1, max)
+    return english
+
+
+def run_case(case):
+    '''Run a single benchmark case (in this process).
+
+    Arguments
+    ---------
+    case : dict
+        The case: its 'name', 'max' and further parameters.
+
+    Result
+    ------
+    dict
+        The case together with the measured 'seconds' (and further
+        figures, depending on the case).
+    '''
+    result = dict(case)
+    if case['name'] == 'compile':
+        from languages import English
+        english = English()
+        start = timeit.default_timer()
+        english.precompile_regex(1, case['max'])
+        result['seconds'] = timeit.default_timer() - start
+
+    elif case['name'] == 'match':
+        english = language(case['max'])
+        lines = list(synthetic.sentences(case['lines'], seed=case['seed']))
+        start = timeit.default_timer()
+        for line in lines:
+            english.match_expression(line)
+        result['seconds'] = timeit.default_timer() - start
+        result['lines_per_sec'] = len(lines) / result['seconds']
+
+    elif case['name'] == 'category':
+        english = language(case['max'])
+        units = [unit for unit, _ in synthetic.unit_items()] * 100
+        start = timeit.default_timer()
+        for unit in units:
+            english.unit_category(unit)
+        result['seconds'] = timeit.default_timer() - start
+        result['lookups_per_sec'] = len(units) / result['seconds']
+        if english.wn is not None:
+            start = timeit.default_timer()
+            for unit, _ in synthetic.unit_items():
+                english.is_in_category(unit, 'organism')
+            result['is_in_category_per_sec'] = \
+                len(synthetic.unit_items()) / (timeit.default_timer() - start)
+
+    elif case['name'] == 'process':
+        from processor import Processor
+        directory = tempfile.mkdtemp()
+        try:
+            english = language(case['max'])
+            processor = Processor(english, 1, case['max'],
+                                  match_directory=os.path.join(directory, 'stats'))
+            processor.verbosity = 0
+            processor._show_progress_flag = False
+            with io.open(case['corpus'], 'r', encoding='utf8') as lines:
+                start = timeit.default_timer()
+                processor.processFile(lines)
+                processor.close()
+                result['seconds'] = timeit.default_timer() - start
+            result['lines_per_sec'] = case['lines'] / result['seconds']
+        finally:
+            shutil.rmtree(directory)
+        del result['corpus']
+
+    else:
+        raise ValueError('unknown case "{}"'.format(case['name']))
+
+    result['peak_rss_kb'] = peak_rss()
+    return result
+
+
+def run_isolated(case):
+    '''Run a benchmark case in a separate process.
+    '''
+    output = subprocess.check_output([sys.executable, os.path.realpath(__file__),
+                                      '--case', json.dumps(case)])
+    return json.loads(output.decode().strip().splitlines()[-1])
+
+
+def case_key(case):
+    return tuple((key, case[key]) for key in ('name', 'max', 'lines') if key in case)
+
+
+def compare(old, new):
+    '''Print the speed of the cases of two benchmark runs.
+    '''
+    old_cases = {case_key(case): case for case in old['cases']}
+    print("{:<30} {:>12} {:>12} {:>8}".format('case', 'old', 'new', 'ratio'))
+    for case in new['cases']:
+        previous = old_cases.get(case_key(case))
+        if previous is None:
+            continue
+        name = ' '.join('{}={}'.format(*item) for item in case_key(case)[1:])
+        name = case['name'] + ' ' + name
+        print("{:<30} {:>11.3f}s {:>11.3f}s {:>7.2f}x".format(
+            name, previous['seconds'], case['seconds'],
+            previous['seconds'] / case['seconds']))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Numerals benchmark suite')
+    parser.add_argument("--sizes", default = '10000,100000',
+                        help = 'comma separated list of corpus sizes (lines)')
+    parser.add_argument("--max", default = '100,1000',
+                        help = 'comma separated list of maximal numerals')
+    parser.add_argument("--lines", default = 10000, type = int,
+                        help = 'number of sentences for the match case')
+    parser.add_argument("--seed", default = 0, type = int,
+                        help = 'seed for the synthetic corpora')
+    parser.add_argument("--output", default = None,
+                        help = 'file to write the results to (default: stdout)')
+    parser.add_argument("--compare", default = None, metavar = 'FILE',
+                        help = 'results of an earlier run to compare with')
+    parser.add_argument("--case", default = None,
+                        help = argparse.SUPPRESS) # run a single case (internal)
+    args = parser.parse_args()
+
+    if args.case:
+        print(json.dumps(run_case(json.loads(args.case))))
+        sys.exit(0)
+
+    from languages import English
+    maxes = [int(m) for m in args.max.split(',')]
+    sizes = [int(s) for s in args.sizes.split(',')]
+    directory = tempfile.mkdtemp()
+    cases = []
+    try:
+        for max in maxes:
+            cases.append({'name': 'compile', 'max': max})
+            cases.append({'name': 'match', 'max': max, 'lines': args.lines, 'seed': args.seed})
+            cases.append({'name': 'category', 'max': max})
+        for size in sizes:
+            corpus = os.path.join(directory, 'corpus-{}.txt'.format(size))
+            synthetic.write(corpus, size, seed=args.seed)
+            for max in maxes:
+                cases.append({'name': 'process', 'max': max, 'lines': size,
+                              'corpus': corpus})
+        results = []
+        for case in cases:
+            print('running', case['name'], 'max={}'.format(case['max']),
+                  'lines={}'.format(case.get('lines', '-')), file=sys.stderr)
+            results.append(run_isolated(case))
+    finally:
+        shutil.rmtree(directory)
+
+    report = {
+        'version': 1,
+        'commit': commit(),
+        'date': datetime.datetime.now().isoformat(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'wordnet': English.wn is not None,
+        'cases': results
+    }
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+    else:
+        print(json.dumps(report, indent=2))
+
+    if args.compare:
+        with open(args.compare) as f:
+            compare(json.load(f), report)
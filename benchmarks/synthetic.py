@@ -0,0 +1,143 @@
+#!/usr/bin/env python
+
+"""
+Generate synthetic corpora in the format of the Wortschatz sentence
+files (running_number-TAB-sentence), with a controlled density of
+numerals, mix of approximators and vocabulary of units.
+
+Usage (from the project root directory):
+
+    python benchmarks/synthetic.py [--lines=N] [--density=0.3] [--seed=0] FILE
+"""
+
+from __future__ import print_function
+
+import io
+import random
+import argparse
+
+
+'''Units by category (cf. Language.unit_categories). Units listed under
+None do not belong to any category, i.e. their matches are excluded.'''
+UNITS = {
+    'time_period': ['years', 'months', 'weeks', 'days', 'hours'],
+    'monetary_unit': ['dollars', 'euros', 'pounds', 'cents'],
+    'linear_unit': ['kilometres', 'miles', 'metres', 'feet'],
+    'organism': ['people', 'children', 'dogs', 'patients', 'players'],
+    'group': ['teams', 'families', 'companies'],
+    'location': ['countries', 'cities', 'villages'],
+    'transport': ['cars', 'trains', 'planes'],
+    'material': ['bricks', 'tonnes'],
+    None: ['percent', 'times', 'of', 'and', 'to', 'in']
+}
+
+
+'''Approximators by class, with the default share of numerals using them.'''
+APPROXIMATORS = {
+    'prec': ['exactly', 'precisely', 'to be precise'],
+    'impr': ['about', 'approximately', 'around', 'roughly', 'some'],
+    'asym': ['more than', 'nearly', 'over', 'up to', 'at least'],
+    'null': ['']
+}
+APPROXIMATOR_MIX = {'prec': 0.05, 'impr': 0.15, 'asym': 0.15, 'null': 0.65}
+
+
+NUMBER_WORDS = ['one', 'two', 'three', 'five', 'seven', 'ten', 'twelve',
+                'twenty', 'twenty-one', 'fifty', 'ninety-nine']
+
+
+FILLER = ['the', 'government', 'said', 'that', 'a', 'new', 'report', 'shows',
+          'for', 'with', 'on', 'last', 'year', 'it', 'was', 'has', 'been',
+          'after', 'before', 'their', 'which', 'according', 'officials', 'by']
+
+
+def _weighted(rand, weights):
+    total = sum(weights.values())
+    x = rand.random() * total
+    for key in sorted(weights):
+        x -= weights[key]
+        if x < 0:
+            return key
+    return key
+
+
+def sentences(lines, density=0.3, words=0.2, max=2000, approximators=None,
+              units=None, seed=0):
+    '''Generate synthetic sentences.
+
+    Arguments
+    ---------
+    lines : int
+        The number of sentences.
+    density : float
+        The share of sentences containing a numeral.
+    words : float
+        The share of numerals written as words.
+    max : int
+        The largest numeral written in digits.
+    approximators : dict
+        The share of numerals per approximator class (default:
+        APPROXIMATOR_MIX).
+    units : dict
+        The units by category (default: UNITS).
+    seed : int
+        The seed of the random number generator.
+
+    Result
+    ------
+    A generator yielding the sentences (without IDs and newlines).
+    '''
+    rand = random.Random(seed)
+    approximators = approximators or APPROXIMATOR_MIX
+    units = units or UNITS
+    categories = sorted(units, key=str)
+    for _ in range(lines):
+        sentence = [rand.choice(FILLER) for _ in range(rand.randint(6, 25))]
+        if rand.random() < density:
+            if rand.random() < words:
+                numeral = rand.choice(NUMBER_WORDS)
+            else:
+                # round numbers are more frequent
+                value = rand.randint(1, max)
+                numeral = str(value - value % 5 if rand.random() < 0.5 and value > 5 else value)
+            approximator = rand.choice(APPROXIMATORS[_weighted(rand, approximators)])
+            unit = rand.choice(units[rand.choice(categories)])
+            expression = ' '.join(w for w in (approximator, numeral, unit) if w)
+            sentence.insert(rand.randrange(len(sentence) + 1), expression)
+        yield ' '.join(sentence) + '.'
+
+
+def unit_items(units=None):
+    '''The units of the vocabulary with their categories (as used
+    by UnitIndex.update()).
+    '''
+    return [(unit, category) for category, words in (units or UNITS).items()
+            for unit in words]
+
+
+def write(path, lines, **kwargs):
+    '''Write a synthetic corpus file (see sentences() for the
+    arguments).
+    '''
+    with io.open(path, 'w', encoding='utf8') as f:
+        for number, sentence in enumerate(sentences(lines, **kwargs), 1):
+            f.write(u'{0}\t{1}\n'.format(number, sentence))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Synthetic corpus generator')
+    parser.add_argument("--lines", default = 100000, type = int,
+                        help = 'number of sentences')
+    parser.add_argument("--density", default = 0.3, type = float,
+                        help = 'share of sentences containing a numeral')
+    parser.add_argument("--words", default = 0.2, type = float,
+                        help = 'share of numerals written as words')
+    parser.add_argument("--max", default = 2000, type = int,
+                        help = 'largest numeral written in digits')
+    parser.add_argument("--seed", default = 0, type = int,
+                        help = 'seed of the random number generator')
+    parser.add_argument("file",
+                        help = 'the corpus file to write')
+    args = parser.parse_args()
+    write(args.file, args.lines, density=args.density, words=args.words,
+          max=args.max, seed=args.seed)
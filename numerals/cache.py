@@ -0,0 +1,341 @@
+"""
+Cache the Results of corpus files on disk.
+
+Corpus files are often processed again and again with the same
+configuration (e.g. while working on the analysis of the results).
+With a cache (see Processor.enableCache()), a file is split into
+chunks of complete lines (of about chunk_size bytes). The chunks end
+at lines chosen by their content (see chunks()), so that inserting,
+changing or deleting lines only changes the chunks around them, not
+all following ones. The Results and the match files of every chunk
+are stored in the cache, keyed by the hash of the chunk and a
+fingerprint of the configuration (the compiled regular expressions,
+the unit categories, the ranges, ..., see fingerprint()). When a file
+is processed again, only the chunks that are not in the cache (i.e.
+new or changed chunks) are processed, the Results of all other chunks
+are loaded from the cache.
+
+The cache is bounded in size: if it grows larger than its maximal
+size, the least recently used chunks are removed.
+"""
+
+from __future__ import print_function
+
+import io
+import os
+import sys
+import shutil
+import hashlib
+import tempfile
+import zlib
+
+import corpus
+import store
+
+
+'''The (average) size of the chunks (in bytes).'''
+chunk_size = 16 << 20
+
+'''The version of the cache. Entries of other versions are not used.'''
+version = 1
+
+'''The modules whose code determines the Results (cf. fingerprint()).'''
+_modules = ['languages', 'matches', 'results', 'units', 'trie', 'counter',
+            'output', 'processor']
+
+_code_fingerprint = None
+
+
+def code_fingerprint():
+    '''A fingerprint of the code that determines the Results.
+    '''
+    global _code_fingerprint
+    if _code_fingerprint is None:
+        digest = hashlib.sha1()
+        for name in _modules:
+            module = __import__(name)
+            path = os.path.splitext(module.__file__)[0] + '.py'
+            with io.open(path, 'rb') as f:
+                digest.update(f.read())
+        _code_fingerprint = digest.hexdigest()
+    return _code_fingerprint
+
+
+def fingerprint(processor):
+    '''A fingerprint of the configuration of a processor. The Results
+    (and match files) of a chunk are the same for all processors with
+    the same fingerprint.
+
+    Arguments
+    ---------
+    processor : Processor
+
+    Result
+    ------
+    str
+        The fingerprint (a hexadecimal SHA-1 digest).
+    '''
+    writer = processor.match_writer
+    parts = [str(version), code_fingerprint(), processor.language.fingerprint(),
+             repr(processor._ranges), repr((processor.n_low, processor.n_high)),
+             repr((processor.unit_capacity, processor.head, processor.sketch)),
+             repr(processor._prefilter_flag), repr((writer.enabled, writer.encoding))]
+    return hashlib.sha1(u'\n'.join(parts).encode('utf8')).hexdigest()
+
+
+def chunks(stream, size=None):
+    '''Split a binary stream into chunks of complete lines, at
+    boundaries defined by the content: a chunk ends after a line whose
+    hash (CRC-32) is below a threshold proportional to the length of
+    the line, i.e. about every `size` bytes. Whether a line ends a
+    chunk does not depend on its offset, so after inserting, changing
+    or deleting lines, the following chunks are the same as before
+    (once the first boundary after the change is reached). Chunks are
+    at least size/4 bytes long (unless at the end of the stream), and
+    are cut after at most 4*size bytes.
+
+    Arguments
+    ---------
+    stream : binary stream
+        The stream to split.
+    size : int
+        The average size of the chunks (default: chunk_size).
+
+    Result
+    ------
+    A generator yielding the chunks (bytes).
+    '''
+    size = size or chunk_size
+    low, high = size // 4, 4 * size
+    scale = float(1 << 32) / size
+    lines, length = [], 0
+    for line in stream:
+        lines.append(line)
+        length += len(line)
+        if length >= high or (length >= low and
+                              (zlib.crc32(line) & 0xffffffff) < len(line) * scale):
+            yield b''.join(lines)
+            lines, length = [], 0
+    if lines:
+        yield b''.join(lines)
+
+
+class ResultCache:
+    '''A cache of the Results (and match files) of chunks of corpus
+    files in a directory. Every entry is a subdirectory (named by the
+    key of the chunk) containing the Results (results.nres, cf.
+    store.py) and the match files of the chunk (matches/).
+    '''
+
+    '''The default maximal size of the cache (in bytes).'''
+    max_size = 1 << 30
+
+
+    def __init__(self, directory, max_size=None):
+        '''Create a new cache (or open an existing one).
+
+        Arguments
+        ---------
+        directory : str
+            The directory of the cache.
+        max_size : int
+            The maximal size of the cache (in bytes).
+        '''
+        self.directory = directory
+        if max_size is not None:
+            self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+
+
+    @staticmethod
+    def key(data, fingerprint):
+        '''The key of a chunk.
+
+        Arguments
+        ---------
+        data : bytes
+            The chunk.
+        fingerprint : str
+            The fingerprint of the configuration (see fingerprint()).
+        '''
+        digest = hashlib.sha1(data)
+        digest.update(fingerprint.encode('ascii'))
+        return digest.hexdigest()
+
+
+    def _entry(self, key):
+        return os.path.join(self.directory, key)
+
+
+    def get(self, key):
+        '''Look up a chunk.
+
+        Arguments
+        ---------
+        key : str
+            The key of the chunk.
+
+        Result
+        ------
+        (Results, str)
+            The Results of the chunk and the directory containing its
+            match files; None if the chunk is not in the cache.
+        '''
+        entry = self._entry(key)
+        try:
+            results, _ = store.load(os.path.join(entry, 'results.nres'))
+        except (IOError, OSError, ValueError):
+            self.misses += 1
+            return None
+        os.utime(entry, None) # recently used
+        self.hits += 1
+        return results, os.path.join(entry, 'matches')
+
+
+    def put(self, key, results, matches=None):
+        '''Add a chunk to the cache.
+
+        Arguments
+        ---------
+        key : str
+            The key of the chunk.
+        results : Results
+            The Results of the chunk.
+        matches : str
+            The directory containing the match files of the chunk (if
+            any). The files are moved to the cache.
+        '''
+        if not os.path.isdir(self.directory):
+            os.makedirs(self.directory)
+        # build the entry in a temporary directory, so that incomplete
+        # entries are never used
+        temporary = tempfile.mkdtemp(prefix='.tmp-', dir=self.directory)
+        try:
+            store.save(os.path.join(temporary, 'results.nres'), results, {'key': key})
+            if matches is not None and os.path.isdir(matches):
+                shutil.move(matches, os.path.join(temporary, 'matches'))
+            entry = self._entry(key)
+            if os.path.isdir(entry):
+                shutil.rmtree(entry)
+            os.rename(temporary, entry)
+        except BaseException:
+            shutil.rmtree(temporary, ignore_errors=True)
+            raise
+        self.evict()
+
+
+    def size(self):
+        '''The total size of all entries (in bytes).
+        '''
+        return sum(size for _, size, _ in self._entries())
+
+
+    def _entries(self):
+        '''The entries of the cache: (last use, size, directory).
+        '''
+        entries = []
+        if not os.path.isdir(self.directory):
+            return entries
+        for name in os.listdir(self.directory):
+            entry = self._entry(name)
+            if name.startswith('.') or not os.path.isdir(entry):
+                continue
+            size = 0
+            for root, _, files in os.walk(entry):
+                size += sum(os.path.getsize(os.path.join(root, f)) for f in files)
+            entries.append((os.path.getmtime(entry), size, entry))
+        return entries
+
+
+    def evict(self):
+        '''Remove the least recently used entries until the cache is
+        not larger than its maximal size.
+        '''
+        entries = sorted(self._entries())
+        total = sum(size for _, size, _ in entries)
+        for _, size, entry in entries:
+            if total <= self.max_size:
+                break
+            shutil.rmtree(entry, ignore_errors=True)
+            total -= size
+
+
+def process(processor, path, jobs=1):
+    '''Process a corpus file, using the cache of the processor.
+
+    The file is split into chunks. The Results and match files of
+    chunks found in the cache are used directly, all other chunks are
+    processed (with several worker processes if jobs > 1 and the file
+    is not compressed) and added to the cache.
+
+    Arguments
+    ---------
+    processor : Processor
+        The processor (with a cache, see Processor.enableCache()).
+    path : str
+        The name of the corpus file.
+    jobs : int
+        The number of worker processes.
+
+    Result
+    ------
+    Results
+        The Results of the whole file (the same as without cache).
+    '''
+    cache = processor.cache
+    writer = processor.match_writer
+    config = fingerprint(processor)
+    results = processor.newResults()
+    parallel = jobs > 1 and not corpus.is_compressed(path)
+    pending = [] # chunks to process in parallel: (start, end, key)
+
+    def process_pending():
+        if not pending:
+            return
+        import parallel as workers
+        keys = [key for _, _, key in pending]
+        def done(index, chunk_results, matches):
+            writer.append(matches, remove=False)
+            cache.put(keys[index], chunk_results, matches)
+        workers.process(processor, path, jobs, results=results,
+                        ranges=[(start, end) for start, end, _ in pending], done=done)
+        del pending[:]
+
+    offset = 0
+    with corpus.open_raw(path) as stream:
+        for data in chunks(stream):
+            start, offset = offset, offset + len(data)
+            key = cache.key(data, config)
+            entry = cache.get(key)
+            if entry is not None:
+                process_pending()
+                chunk_results, matches = entry
+                results.merge(chunk_results)
+                writer.append(matches, remove=False)
+            elif parallel:
+                pending.append((start, offset, key))
+            else:
+                # write the match files of the chunk to a directory of
+                # their own, to be stored in the cache
+                chunk_results = processor.newResults()
+                directory = writer.directory
+                writer.close()
+                writer.directory = matches = tempfile.mkdtemp(prefix='.chunk-')
+                try:
+                    lines = io.TextIOWrapper(io.BytesIO(data), encoding='utf8')
+                    processor.processLines(lines, chunk_results)
+                    writer.close()
+                    writer.directory = directory
+                    writer.append(matches, remove=False)
+                    cache.put(key, chunk_results, matches)
+                finally:
+                    writer.close()
+                    writer.directory = directory
+                    shutil.rmtree(matches, ignore_errors=True)
+                results.merge(chunk_results)
+    process_pending()
+    if processor.verbosity > 1:
+        print(" * {0} of {1} chunks were found in the cache".
+              format(cache.hits, cache.hits + cache.misses), file=sys.stderr)
+    return results
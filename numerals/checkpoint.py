@@ -0,0 +1,277 @@
+"""
+Save the state of long runs, so that they can be resumed.
+
+Processing a large corpus may take hours. With checkpoints enabled
+(see Processor.enableCheckpoints()), the state of a run is saved
+periodically: the Results of the current file so far, together with
+the position in the file up to which they have been counted, the
+overall counts of the Processor, the files already finished and the
+sizes of the match files. An interrupted run can then be resumed: the
+match files are cut back to their recorded sizes and processing
+continues at the recorded position, so that the final results (and
+match files) are the same as those of an uninterrupted run.
+
+Checkpoints are stored as gzip compressed JSON. Every checkpoint is
+written to a temporary file first, which then replaces the previous
+checkpoint, so that there always is a complete checkpoint.
+"""
+
+import io
+import os
+import gzip
+import json
+import shutil
+import timeit
+
+from counter import Counter
+from results import Results
+
+
+class Checkpoints:
+    '''The checkpoints of a run of a Processor.
+    '''
+
+    '''The version of the checkpoint format.'''
+    version = 2
+
+    '''The minimal time (in seconds) between two checkpoints.'''
+    interval = 300.0
+
+    '''The clock used to measure the interval.'''
+    clock = staticmethod(timeit.default_timer)
+
+
+    def __init__(self, path, interval=None):
+        '''Create new checkpoints.
+
+        Arguments
+        ---------
+        path : str
+            The file to store the checkpoints in.
+        interval : float
+            The minimal time (in seconds) between two checkpoints
+            (default: Checkpoints.interval).
+        '''
+        self.path = path
+        if interval is not None:
+            self.interval = interval
+        self.state = None    # the checkpoint to resume from (see load())
+        self.finished = []   # the corpus files finished
+        self._skip = []      # the files finished in the resumed run
+        self.corpus = None   # the corpus file being processed
+        self.reader = None   # the corpus.LineReader reading it (if any)
+        self._last = self.clock()
+
+
+    @staticmethod
+    def config(processor):
+        '''The configuration of a processor that has to be the same
+        to resume a run.
+        '''
+        return {'language': type(processor.language).__name__,
+                'range': list(processor._range),
+                'ranges': [list(r) for r in processor._ranges[1:]],
+                'n_range': [processor.n_low, processor.n_high],
+                'unit_capacity': processor.unit_capacity,
+                'head': processor.head, 'sketch': processor.sketch,
+                'prefilter': processor._prefilter_flag}
+
+
+    def start(self, path, reader=None):
+        '''Start processing a corpus file.
+
+        Arguments
+        ---------
+        path : str
+            The corpus file.
+        reader : corpus.LineReader
+            The reader providing the position in the file (None if
+            the position is passed to update()).
+        '''
+        self.corpus = path
+        self.reader = reader
+
+
+    def update(self, processor, results, offset=None):
+        '''Save a checkpoint if the interval has passed since the
+        last one.
+
+        Arguments
+        ---------
+        processor : Processor
+            The processor.
+        results : Results
+            The Results of the current file so far.
+        offset : int
+            The position in the corpus file up to which the results
+            have been counted (default: the offset of the reader).
+        '''
+        if self.clock() - self._last < self.interval:
+            return
+        if offset is None:
+            offset = self.reader.offset if self.reader is not None else None
+            if offset is None:
+                return # not at the end of a line of the file
+        self.save(processor, results, offset)
+
+
+    def finish(self, processor, results):
+        '''Finish processing the current corpus file and save a
+        checkpoint.
+
+        Arguments
+        ---------
+        processor : Processor
+            The processor (its overall counts must include the file).
+        results : Results
+            The Results of the file.
+        '''
+        self.finished.append(self.corpus)
+        self.reader = None
+        self.save(processor, results)
+
+
+    def skip(self, path):
+        '''Check whether a corpus file has been finished in the resumed
+        run, i.e. whether it should be skipped now. Every finished file
+        is skipped only once (the same file may be processed several
+        times in a run).
+        '''
+        if path in self._skip:
+            self._skip.remove(path)
+            return True
+        return False
+
+
+    def save(self, processor, results=None, offset=None):
+        '''Save a checkpoint.
+
+        Arguments
+        ---------
+        processor : Processor
+            The processor.
+        results : Results
+            The Results of the current (or the last finished) file.
+        offset : int
+            The position in the corpus file up to which the results
+            have been counted (None if the file is finished).
+        '''
+        writer = processor.match_writer
+        writer.flush()
+        sizes = {}
+        if writer.enabled and os.path.isdir(writer.directory):
+            for name in os.listdir(writer.directory):
+                if name.endswith('.txt'):
+                    sizes[name] = os.path.getsize(os.path.join(writer.directory, name))
+        state = {
+            'version': self.version,
+            'config': self.config(processor),
+            'finished': self.finished,
+            'counters': [counter.as_dict() for counter in processor._counters],
+            'total': processor.total.as_dict(),
+            'match_files': sizes,
+            'corpus': None
+        }
+        if results is not None:
+            for range_results in results.ranges:
+                range_results.lines = results.lines
+            state['corpus'] = {'path': self.corpus, 'size': os.path.getsize(self.corpus),
+                               'offset': offset, 'results': results.as_dict()}
+        temporary = self.path + '.tmp'
+        with gzip.open(temporary, 'wb') as f:
+            f.write(json.dumps(state).encode('utf8'))
+        # os.replace() also replaces existing files on Windows (Python 3)
+        getattr(os, 'replace', os.rename)(temporary, self.path)
+        self._last = self.clock()
+
+
+    def load(self, processor):
+        '''Load the last checkpoint to resume a run: the overall counts
+        of the processor are restored and the match files are cut back
+        to their size at the time of the checkpoint.
+
+        Arguments
+        ---------
+        processor : Processor
+            The processor of the resumed run. It has to use the same
+            configuration as the interrupted run.
+
+        Raises
+        ------
+        IOError
+            The checkpoint could not be read.
+        ValueError
+            The checkpoint is invalid or the configuration differs.
+        '''
+        with gzip.open(self.path, 'rb') as f:
+            state = json.loads(f.read().decode('utf8'))
+        if state.get('version') != self.version:
+            raise ValueError('unsupported checkpoint version {}'.format(state.get('version')))
+        if state['config'] != self.config(processor):
+            raise ValueError('the checkpoint was made with a different configuration ({})'.
+                             format(state['config']))
+        processor._counters = [Counter.from_dict(counts) for counts in state['counters']]
+        processor._counter = processor._counters[0]
+        processor.total = Results.from_dict(state['total'])
+        processor.corpora = list(state['finished'])
+
+        writer = processor.match_writer
+        if writer.enabled and os.path.isdir(writer.directory):
+            writer.close()
+            for name in os.listdir(writer.directory):
+                path = os.path.join(writer.directory, name)
+                if name.startswith('.shard-'):
+                    # left behind by worker processes (see parallel.py)
+                    shutil.rmtree(path, ignore_errors=True)
+                elif name.endswith('.txt'):
+                    with io.open(path, 'r+b') as f:
+                        f.truncate(state['match_files'].get(name, 0))
+        self.finished = list(state['finished'])
+        self._skip = list(state['finished'])
+        self.state = state
+
+
+    def resume(self, path):
+        '''The state of a corpus file to resume processing with.
+
+        Arguments
+        ---------
+        path : str
+            The corpus file.
+
+        Result
+        ------
+        (Results, int)
+            The Results counted so far and the position in the file
+            to continue at; (None, 0) if the file has not been
+            started before.
+
+        Raises
+        ------
+        ValueError
+            The file has changed since the checkpoint.
+        '''
+        corpus = self.state and self.state['corpus']
+        if not corpus or corpus['path'] != path or corpus['offset'] is None:
+            return None, 0
+        if os.path.getsize(path) != corpus['size']:
+            raise ValueError('"{}" has changed since the checkpoint'.format(path))
+        self.state['corpus'] = None # resume only once
+        return Results.from_dict(corpus['results']), corpus['offset']
+
+
+    def last_results(self, path):
+        '''The Results of a corpus file finished before (None if they
+        are not available, i.e. another file was finished later).
+        '''
+        corpus = self.state and self.state['corpus']
+        if corpus and corpus['path'] == path and corpus['offset'] is None:
+            return Results.from_dict(corpus['results'])
+        return None
+
+
+    def remove(self):
+        '''Remove the checkpoint file (e.g. after the run is complete).
+        '''
+        if os.path.exists(self.path):
+            os.remove(self.path)
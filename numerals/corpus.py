@@ -0,0 +1,472 @@
+"""
+Open corpus files for reading.
+
+Corpus files may be plain text files or compressed with gzip (.gz),
+bzip2 (.bz2) or xz (.xz). Wortschatz archives (.tar.gz, .tgz, ...)
+can be read directly: the sentences file ("*-sentences.txt") inside
+the archive is streamed without unpacking the archive to disk. The
+word frequency list ("*-words.txt") can be opened in the same way
+(see open_wordlist()).
+
+Compressed data are decompressed in large blocks on a separate thread,
+so that decompression overlaps with the processing of the text (the
+decompressors release the global interpreter lock while working).
+
+Uncompressed files can also be mapped into memory (see MappedCorpus).
+Lines and sentence IDs are then found on the raw bytes and only the
+sentences themselves are decoded.
+"""
+
+import io
+import os
+import re
+import bz2
+import mmap
+import gzip
+import tarfile
+import threading
+
+try:
+    import queue
+except ImportError: # Python 2
+    import Queue as queue
+
+try:
+    import lzma
+except ImportError: # Python 2 without backports.lzma
+    lzma = None
+
+
+'''The size of the blocks read from (compressed) corpus files.'''
+block_size = 1 << 20
+
+
+'''The suffix of the sentences file in Wortschatz corpora.'''
+sentences_suffix = '-sentences.txt'
+
+
+'''The suffix of the word frequency list in Wortschatz corpora.'''
+words_suffix = '-words.txt'
+
+
+_archive_suffixes = ('.tar', '.tar.gz', '.tgz', '.tar.bz2', '.tbz2', '.tar.xz', '.txz')
+
+
+def _open_xz(path):
+    if lzma is None:
+        raise IOError('no lzma support to read "{}"'.format(path))
+    return lzma.open(path, 'rb')
+
+
+_decompressors = {
+    '.gz': lambda path: gzip.open(path, 'rb'),
+    '.bz2': lambda path: bz2.BZ2File(path, 'rb'),
+    '.xz': _open_xz
+}
+
+
+def is_archive(path):
+    '''Check whether a file is a (Wortschatz) tar archive.
+    '''
+    return path.endswith(_archive_suffixes)
+
+
+def is_compressed(path):
+    '''Check whether a corpus file has to be decompressed (or extracted
+    from an archive) for reading. Such files can only be read
+    sequentially.
+    '''
+    return is_archive(path) or os.path.splitext(path)[1] in _decompressors
+
+
+def resolve(name):
+    '''Find the corpus file for a name given on the command line.
+
+    The name may be the path of a file or a directory containing a
+    Wortschatz corpus ("eng_news_2015_1M/eng_news_2015_1M-sentences.txt").
+    If there is no such file, the name is looked up in the directory
+    given by the environment variable WORTSCHATZ_ROOT. Instead of
+    an unpacked corpus directory, a Wortschatz archive (the name
+    with suffix ".tar.gz" etc.) may be used.
+
+    Arguments
+    ---------
+    name : str
+        The name of the corpus.
+
+    Result
+    ------
+    str
+        The path to the corpus file (or archive).
+
+    Raises
+    ------
+    IOError
+        No corpus file for that name could be found.
+    '''
+    candidates = [name] + [name + suffix for suffix in _archive_suffixes]
+    if 'WORTSCHATZ_ROOT' in os.environ:
+        root = os.environ['WORTSCHATZ_ROOT']
+        candidates += [os.path.join(root, candidate) for candidate in candidates]
+    for path in candidates:
+        if os.path.isfile(path):
+            return path
+        if os.path.isdir(path):
+            guess = os.path.join(path, os.path.basename(os.path.normpath(path)) +
+                                 sentences_suffix)
+            if os.path.isfile(guess):
+                return guess
+            raise IOError('directory "{}" does not contain a valid file'.format(path))
+    raise IOError('no file called "{}"'.format(name))
+
+
+class BlockReader(io.RawIOBase):
+    '''A raw stream reading another (binary) stream in large blocks on
+    a separate thread. Up to `prefetch` blocks are read ahead.
+    '''
+
+    def __init__(self, stream, size=None, prefetch=4, closing=()):
+        '''Create a new BlockReader and start reading.
+
+        Arguments
+        ---------
+        stream : binary stream
+            The stream to read from.
+        size : int
+            The size of the blocks (default: block_size).
+        prefetch : int
+            The maximal number of blocks to read ahead.
+        closing : list
+            Further objects to close when this stream is closed
+            (e.g. the archive containing the stream).
+        '''
+        self._stream = stream
+        self._size = size or block_size
+        self._closing = closing
+        self._blocks = queue.Queue(prefetch)
+        self._block = memoryview(b'')
+        self._stopped = False
+        self._thread = threading.Thread(target=self._read)
+        self._thread.daemon = True
+        self._thread.start()
+
+
+    def _read(self):
+        '''Read the blocks (this runs on a separate thread). The end
+        of the stream is marked by an empty block, errors are passed
+        on to the reading thread.
+        '''
+        try:
+            while not self._stopped:
+                block = self._stream.read(self._size)
+                self._blocks.put(block)
+                if not block:
+                    break
+        except Exception as e:
+            self._blocks.put(e)
+
+
+    def readable(self):
+        return True
+
+
+    def readinto(self, b):
+        while not self._block:
+            if self._block is None:
+                return 0 # end of stream
+            block = self._blocks.get()
+            if isinstance(block, Exception):
+                raise block
+            self._block = memoryview(block) if block else None
+        n = min(len(b), len(self._block))
+        b[:n] = self._block[:n]
+        self._block = self._block[n:]
+        return n
+
+
+    def close(self):
+        if self.closed:
+            return
+        self._stopped = True
+        # unblock the reading thread and wait for it to finish
+        while self._thread.is_alive():
+            try:
+                self._blocks.get(timeout=0.1)
+            except queue.Empty:
+                pass
+        self._stream.close()
+        for resource in self._closing:
+            resource.close()
+        super(BlockReader, self).close()
+
+
+def _open_archive(path, suffix=sentences_suffix):
+    '''Open the sentences file (or another file with the given
+    suffix) in a (Wortschatz) tar archive.
+
+    Result
+    ------
+    (binary stream, TarFile)
+    '''
+    archive = tarfile.open(path, 'r|*')
+    for member in archive:
+        if member.isfile() and member.name.endswith(suffix):
+            return archive.extractfile(member), archive
+    archive.close()
+    raise IOError('archive "{}" does not contain a file "*{}"'.format(path, suffix))
+
+
+def open_raw(path):
+    '''Open a corpus file for reading (as binary stream). Compressed
+    files are decompressed on the fly, for archives the sentences
+    file is read.
+
+    Arguments
+    ---------
+    path : str
+        The path of the corpus file.
+
+    Result
+    ------
+    A buffered binary stream.
+    '''
+    if not is_compressed(path):
+        return io.open(path, 'rb', buffering=block_size)
+    if is_archive(path):
+        stream, archive = _open_archive(path)
+        raw = BlockReader(stream, closing=(archive,))
+    else:
+        raw = BlockReader(_decompressors[os.path.splitext(path)[1]](path))
+    return io.BufferedReader(raw, block_size)
+
+
+def open_corpus(path, encoding='utf8'):
+    '''Open a corpus file for reading (as text stream). Compressed
+    files are decompressed on the fly, for archives the sentences
+    file is read.
+
+    Arguments
+    ---------
+    path : str
+        The path of the corpus file.
+    encoding : str
+        The encoding of the text.
+
+    Result
+    ------
+    A text stream.
+    '''
+    if not is_compressed(path):
+        return io.open(path, 'r', encoding=encoding, buffering=block_size)
+    return io.TextIOWrapper(open_raw(path), encoding=encoding)
+
+
+def open_wordlist(path, encoding='utf8'):
+    '''Open the word frequency list ("*-words.txt") of a Wortschatz
+    corpus for reading (as text stream).
+
+    Arguments
+    ---------
+    path : str
+        The path of the corpus file (cf. resolve()): the sentences
+        file, next to which the word list is looked for, an archive
+        containing the word list, or the word list itself.
+    encoding : str
+        The encoding of the text.
+
+    Result
+    ------
+    A text stream.
+
+    Raises
+    ------
+    IOError
+        There is no word list for the corpus.
+    '''
+    if is_archive(path):
+        stream, archive = _open_archive(path, words_suffix)
+        raw = BlockReader(stream, closing=(archive,))
+        return io.TextIOWrapper(io.BufferedReader(raw, block_size), encoding=encoding)
+    name, extension = path, ''
+    if os.path.splitext(path)[1] in _decompressors:
+        name, extension = os.path.splitext(path)
+    if name.endswith(sentences_suffix):
+        name = name[:-len(sentences_suffix)] + words_suffix
+    if not name.endswith(words_suffix):
+        raise IOError('"{}" is not a Wortschatz corpus file'.format(path))
+    for candidate in (name + extension, name):
+        if os.path.isfile(candidate):
+            return open_corpus(candidate, encoding)
+    raise IOError('no word list "{}" for "{}"'.format(name, path))
+
+
+class LineReader:
+    '''Read the lines of a corpus file, keeping track of their position
+    in the (decompressed) file, so that reading can be continued at
+    that position later (see checkpoint.py).
+
+    The lines are the same as when reading the file in text mode
+    ("\r\n" and a single "\r" end a line as well and are translated
+    to "\n"). The encoding has to be ASCII compatible (like UTF-8).
+    '''
+
+    def __init__(self, path, start=0, encoding='utf8'):
+        '''Open a corpus file.
+
+        Arguments
+        ---------
+        path : str
+            The path of the corpus file (compressed files and
+            archives are read as in open_corpus()).
+        start : int
+            The position to start reading at (an offset obtained from
+            a previous LineReader). Compressed files are read up to
+            this position and the data are discarded.
+        encoding : str
+            The encoding of the text.
+        '''
+        self.path = path
+        self.encoding = encoding
+        self._stream = open_raw(path)
+        if not is_compressed(path):
+            self._stream.seek(start)
+        else:
+            position = 0
+            while position < start:
+                data = self._stream.read(min(block_size, start - position))
+                if not data:
+                    break
+                position += len(data)
+        # the position after the last line read, None if that line
+        # did not end a line of the file (but a single "\r" did)
+        self.offset = start
+
+
+    def __enter__(self):
+        return self
+
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+    def __iter__(self):
+        encoding = self.encoding
+        offset = self.offset
+        for raw in self._stream:
+            offset += len(raw)
+            line = raw.decode(encoding)
+            if '\r' in line:
+                parts = line.replace('\r\n', '\n').replace('\r', '\n').split('\n')
+                last = parts.pop()
+                lines = [part + '\n' for part in parts] + ([last] if last else [])
+                self.offset = None
+                for part in lines[:-1]:
+                    yield part
+                line = lines[-1]
+            self.offset = offset
+            yield line
+
+
+    def close(self):
+        '''Close the file.
+        '''
+        self._stream.close()
+
+
+class MappedCorpus:
+    '''A corpus file mapped into memory. The mapping can be shared by
+    several processes (worker processes forked after the mapping has
+    been created use the same memory).
+
+    Lines are separated by "\\n" (in contrast to reading a file in
+    text mode, a single "\\r" does not end a line). The encoding
+    has to be ASCII compatible (like UTF-8).
+    '''
+
+    # A line: the sentence ID (up to the first tabulator, if any),
+    # the sentence (up to the next tabulator, if any), the rest.
+    _line_regex = re.compile(br'(?:[^\t\n]*\t)?([^\t\n]*)[^\n]*\n')
+    _last_line_regex = re.compile(br'(?:[^\t\n]*\t)?([^\t\n]*)')
+
+
+    def __init__(self, path, encoding='utf8'):
+        '''Map a corpus file into memory.
+
+        Arguments
+        ---------
+        path : str
+            The path of the (uncompressed) corpus file.
+        encoding : str
+            The encoding of the text.
+        '''
+        self.path = path
+        self.encoding = encoding
+        with io.open(path, 'rb') as f:
+            self.size = os.fstat(f.fileno()).st_size
+            # empty files can not be mapped
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) \
+                if self.size > 0 else None
+        if self._map is not None and hasattr(self._map, 'madvise'):
+            self._map.madvise(mmap.MADV_SEQUENTIAL)
+
+
+    def __enter__(self):
+        return self
+
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+    def sentences(self, start=0, end=None):
+        '''Iterate over the sentences of the corpus (or a byte range of
+        it). Wortschatz sentence IDs are removed: if a line contains a
+        tabulator, only the text between the first and the second
+        tabulator is used (like line.split("\\t")[1]).
+
+        The lines are split on the raw bytes (in blocks of block_size)
+        and only the sentences are decoded.
+
+        Arguments
+        ---------
+        start, end : int
+            The byte range to read (default: the whole file). It has to
+            start at the beginning of a line and end after a line.
+
+        Result
+        ------
+        A generator yielding the sentences (str, without
+        the line terminator).
+        '''
+        if self._map is None:
+            return
+        data = self._map
+        encoding = self.encoding
+        findall = self._line_regex.findall
+        end = self.size if end is None else end
+        position = start
+        while position < end:
+            # a block of complete lines
+            stop = min(position + block_size, end)
+            if stop < end:
+                eol = data.rfind(b'\n', position, stop)
+                if eol < 0:
+                    eol = data.find(b'\n', stop, end)
+                stop = end if eol < 0 else eol + 1
+            for sentence in findall(data, position, stop):
+                yield sentence.decode(encoding)
+            if stop == end and data[end-1:end] != b'\n':
+                # the last line is not terminated
+                eol = data.rfind(b'\n', position, end)
+                last = position if eol < 0 else eol + 1
+                yield self._last_line_regex.match(data, last, end).group(1).decode(encoding)
+            position = stop
+
+
+    def close(self):
+        '''Unmap the file.
+        '''
+        if self._map is not None:
+            self._map.close()
+            self._map = None
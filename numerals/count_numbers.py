@@ -12,9 +12,12 @@ from __future__ import print_function
 
 import os
 import sys
+import json
 import locale
 import argparse
 
+import corpus
+import store
 from languages import Language
 from processor import Processor
 
@@ -22,22 +25,211 @@ locale.setlocale(locale.LC_ALL, '')
 
 __version__ = '0.1'
 
+
+def merge(arguments):
+    '''The merge subcommand: add up the Results of several results
+    files (see store.py), report them and optionally save the sum.
+
+    Arguments
+    ---------
+    arguments : list of str
+        The command line arguments (after "merge").
+    '''
+    parser = argparse.ArgumentParser(prog='count_numbers.py merge',
+                                     description='Merge results files of count_numbers.py')
+    parser.add_argument("-o", "--output", default = None, metavar = 'FILE',
+                        help = 'file to save the merged results to')
+    parser.add_argument("file", nargs='+',
+                        help = 'the results files to merge')
+    args = parser.parse_args(arguments)
+
+    try:
+        results, metadata = store.merge(args.file)
+    except (IOError, ValueError) as e:
+        print("error: {}".format(e), file=sys.stderr)
+        sys.exit(1)
+    print("Merged {0} results files ({1} corpus files, {2} lines)".
+          format(len(args.file), len(metadata.get('corpora', [])),
+                 locale.format("%d", results.lines, grouping=True)))
+    n_low, n_high = metadata['n_range']
+    wordlist = metadata.get('source') == 'wordlist'
+    Processor.reportStatistics(results, n_low, n_high, results.counter, wordlist=wordlist)
+    for (low, high), range_results in zip(metadata['ranges'], results.ranges):
+        print("Range {0}-{1}:".format(low, high))
+        Processor.reportStatistics(range_results, low, high, range_results.counter,
+                                   wordlist=wordlist)
+    if args.output:
+        store.save(args.output, results, metadata)
+
+
+def add_plot_arguments(parser):
+    '''Add the options for exporting plots to a parser.
+    '''
+    parser.add_argument("--plot-format", default = 'png', metavar = 'FORMAT',
+                        help = 'format of the exported plots (png, svg, pdf, ...)')
+    parser.add_argument("--bins", default = None, type = int, metavar = 'N',
+                        help = 'number of bins of plots of wide ranges '
+                        '(default: one bar per value for up to 1000 values)')
+    parser.add_argument("--log", action="store_true",
+                        help = 'plot bins of growing width on a logarithmic scale')
+
+
+def plot(arguments):
+    '''The plot subcommand: export the plots of results files (see
+    store.py) without processing the corpora again.
+
+    Arguments
+    ---------
+    arguments : list of str
+        The command line arguments (after "plot").
+    '''
+    import plots
+
+    parser = argparse.ArgumentParser(prog='count_numbers.py plot',
+                                     description='Export the plots of results files of count_numbers.py')
+    parser.add_argument("-o", "--output", default = '.', metavar = 'DIR',
+                        help = 'directory to write the plots to')
+    add_plot_arguments(parser)
+    parser.add_argument("file", nargs='+',
+                        help = 'the results files to plot')
+    args = parser.parse_args(arguments)
+
+    for name in args.file:
+        try:
+            results, metadata = store.load(name)
+            prefix = os.path.splitext(os.path.basename(name))[0] + '-'
+            paths = plots.export_results(results, metadata, args.output, prefix,
+                                         args.plot_format, args.bins, args.log)
+        except (IOError, ValueError, ImportError) as e:
+            print("error: {}".format(e), file=sys.stderr)
+            sys.exit(1)
+        for path in paths:
+            print(path)
+
+
 if __name__ == '__main__':
-    parser = argparse.ArgumentParser(description='Numerals extractor')
+    if sys.argv[1:2] == ['merge']:
+        merge(sys.argv[2:])
+        sys.exit(0)
+    if sys.argv[1:2] == ['plot']:
+        plot(sys.argv[2:])
+        sys.exit(0)
+
+    parser = argparse.ArgumentParser(description='Numerals extractor',
+                                     epilog='To merge results files saved with --save-results, '
+                                     'use "%(prog)s merge [-o FILE] FILE...", to export their '
+                                     'plots, use "%(prog)s plot [-o DIR] FILE...".')
     parser.add_argument("--min", default = 1, type = int,
                         help = 'minimal numeral to count')
     parser.add_argument("--max", default = 100, type = int,
                         help = 'maximal numeral to count')
+    parser.add_argument("--ranges", default = None, metavar = 'MIN-MAX,...',
+                        help = 'further ranges of numerals to count in the same pass '
+                        '(e.g. 0-10,100-1000)')
+    parser.add_argument("--head", default = None, type = int, metavar = 'N',
+                        help = 'count values up to N in dense arrays and larger ones '
+                        'sparsely (number words are then matched up to N only)')
+    parser.add_argument("--sketch", default = None, type = int, metavar = 'WIDTH',
+                        help = 'count values above the head approximately, '
+                        'with Count-Min sketches of this width')
     parser.add_argument("--language", default = 'en',
                         help = 'the corpus language (en, de, ...)')
+    parser.add_argument("--matcher", default = 'regex', choices = ['regex', 'tokens'],
+                        help = 'find the numerals with the regular expression or with '
+                        'token lookups (faster, same matches)')
     parser.add_argument('-p', '--plot', action="store_true",
                         help = 'provide a bar plot of the results')
+    parser.add_argument("--plot-output", default = None, metavar = 'DIR',
+                        help = 'export the plots to DIR instead of showing them')
+    add_plot_arguments(parser)
+    parser.add_argument("--from-wordlist", action="store_true",
+                        help = 'count the numbers and number words in the word frequency '
+                        'lists (*-words.txt) of Wortschatz corpora instead of their sentences '
+                        '(much faster, but approximate and without approximators and units)')
+    parser.add_argument("--sample", default = None, type = float, metavar = 'RATE',
+                        help = 'process only a random sample of this fraction of the lines '
+                        'and estimate the counts of the whole corpus')
+    parser.add_argument("--sample-method", default = None,
+                        choices = ['uniform', 'reservoir', 'blocks'],
+                        help = 'select lines independently (uniform, the default), a fixed '
+                        'number of lines (reservoir, see --sample-size) or random blocks '
+                        'of uncompressed files (blocks)')
+    parser.add_argument("--sample-size", default = None, type = int, metavar = 'N',
+                        help = 'number of lines of a reservoir sample')
+    parser.add_argument("--sample-output", default = None, metavar = 'FILE',
+                        help = 'file to write the estimates (with confidence intervals for '
+                        'every value) to (as JSON)')
+    parser.add_argument("--seed", default = None, type = int,
+                        help = 'seed of the random numbers for sampling')
+    parser.add_argument("--dedup", action="store_true",
+                        help = 'drop repeated lines, processing only the first '
+                        'occurrence of every sentence')
+    parser.add_argument("--dedup-capacity", default = None, type = int, metavar = 'N',
+                        help = 'keep the sentences seen in a Bloom filter for about N '
+                        'distinct sentences (implies --dedup, default: keep them exactly)')
+    parser.add_argument("--dedup-error", default = 0.001, type = float, metavar = 'RATE',
+                        help = 'rate of distinct sentences the Bloom filter may drop')
+    parser.add_argument("--stats-dir", default = None,
+                        help = 'directory to write the match files to')
+    parser.add_argument("--no-match-files", action="store_true",
+                        help = 'do not write match files, only count')
+    parser.add_argument("-j", "--jobs", default = 1, type = int,
+                        help = 'number of worker processes per file')
+    parser.add_argument("--mmap", action="store_true",
+                        help = 'map uncompressed files into memory instead of reading them')
+    parser.add_argument("--profile", action="store_true",
+                        help = 'measure the time spent in the stages of processing')
+    parser.add_argument("--profile-mode", default = None,
+                        choices=['stages', 'cprofile', 'memory', 'all'],
+                        help = 'additionally profile function calls (cprofile) and/or '
+                        'trace memory (implies --profile, default: stages)')
+    parser.add_argument("--profile-output", default = None, metavar = 'FILE',
+                        help = 'file to write the profile to (as JSON)')
+    parser.add_argument("--unit-index", default = None, metavar = 'FILE',
+                        help = 'file to keep the unit categories in between runs')
+    parser.add_argument("--unit-capacity", default = None, type = int, metavar = 'N',
+                        help = 'count only (about) the N most frequent units, '
+                        'in bounded memory (default: count all units exactly)')
+    parser.add_argument("--save-results", default = None, metavar = 'FILE',
+                        help = 'save the results of all files to FILE (to be merged later)')
+    parser.add_argument("--checkpoint", default = None, metavar = 'FILE',
+                        help = 'save the state of the run to FILE periodically')
+    parser.add_argument("--checkpoint-interval", default = 300, type = float,
+                        metavar = 'SECONDS', help = 'time between two checkpoints')
+    parser.add_argument("--resume", action="store_true",
+                        help = 'resume the run saved in the checkpoint file')
+    parser.add_argument("--cache", default = None, metavar = 'DIR',
+                        help = 'reuse the results of unchanged parts of the files from DIR')
+    parser.add_argument("--cache-size", default = 1024, type = int, metavar = 'MB',
+                        help = 'maximal size of the cache (in MB)')
+    parser.add_argument("--warm-up", action="store_true",
+                        help = 'load WordNet in the background while preparing '
+                        '(instead of when the first unit is classified)')
     parser.add_argument("--version", action='version',
                         version='%(prog)s version ' + __version__,
                         help = 'output version information and exit')
     parser.add_argument("file", nargs='*',
                         help = 'the file(s) to process')
     args = parser.parse_args()
+    if args.resume and not args.checkpoint:
+        parser.error('--resume requires --checkpoint')
+    if args.unit_capacity is not None and args.unit_capacity < 1:
+        parser.error('--unit-capacity has to be at least 1')
+    if args.cache and args.checkpoint:
+        parser.error('--cache can not be combined with --checkpoint')
+    if args.from_wordlist and (args.cache or args.checkpoint):
+        parser.error('--from-wordlist can not be combined with --cache or --checkpoint')
+    sampling = args.sample is not None or args.sample_size is not None
+    if sampling and (args.cache or args.checkpoint or args.jobs > 1 or args.from_wordlist):
+        parser.error('sampling can not be combined with --cache, --checkpoint, '
+                     '--jobs or --from-wordlist')
+    if args.sample_output and not sampling:
+        parser.error('--sample-output requires --sample or --sample-size')
+    profile = args.profile or args.profile_mode is not None
+    dedup = args.dedup or args.dedup_capacity is not None
+    if dedup and (args.cache or args.checkpoint or sampling or args.from_wordlist):
+        parser.error('--dedup can not be combined with --cache, --checkpoint, '
+                     'sampling or --from-wordlist')
 
     # initialize the language object (language of the corpus
     # determines number separators (1,000 vs. 1.000), assume English
@@ -48,42 +240,117 @@ if __name__ == '__main__':
         print("error: language \"{}\" is not supported.".
               format(args.language), file=sys.stderr)
         sys.exit(1)
+    language.set_matcher(args.matcher)
+
+    ranges = []
+    if args.ranges:
+        try:
+            ranges = [tuple(int(n) for n in r.rsplit('-', 1)) for r in args.ranges.split(',')]
+        except ValueError:
+            ranges = None
+        if not ranges or any(len(r) != 2 or r[0] > r[1] for r in ranges):
+            print("error: invalid ranges \"{}\"".format(args.ranges), file=sys.stderr)
+            sys.exit(1)
+
+    # reuse the unit categories from previous runs (if available)
+    if args.unit_index and language.unit_index is not None:
+        if os.path.exists(args.unit_index):
+            try:
+                language.unit_index.load(args.unit_index)
+            except ValueError as e:
+                print("warning: ignoring unit index: {}".format(e), file=sys.stderr)
+
+    if args.warm_up:
+        language.warm_up()
 
     # now do the processing ...
-    processor = Processor(language, min=args.min, max=args.max)
+    processor = Processor(language, min=args.min, max=args.max,
+                          match_directory=args.stats_dir,
+                          write_matches=not args.no_match_files,
+                          ranges=ranges, unit_capacity=args.unit_capacity,
+                          head=args.head, sketch=args.sketch)
     processor.verbosity = 2
+    processor._use_mmap_flag = args.mmap
+    processor._from_wordlist_flag = args.from_wordlist
+    if profile:
+        processor.enableProfiling(cprofile=args.profile_mode in ('cprofile', 'all'),
+                                  memory=args.profile_mode in ('memory', 'all'))
+    if args.cache:
+        processor.enableCache(args.cache, args.cache_size << 20)
+    if sampling:
+        method = args.sample_method or ('reservoir' if args.sample_size else 'uniform')
+        try:
+            processor.enableSampling(args.sample, method, args.sample_size, args.seed)
+        except ValueError as e:
+            parser.error(str(e))
+    if dedup:
+        try:
+            processor.enableDedup(args.dedup_capacity, args.dedup_error)
+        except ValueError as e:
+            parser.error(str(e))
+    if args.checkpoint:
+        resume = args.resume and os.path.exists(args.checkpoint)
+        if args.resume and not resume:
+            print("warning: no checkpoint to resume from, starting from the beginning",
+                  file=sys.stderr)
+        try:
+            processor.enableCheckpoints(args.checkpoint, args.checkpoint_interval, resume)
+        except (IOError, ValueError) as e:
+            print("error: can not resume from checkpoint: {}".format(e), file=sys.stderr)
+            sys.exit(1)
+    process_stdin = processor.processWordlist if args.from_wordlist else processor.processFile
     if not args.file:
-        processor.processFile(sys.stdin)
+        nums, numwords = process_stdin(sys.stdin)
     for name in args.file:
         if name == '-':
-            processor.processFile(sys.stdin)
+            nums, numwords = process_stdin(sys.stdin)
             continue
 
         # try to find determine the path to the name ...
-        if not os.path.exists(name):
-            if ('WORTSCHATZ_ROOT' in os.environ and
-                os.path.exists(os.path.join(os.environ['WORTSCHATZ_ROOT'],
-                                            name))):
-                name = os.path.join(os.environ['WORTSCHATZ_ROOT'], name)
-            else:
-                print("error: no file called \"{}\"".
-                      format(name),file=sys.stderr)
-                sys.exit(1)
-
-        if os.path.isdir(name):
-            guess = os.path.join(name, os.path.basename(name)+"-sentences.txt")
-            if os.path.isfile(guess):
-                name = guess
-            else:
-                print("error: directory \"{}\" does not contain a valid file".
-                      format(name),file=sys.stderr)
-                sys.exit(1)
+        try:
+            name = corpus.resolve(name)
+        except IOError as e:
+            print("error: {}".format(e), file=sys.stderr)
+            sys.exit(1)
 
         # ... and run the processor
         print("Using \"{}\"".format(name), file=sys.stderr)
-        with open(name, 'r', encoding="utf8") as inputStream:
-            nums, numwords = processor.processFile(inputStream) # [p] modified to return counts
+        try:
+            nums, numwords = processor.processPath(name, jobs=args.jobs) # [p] modified to return counts
+        except IOError as e:
+            if not args.from_wordlist:
+                raise
+            print("error: {}".format(e), file=sys.stderr)
+            sys.exit(1)
+    processor.close()
+    if args.save_results:
+        store.save(args.save_results, processor.total, processor.metadata())
+    if args.checkpoint:
+        # the run is complete
+        processor.checkpoints.remove()
+
+    if sampling:
+        estimates = processor.sampleEstimates()
+        print(estimates.format(bins=10))
+        if args.sample_output:
+            with open(args.sample_output, 'w') as f:
+                json.dump(estimates.as_dict(), f, indent=2)
+
+    if profile:
+        report = processor.profileReport()
+        print(report.format(), file=sys.stderr)
+        if args.profile_output:
+            with open(args.profile_output, 'w') as f:
+                json.dump(report.as_dict(), f, indent=2)
+
+    if (args.unit_index and language.unit_index is not None and
+        language.unit_index.dirty):
+        language.unit_index.save(args.unit_index)
 
     # finally plot the results
-    if args.plot:
-        processor.plotBars(nums, numwords) # [p] modified to use counts for plotting
+    if args.plot or args.plot_output:
+        options = {'output': args.plot_output, 'format': args.plot_format,
+                   'bins': args.bins, 'log': args.log}
+        for index, results in enumerate(processor.results.ranges, 1):
+            processor.plotBars(results.nums, results.numwords, index, show=False, **options)
+        processor.plotBars(nums, numwords, **options) # [p] modified to use counts for plotting
@@ -1,22 +1,377 @@
+import math
+import random
+import operator
+from array import array
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+class SparseCounts:
+    '''Exact counts of values from a range that is too large for a
+    dense array, of which only a small part actually occurs. Values are
+    collected in a buffer, which is merged into sorted arrays of the
+    distinct values and their counts from time to time (with NumPy,
+    otherwise the counts are kept in a dictionary).
+    '''
+
+    # Merge the buffer when it holds this number of values (or
+    # more than there are distinct values so far).
+    _buffer_size = 1 << 16
+
+
+    def __init__(self, values=(), counts=()):
+        '''Create new counts.
+
+        Arguments
+        ---------
+        values, counts : sequences of ints
+            Initial counts (e.g. exported by to_arrays()). The
+            values have to be distinct.
+        '''
+        self._buffer = []
+        if np is not None:
+            self._values = np.array(values, dtype=np.int64)
+            self._counts = np.array(counts, dtype=np.int64)
+            order = np.argsort(self._values)
+            self._values, self._counts = self._values[order], self._counts[order]
+        else:
+            self._table = dict(zip(values, counts))
+
+
+    def add(self, value):
+        '''Count a value.
+        '''
+        self._buffer.append(value)
+        if len(self._buffer) >= self._buffer_size:
+            self._flush()
+
+
+    def update(self, values, counts=None):
+        '''Count all values of an iterable.
+
+        Arguments
+        ---------
+        values : iterable of ints
+            The values to count.
+        counts : iterable of ints
+            The number of occurrences of each value (default: 1).
+        '''
+        if counts is not None:
+            self._flush()
+            if np is not None:
+                self._combine(np.asarray(list(values), dtype=np.int64),
+                              np.asarray(list(counts), dtype=np.int64))
+            else:
+                table = self._table
+                for value, count in zip(values, counts):
+                    table[value] = table.get(value, 0) + count
+            return
+        self._buffer.extend(values)
+        if len(self._buffer) >= self._buffer_size:
+            self._flush()
+
+
+    def _flush(self):
+        buffer, self._buffer = self._buffer, []
+        if not buffer:
+            return
+        if np is not None:
+            values = np.asarray(buffer, dtype=np.int64)
+            self._combine(values, np.ones(len(values), dtype=np.int64))
+        else:
+            table = self._table
+            for value in buffer:
+                table[value] = table.get(value, 0) + 1
+
+
+    def _combine(self, values, counts):
+        '''Add counts of (not necessarily distinct) values (NumPy only).
+        '''
+        values = np.concatenate([self._values, values])
+        self._values, index = np.unique(values, return_inverse=True)
+        total = np.zeros(len(self._values), dtype=np.int64)
+        np.add.at(total, index.ravel(), np.concatenate([self._counts, counts]))
+        self._counts = total
+        # merge less often as more distinct values are known
+        self._buffer_size = max(SparseCounts._buffer_size, len(self._values))
+
+
+    def __len__(self):
+        '''The number of distinct values counted.
+        '''
+        self._flush()
+        return len(self._values) if np is not None else len(self._table)
+
+
+    def __getitem__(self, value):
+        self._flush()
+        if np is None:
+            return self._table.get(value, 0)
+        index = np.searchsorted(self._values, value)
+        if index < len(self._values) and self._values[index] == value:
+            return int(self._counts[index])
+        return 0
+
+
+    def counts(self, low, high):
+        '''The counts of all values from low to high (inclusive).
+
+        Result
+        ------
+        list of int
+        '''
+        self._flush()
+        if np is None:
+            return [self._table.get(value, 0) for value in range(low, high + 1)]
+        result = np.zeros(max(high - low + 1, 0), dtype=np.int64)
+        start, end = np.searchsorted(self._values, [low, high + 1])
+        result[self._values[start:end] - low] = self._counts[start:end]
+        return [int(n) for n in result]
+
+
+    def sum(self, low=None, high=None):
+        '''The sum of the counts (of the values from low to high).
+        '''
+        self._flush()
+        if np is None:
+            return sum(count for value, count in self._table.items()
+                       if (low is None or value >= low) and (high is None or value <= high))
+        start = 0 if low is None else np.searchsorted(self._values, low)
+        end = len(self._values) if high is None else np.searchsorted(self._values, high + 1)
+        return int(self._counts[start:end].sum())
+
+
+    def merge(self, other):
+        '''Add other SparseCounts to these counts.
+        '''
+        self._flush()
+        values, counts = other.to_arrays()
+        if np is not None:
+            self._combine(np.asarray(values, dtype=np.int64), np.asarray(counts, dtype=np.int64))
+        else:
+            for value, count in zip(values, counts):
+                self._table[value] = self._table.get(value, 0) + count
+
+
+    def to_arrays(self):
+        '''Export the counts.
+
+        Result
+        ------
+        (list of int, list of int)
+            The distinct values (in ascending order) and their counts.
+        '''
+        self._flush()
+        if np is None:
+            values = sorted(self._table)
+            return values, [self._table[value] for value in values]
+        return self._values.tolist(), self._counts.tolist()
+
+
+class CountMinSketch:
+    '''Approximate counts of values from a range of any size in fixed
+    memory (a Count-Min sketch, Cormode and Muthukrishnan, 2005): every
+    value is counted in one of `width` counters in each of `depth` rows
+    (chosen by a hash function per row), and its count is estimated
+    as the minimum of these counters. Estimates are never too low, and
+    with probability 1-exp(-depth) they are at most error() too high.
+    Sketches of the same width and depth can be merged.
+    '''
+
+    # The prime of the hash functions ((a*x + b) mod p) mod width.
+    _prime = (1 << 31) - 1
+
+    # Update the counters when the buffer holds this number of values.
+    _buffer_size = 1 << 14
+
+
+    def __init__(self, width, depth=4):
+        '''Create a new (empty) sketch.
+
+        Arguments
+        ---------
+        width : int
+            The number of counters per row.
+        depth : int
+            The number of rows.
+        '''
+        self.width, self.depth = width, depth
+        # the hash functions only depend on the size of the sketch,
+        # so sketches of the same size can be merged
+        generator = random.Random(1000003*depth + width)
+        self._hashes = [(generator.randrange(1, self._prime), generator.randrange(self._prime))
+                        for _ in range(depth)]
+        self._buffer = []
+        if np is not None:
+            self._table = np.zeros((depth, width), dtype=np.int64)
+        else:
+            self._table = [array('q', [0]) * width for _ in range(depth)]
+
+
+    def _columns(self, row, values):
+        a, b = self._hashes[row]
+        if np is not None:
+            return (a * (np.asarray(values, dtype=np.int64) % self._prime) + b) % self._prime % self.width
+        return [(a * (value % self._prime) + b) % self._prime % self.width for value in values]
+
+
+    def add(self, value):
+        '''Count a value.
+        '''
+        self._buffer.append(value)
+        if len(self._buffer) >= self._buffer_size:
+            self._flush()
+
+
+    def update(self, values, counts=None):
+        '''Count all values of an iterable.
+
+        Arguments
+        ---------
+        values : iterable of ints
+            The values to count.
+        counts : iterable of ints
+            The number of occurrences of each value (default: 1).
+        '''
+        if counts is not None:
+            self._flush()
+            values, counts = list(values), list(counts)
+            for row in range(self.depth):
+                columns = self._columns(row, values)
+                if np is not None:
+                    np.add.at(self._table[row], columns, np.asarray(counts, dtype=np.int64))
+                else:
+                    counters = self._table[row]
+                    for column, count in zip(columns, counts):
+                        counters[column] += count
+            return
+        self._buffer.extend(values)
+        if len(self._buffer) >= self._buffer_size:
+            self._flush()
+
+
+    def _flush(self):
+        buffer, self._buffer = self._buffer, []
+        if not buffer:
+            return
+        for row in range(self.depth):
+            columns = self._columns(row, buffer)
+            if np is not None:
+                np.add.at(self._table[row], columns, 1)
+            else:
+                counters = self._table[row]
+                for column in columns:
+                    counters[column] += 1
+
+
+    def __getitem__(self, value):
+        return self.counts(value, value)[0]
+
+
+    def counts(self, low, high):
+        '''The estimated counts of all values from low to high (inclusive).
+
+        Result
+        ------
+        list of int
+        '''
+        self._flush()
+        values = range(low, high + 1)
+        if np is not None:
+            values = np.arange(low, high + 1, dtype=np.int64)
+            estimates = np.min([self._table[row][self._columns(row, values)]
+                                for row in range(self.depth)], axis=0)
+            return [int(n) for n in estimates]
+        rows = [[self._table[row][column] for column in self._columns(row, values)]
+                for row in range(self.depth)]
+        return [min(counts) for counts in zip(*rows)]
+
+
+    def sum(self, low=None, high=None):
+        '''The sum of the counts. This is exact for all values, and
+        the sum of the estimates for the values from low to high.
+        '''
+        if low is not None and high is not None:
+            return sum(self.counts(low, high))
+        self._flush()
+        return int(sum(self._table[0]))
+
+
+    def error(self):
+        '''The maximal overestimate of a count (with probability
+        1-exp(-depth)).
+        '''
+        return int(math.ceil(math.e * self.sum() / self.width))
+
+
+    def merge(self, other):
+        '''Add another sketch (of the same size) to this sketch.
+        '''
+        if (other.width, other.depth) != (self.width, self.depth):
+            raise ValueError('can not merge sketches of different sizes')
+        self._flush()
+        other._flush()
+        if np is not None:
+            self._table += other._table
+        else:
+            for counters, other_counters in zip(self._table, other._table):
+                for i, count in enumerate(other_counters):
+                    counters[i] += count
+
+
+    def to_array(self):
+        '''Export the counters (row by row).
+
+        Result
+        ------
+        list of int
+        '''
+        self._flush()
+        return [int(n) for row in self._table for n in row]
+
+
+    def from_array(self, counts):
+        '''Set the counters (e.g. exported by to_array()).
+        '''
+        if len(counts) != self.width * self.depth:
+            raise ValueError('expected {0} counts, got {1}'.format(self.width * self.depth, len(counts)))
+        self._buffer = []
+        if np is not None:
+            self._table = np.array(counts, dtype=np.int64).reshape(self.depth, self.width)
+        else:
+            self._table = [array('q', counts[row*self.width:(row+1)*self.width])
+                           for row in range(self.depth)]
+
+
 class Counter:
     '''The Counter class is a collection of individual counters.  It is
     intended to count the occurences of numerals (integers), but it
     may also be used to count other things.
 
+    The counters for all values from min to max are kept in one
+    dense array (a NumPy array if NumPy is installed, otherwise
+    a standard library array).
+
+    Very wide ranges (e.g. years or prices, up to 10^9) would not fit
+    into memory this way. Then only the head of the range (the values
+    up to `head`) is counted in a dense array, and the values above
+    the head (the tail) are counted exactly in SparseCounts or, in
+    fixed memory, approximately in a CountMinSketch.
     '''
 
-    # The minimal value to consider.
-    _min_value = 0
+    # Lists shorter than this are counted in a plain loop,
+    # longer ones with NumPy (if available).
+    _bulk_threshold = 32
 
-    # The maximal value to consider.
-    _max_value = 1
+    # The largest number of values counted in a dense array
+    # (if no head is given).
+    dense_limit = 1 << 22
 
-    # The actual dictionary of counters: value => counter.
-    # If no key exists in this dictionary for a spefic value,
-    # its counter is assumed to 0.
-    _counters = {}
 
-    def __init__(self, min=0, max=100):
+    def __init__(self, min=0, max=100, head=None, sketch=None):
         '''Create a new counter.
 
         Arguments
@@ -25,12 +380,50 @@ class Counter:
             The minimal value to count. All smaller values will be ignored.
         max : int
             The maximal value to count. All larger values will be ignored.
+        head : int
+            The largest value counted in the dense array (default:
+            max, or min+dense_limit-1 for ranges of more than
+            dense_limit values). Larger values are counted in the tail.
+        sketch : int
+            The width of the CountMinSketch counting the tail (None
+            means to count the tail exactly, in SparseCounts).
         '''
+        self._min_value = min
         self._max_value = max
-        # [p] why is _min_value not adjusted to the input argument min?
+        self._head = head
+        self._sketch = sketch
         self.reset()
 
 
+    @classmethod
+    def dense(cls, min, max, head=None):
+        '''Check whether a counter counts all values in a dense array.
+
+        Arguments
+        ---------
+        min, max, head : int
+            cf. Counter()
+        '''
+        if head is None:
+            return max - min + 1 <= cls.dense_limit
+        return head >= max
+
+
+    @property
+    def head(self):
+        '''The largest value counted in the dense array.
+        '''
+        return self._min_value + self._size - 1
+
+
+    @property
+    def tail(self):
+        '''The counts of the values above the head (SparseCounts or a
+        CountMinSketch), None if all values are counted densely.
+        '''
+        return self._tail
+
+
     def __call__(self, *arg):
         '''Count given value(s). The respective counter(s) is/are increased
         by 1.
@@ -44,17 +437,86 @@ class Counter:
                 once for each occurence.
         '''
         if len(arg) != 1:
-            return self(arg)
-        arg = arg[0]
-        if isinstance(arg,(list,tuple)):
-            list(map(self, arg))
-        elif arg >= self._min_value and arg <= self._max_value:
-            # not yet in dictionary: new entry
-            if not arg in self._counters:
-                self._counters[arg] = 1
+            self.update(arg)
+            return
+        try:
+            index = operator.index(arg[0]) - self._min_value
+        except TypeError:
+            # not a single number
+            self.update(arg[0])
+            return
+        if 0 <= index < self._size:
+            self._counters[index] += 1
+        elif self._tail is not None and self._size <= index < self._width:
+            self._tail.add(index + self._min_value)
+
+
+    def update(self, values, counts=None):
+        '''Count all values of an iterable. This is the same as calling
+        the counter with a list of values, but it is considerably
+        faster for large numbers of values.
+
+        Arguments
+        ---------
+        values: iterable of ints
+                The values to count. Values outside the range of
+                this counter are ignored.
+        counts: iterable of ints
+                The number of occurrences of each value (default: 1),
+                e.g. the frequencies of a word list.
+        '''
+        if counts is not None:
+            self._update_counts(list(values), list(counts))
+        elif np is not None:
+            if not isinstance(values, np.ndarray):
+                values = list(values)
+                if len(values) < self._bulk_threshold:
+                    self._update(values)
+                    return
+            values = np.asarray(values, dtype=np.int64) - self._min_value
+            if self._tail is not None:
+                tail = values[(values >= self._size) & (values < self._width)]
+                if len(tail):
+                    self._tail.update((tail + self._min_value).tolist())
+            values = values[(values >= 0) & (values < self._size)]
+            if 8*len(values) < self._size:
+                # cheaper than counting into an array of the full size
+                np.add.at(self._counters, values, 1)
             else:
-                # already in dictionary: increase
-                self._counters[arg] += 1
+                self._counters += np.bincount(values, minlength=self._size)
+        else:
+            self._update(values)
+
+
+    def _update(self, values):
+        counters, size, min_value = self._counters, self._size, self._min_value
+        tail, width = self._tail, self._width
+        for value in values:
+            index = value - min_value
+            if 0 <= index < size:
+                counters[index] += 1
+            elif tail is not None and size <= index < width:
+                tail.add(value)
+
+
+    def _update_counts(self, values, counts):
+        if np is None:
+            counters, size, min_value = self._counters, self._size, self._min_value
+            for value, count in zip(values, counts):
+                index = value - min_value
+                if 0 <= index < size:
+                    counters[index] += count
+                elif self._tail is not None and size <= index < self._width:
+                    self._tail.update([value], [count])
+            return
+        values = np.asarray(values, dtype=np.int64) - self._min_value
+        counts = np.asarray(counts, dtype=np.int64)
+        if self._tail is not None:
+            tail = (values >= self._size) & (values < self._width)
+            if tail.any():
+                self._tail.update((values[tail] + self._min_value).tolist(), counts[tail].tolist())
+        head = (values >= 0) & (values < self._size)
+        np.add.at(self._counters, values[head], counts[head])
 
 
     def __getitem__(self, *arg):
@@ -62,8 +524,10 @@ class Counter:
 
         Arguments:
         ---------
-        *arg: (ints) or [ints]
-                Either an individual number value or a list of numbers.
+        *arg: (ints) or [ints] or slice
+                Either an individual number value, a list of numbers
+                or a slice of values (e.g. counter[10:20] for the
+                values from 10 to 19).
 
         Result
         ------
@@ -78,18 +542,113 @@ class Counter:
         arg = arg[0]
         if isinstance(arg,(list,tuple)):
             return list(map(self.__getitem__, arg))
-        else:
-            return self._counters[arg] if arg in self._counters else 0
+        if isinstance(arg, slice):
+            return self._slice(arg)
+        index = arg - self._min_value
+        if 0 <= index < self._size:
+            return int(self._counters[index])
+        if self._tail is not None and self._size <= index < self._width:
+            return self._tail[arg]
+        return 0
+
 
+    def _slice(self, values):
+        '''The counts of a slice of values (with step 1).
+        '''
+        low = self._min_value if values.start is None else values.start
+        high = self._max_value + 1 if values.stop is None else values.stop
+        counts = [0] * max(min(high, self._min_value) - low, 0)
+        start = max(low, self._min_value) - self._min_value
+        end = min(high, self._min_value + self._size) - self._min_value
+        counts.extend(int(n) for n in self._counters[start:end])
+        if self._tail is not None:
+            tail_low = max(low, self._min_value + self._size)
+            tail_high = min(high, self._max_value + 1) - 1
+            if tail_low <= tail_high:
+                counts.extend(self._tail.counts(tail_low, tail_high))
+        counts.extend([0] * max(high - max(low, self._max_value + 1), 0))
+        return counts
 
-    def sum(self):
-        '''Get the sum of all element counters.
+
+    def sum(self, low=None, high=None):
+        '''Get the sum of all element counters (or of the counters for
+        the values from low to high).
 
         Result
         ------
         The sum of all element counters.
         '''
-        return sum(self._counters.values())
+        start = 0 if low is None else max(low - self._min_value, 0)
+        end = self._size if high is None else max(min(high - self._min_value + 1, self._size), 0)
+        counters = self._counters[start:end]
+        total = int(counters.sum()) if np is not None else sum(counters)
+        if self._tail is not None:
+            tail_low = self._min_value + self._size
+            low = tail_low if low is None else max(low, tail_low)
+            high = self._max_value if high is None else min(high, self._max_value)
+            if (low, high) == (tail_low, self._max_value):
+                total += self._tail.sum()
+            elif low <= high:
+                total += self._tail.sum(low, high)
+        return total
+
+
+    def merge(self, other):
+        '''Add the counts of another counter to this counter.
+
+        Arguments
+        ---------
+        other : Counter
+            The counter whose counts are added. Counts outside
+            the range of this counter are ignored. If either counter
+            has a tail, both have to count the same range in the
+            same way.
+        '''
+        if self._tail is not None or other._tail is not None:
+            if (self._min_value, self._max_value, self._size, type(self._tail), self._sketch) != \
+               (other._min_value, other._max_value, other._size, type(other._tail), other._sketch):
+                raise ValueError('can not merge counters with different heads or tails')
+            self._tail.merge(other._tail)
+        low = max(self._min_value, other._min_value)
+        high = min(self._max_value, other._max_value)
+        if low > high:
+            return
+        start, end = low - self._min_value, high - self._min_value + 1
+        offset = self._min_value - other._min_value
+        if np is not None:
+            self._counters[start:end] += other._counters[start+offset:end+offset]
+        else:
+            for i in range(start, end):
+                self._counters[i] += other._counters[i+offset]
+
+
+    def to_array(self):
+        '''Export all counters (of the head, see tail for the others).
+
+        Result
+        ------
+        numpy.ndarray or array.array
+            A copy of the counters for all values from min to max
+            (a NumPy array if NumPy is available).
+        '''
+        return self._counters.copy() if np is not None else array('q', self._counters)
+
+
+    def from_array(self, counts):
+        '''Set all counters (e.g. to counts exported by to_array()).
+
+        Arguments
+        ---------
+        counts : sequence of ints
+            The counts for all values from min to max (or to the
+            end of the head).
+        '''
+        if len(counts) != self._size:
+            raise ValueError('expected {0} counts, got {1}'.format(self._size, len(counts)))
+        if np is not None:
+            self._counters = np.array(counts, dtype=np.int64)
+        else:
+            self._counters = array('q', counts)
 
 
     def reset(self):
@@ -97,4 +656,53 @@ class Counter:
         This will just set all counters to 0 but will keep all
         other parameters.
         '''
-        self._counters = {}
+        self._width = max(self._max_value - self._min_value + 1, 0)
+        if self.dense(self._min_value, self._max_value, self._head):
+            self._size, self._tail = self._width, None
+        else:
+            head = self._min_value + self.dense_limit - 1 if self._head is None else self._head
+            self._size = max(head - self._min_value + 1, 0)
+            self._tail = CountMinSketch(self._sketch) if self._sketch else SparseCounts()
+        if np is not None:
+            self._counters = np.zeros(self._size, dtype=np.int64)
+        else:
+            self._counters = array('q', [0]) * self._size
+
+
+    def as_dict(self):
+        '''The counts as dictionary of plain values (e.g. for storing
+        them as JSON, cf. from_dict()).
+        '''
+        values = {'min': self._min_value, 'max': self._max_value,
+                  'counts': [int(n) for n in self.to_array()]}
+        if self._tail is not None:
+            values['head'] = self.head
+            if self._sketch:
+                values['sketch'] = self._sketch
+                values['tail'] = self._tail.to_array()
+            else:
+                values['tail'] = self._tail.to_arrays()
+        return values
+
+
+    @classmethod
+    def from_dict(cls, values):
+        '''Restore a counter stored by as_dict().
+
+        Arguments
+        ---------
+        values : dict
+            The result of as_dict().
+
+        Result
+        ------
+        Counter
+        '''
+        counter = cls(values['min'], values['max'], values.get('head'), values.get('sketch'))
+        counter.from_array(values['counts'])
+        if 'tail' in values:
+            if counter._sketch:
+                counter._tail.from_array(values['tail'])
+            else:
+                counter._tail = SparseCounts(*values['tail'])
+        return counter
@@ -0,0 +1,433 @@
+"""
+Drop repeated lines of a corpus before they are processed.
+
+News corpora contain many repeated sentences (boilerplate, agency
+copy, tickers). Each repetition would be matched and counted again,
+so with deduplication only the first occurrence of a sentence is
+processed, and the repetitions are counted as duplicates.
+
+Sentences are identified by a 64-bit hash (of the sentence without its
+ID, see line_hashes()). The hashes of the sentences seen so far are
+kept either
+
+exactly
+    in a HashSet (8 bytes per distinct sentence). Different sentences
+    are only taken for the same if their hashes collide, which is
+    very unlikely (probability about n^2/2^65 for n sentences).
+in a Bloom filter
+    for very large corpora: a fixed number of bits, sized for the
+    expected number of distinct sentences (capacity) and the rate of
+    false positives (error), i.e. of distinct sentences dropped as
+    repetitions (see BloomFilter).
+
+Lines are deduplicated in blocks (cf. Processor.processLines()): the
+hashes of a block are computed, and its repetitions (within the block
+and of earlier lines) are found with NumPy at once.
+
+Deduplication can be sharded (see parallel.py). First the distinct
+hashes of every shard are collected (summary()). Then every shard is
+processed starting from the hashes it shares with the earlier shards
+(or from the Bloom filter of the earlier shards, see shard_states()).
+So the same lines are dropped as when processing the file with a
+single process (for Bloom filters, up to false positives).
+"""
+
+import math
+import hashlib
+import itertools
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+def sentence_hash(sentence):
+    '''The 64-bit hash of a sentence (without the line break).
+    '''
+    digest = hashlib.blake2b(sentence.rstrip('\r\n').encode('utf8'), digest_size=8).digest()
+    return int.from_bytes(digest, 'little')
+
+
+def line_hashes(lines, split_ids=True):
+    '''The hashes of the sentences of some lines.
+
+    Arguments
+    ---------
+    lines : list of str
+        The lines.
+    split_ids : bool
+        Remove the sentence IDs of "Wortschatz" corpora (everything up
+        to the first tabulator) before hashing, so that repetitions
+        with different IDs are found.
+
+    Result
+    ------
+    numpy.ndarray of uint64 (a list of int without NumPy)
+    '''
+    hashes = [sentence_hash(line.split('\t')[1] if split_ids and '\t' in line else line)
+              for line in lines]
+    if np is not None:
+        return np.array(hashes, dtype=np.uint64)
+    return hashes
+
+
+class HashSet:
+    '''An exact set of 64-bit hashes in compact memory: sorted NumPy
+    arrays ("runs") with 8 bytes per hash. New hashes are added as a
+    new run, and a run is merged into the previous one unless that is
+    at least twice as large (so there are at most about log2(n) runs
+    to search). Without NumPy, the hashes are kept in a set.
+    '''
+
+    def __init__(self, hashes=()):
+        '''Create a new set.
+
+        Arguments
+        ---------
+        hashes : iterable of int
+            The (distinct) hashes to start with.
+        '''
+        self._runs = []
+        self._set = set() if np is None else None
+        self.add(hashes)
+
+
+    def __len__(self):
+        if self._set is not None:
+            return len(self._set)
+        return sum(len(run) for run in self._runs)
+
+
+    def contains(self, hashes):
+        '''Test which hashes are in the set.
+
+        Arguments
+        ---------
+        hashes : numpy.ndarray of uint64 (or list of int)
+
+        Result
+        ------
+        numpy.ndarray of bool (or list of bool)
+        '''
+        if self._set is not None:
+            return [h in self._set for h in hashes]
+        hashes = np.asarray(hashes, dtype=np.uint64)
+        found = np.zeros(len(hashes), dtype=bool)
+        for run in self._runs:
+            index = np.minimum(np.searchsorted(run, hashes), len(run) - 1)
+            found |= run[index] == hashes
+        return found
+
+
+    def add(self, hashes):
+        '''Add hashes that are not in the set yet.
+
+        Arguments
+        ---------
+        hashes : numpy.ndarray of uint64 (or iterable of int)
+            Distinct hashes, none of which is in the set.
+        '''
+        if self._set is not None:
+            self._set.update(hashes)
+            return
+        run = np.sort(np.asarray(hashes, dtype=np.uint64))
+        if not len(run):
+            return
+        runs = self._runs
+        runs.append(run)
+        while len(runs) > 1 and len(runs[-2]) < 2*len(runs[-1]):
+            last = runs.pop()
+            runs[-1] = np.sort(np.concatenate((runs[-1], last)))
+
+
+    def values(self):
+        '''All hashes of the set (sorted).
+        '''
+        if self._set is not None:
+            return sorted(self._set)
+        if len(self._runs) > 1:
+            self._runs = [np.sort(np.concatenate(self._runs))]
+        return self._runs[0] if self._runs else np.zeros(0, dtype=np.uint64)
+
+
+    def merge(self, other):
+        '''Add the hashes of another HashSet.
+        '''
+        values = other.values()
+        contained = self.contains(values)
+        if self._set is not None:
+            self.add(h for h, c in zip(values, contained) if not c)
+        else:
+            self.add(values[~contained])
+
+
+    def intersection(self, hashes):
+        '''The hashes that are in the set, as a new HashSet.
+
+        Arguments
+        ---------
+        hashes : numpy.ndarray of uint64 (or list of int)
+            Distinct hashes.
+        '''
+        contained = self.contains(hashes)
+        if self._set is not None:
+            return HashSet(h for h, c in zip(hashes, contained) if c)
+        return HashSet(np.asarray(hashes, dtype=np.uint64)[contained])
+
+
+    def nbytes(self):
+        '''The memory used by the hashes (in bytes, without NumPy an
+        estimate).
+        '''
+        if self._set is not None:
+            return 64*len(self._set)
+        return sum(run.nbytes for run in self._runs)
+
+
+class BloomFilter:
+    '''An approximate set of 64-bit hashes in fixed memory (a Bloom
+    filter, Bloom 1970): every hash sets `hashes` of the `bits` bits
+    (chosen by double hashing, Kirsch and Mitzenmacher 2006), and a
+    hash is taken to be in the set if all its bits are set. Hashes
+    added are always found; with up to `capacity` hashes added, other
+    hashes are found with probability at most about `error`. Filters
+    of the same size can be merged.
+    '''
+
+    def __init__(self, capacity, error=0.001):
+        '''Create a new (empty) filter.
+
+        Arguments
+        ---------
+        capacity : int
+            The number of hashes to be added.
+        error : float
+            The rate of false positives with `capacity` hashes added.
+        '''
+        if capacity < 1 or not 0 < error < 1:
+            raise ValueError('a Bloom filter needs a capacity of at least 1 '
+                             'and an error between 0 and 1')
+        self.capacity, self.error = capacity, error
+        self.bits = max(64, int(math.ceil(-capacity*math.log(error) / math.log(2)**2)))
+        self.hashes = max(1, int(round(self.bits / capacity * math.log(2))))
+        if np is not None:
+            self._table = np.zeros((self.bits + 7) // 8, dtype=np.uint8)
+        else:
+            self._table = bytearray((self.bits + 7) // 8)
+
+
+    def _positions(self, hashes):
+        '''The bits of the hashes (an array with a column per hash).
+        '''
+        if np is None:
+            return [[((h & 0xffffffff) + i*((h >> 32) | 1)) % self.bits for h in hashes]
+                    for i in range(self.hashes)]
+        hashes = np.asarray(hashes, dtype=np.uint64)
+        first = hashes & np.uint64(0xffffffff)
+        step = (hashes >> np.uint64(32)) | np.uint64(1)
+        i = np.arange(self.hashes, dtype=np.uint64)[:, None]
+        return (first + i*step) % np.uint64(self.bits)
+
+
+    def contains(self, hashes):
+        '''Test which hashes are (probably) in the filter.
+
+        Arguments
+        ---------
+        hashes : numpy.ndarray of uint64 (or list of int)
+
+        Result
+        ------
+        numpy.ndarray of bool (or list of bool)
+        '''
+        positions = self._positions(hashes)
+        table = self._table
+        if np is None:
+            return [all(table[p >> 3] >> (p & 7) & 1 for p in column)
+                    for column in zip(*positions)]
+        bits = table[positions >> np.uint64(3)] >> (positions & np.uint64(7)).astype(np.uint8)
+        return (bits & 1).all(axis=0)
+
+
+    def add(self, hashes):
+        '''Add hashes to the filter.
+
+        Arguments
+        ---------
+        hashes : numpy.ndarray of uint64 (or list of int)
+        '''
+        positions = self._positions(hashes)
+        if np is None:
+            for row in positions:
+                for p in row:
+                    self._table[p >> 3] |= 1 << (p & 7)
+        else:
+            masks = np.left_shift(1, positions & np.uint64(7)).astype(np.uint8)
+            np.bitwise_or.at(self._table, (positions >> np.uint64(3)).ravel(), masks.ravel())
+
+
+    def merge(self, other):
+        '''Add the hashes of another filter of the same size.
+        '''
+        if (self.bits, self.hashes) != (other.bits, other.hashes):
+            raise ValueError('can not merge Bloom filters of different sizes')
+        if np is not None:
+            self._table |= other._table
+        else:
+            for i, byte in enumerate(other._table):
+                self._table[i] |= byte
+
+
+    def copy(self):
+        '''A copy of the filter.
+        '''
+        other = BloomFilter(self.capacity, self.error)
+        other._table[:] = self._table
+        return other
+
+
+    def _fill(self):
+        '''The fraction of the bits that are set.
+        '''
+        if np is not None:
+            ones = int(np.unpackbits(self._table).sum())
+        else:
+            ones = sum(bin(byte).count('1') for byte in self._table)
+        return ones / float(self.bits)
+
+
+    def __len__(self):
+        '''The (estimated) number of distinct hashes added.
+        '''
+        fill = self._fill()
+        if fill >= 1:
+            return self.capacity # saturated
+        return int(round(-self.bits / self.hashes * math.log(1 - fill)))
+
+
+    def false_positive_rate(self):
+        '''The expected rate of false positives with the hashes added
+        so far (more than `error` if the capacity is exceeded).
+        '''
+        return self._fill()**self.hashes
+
+
+    def nbytes(self):
+        '''The memory used by the filter (in bytes).
+        '''
+        return len(self._table)
+
+
+class Dedup:
+    '''The deduplication of the lines processed by a Processor (see
+    Processor.enableDedup()). The sentences seen are kept exactly (in
+    a HashSet) or, with a capacity, in a BloomFilter.
+    '''
+
+    def __init__(self, capacity=None, error=0.001):
+        '''Create a new deduplication (without any sentences seen).
+
+        Arguments
+        ---------
+        capacity : int
+            Use a Bloom filter for about this number of distinct
+            sentences (None means to keep all hashes exactly).
+        error : float
+            The rate of false positives of the Bloom filter.
+        '''
+        self.capacity, self.error = capacity, error
+        self.seen = self.new_set()
+
+
+    def new_set(self):
+        '''A new (empty) set of hashes of the kind used.
+        '''
+        if self.capacity is None:
+            return HashSet()
+        return BloomFilter(self.capacity, self.error)
+
+
+    def filter(self, lines, split_ids=True):
+        '''Drop the repetitions of sentences seen before (in earlier
+        lines or in the same block).
+
+        Arguments
+        ---------
+        lines : list of str
+            A block of lines.
+        split_ids : bool
+            The lines start with sentence IDs (cf. line_hashes()).
+
+        Result
+        ------
+        list of str
+            The lines with sentences not seen before (in their order).
+        '''
+        hashes = line_hashes(lines, split_ids)
+        seen = self.seen
+        if np is None:
+            kept = []
+            for line, h in zip(lines, hashes):
+                if not seen.contains([h])[0]:
+                    seen.add([h])
+                    kept.append(line)
+            return kept
+        unique, first = np.unique(hashes, return_index=True)
+        new = ~seen.contains(unique)
+        seen.add(unique[new])
+        keep = np.zeros(len(lines), dtype=bool)
+        keep[first[new]] = True
+        return list(itertools.compress(lines, keep.tolist()))
+
+
+    def summary(self, lines, split_ids=True):
+        '''The sentences of some lines (e.g. of a shard), as a new set
+        of hashes (cf. shard_states()).
+        '''
+        summary = self.new_set()
+        lines = iter(lines)
+        for block in iter(lambda: list(itertools.islice(lines, 1 << 16)), []):
+            hashes = line_hashes(block, split_ids)
+            if np is not None:
+                hashes = np.unique(hashes)
+                summary.add(hashes[~summary.contains(hashes)])
+            else:
+                summary.add({h for h, c in zip(hashes, summary.contains(hashes)) if not c})
+        return summary
+
+
+    def shard_states(self, summaries):
+        '''The sentences to start the shards of a file with, so that
+        the same lines are dropped as when processing the whole file
+        at once.
+
+        Arguments
+        ---------
+        summaries : iterable
+            The summary() of every shard (in order).
+
+        Result
+        ------
+        A generator yielding for every shard the hashes seen before
+        that also occur in the shard (a HashSet), or the Bloom filter
+        of the sentences seen before. The sentences of a shard are
+        seen as soon as its state is yielded.
+        '''
+        for summary in summaries:
+            if isinstance(summary, HashSet):
+                state = self.seen.intersection(summary.values())
+            else:
+                state = self.seen.copy()
+            self.seen.merge(summary)
+            yield state
+
+
+    def metadata(self):
+        '''A description of the deduplication (cf. Processor.metadata()).
+        '''
+        if self.capacity is None:
+            return {'method': 'exact', 'sentences': len(self.seen)}
+        return {'method': 'bloom', 'capacity': self.capacity, 'error': self.error,
+                'sentences': len(self.seen),
+                'false_positive_rate': self.seen.false_positive_rate()}
@@ -1,19 +1,69 @@
 # -*- coding: utf-8 -*-
-import os
 import re
+import hashlib
 
 #from text2num import text2num
 # text2num has to be downloaded and in the same dir as the rest of the code
 
+from lazy import LazyModule, LazyAttribute, start_thread
+
+# The libraries below are imported when they are first used (see
+# lazy.py), so that importing this module stays fast.
+
 # num2words supports a wide range of languages, a list can be
 # found on the webpage:
 #   https://pypi.python.org/pypi/num2words
-import num2words
+num2words = LazyModule('num2words')
 
 # digify is an updated version of "text2num".
 # I currently only supports british and american english
-import digify
+digify = LazyModule('digify')
 
+import matchers
+from matches import Match, is_counted, triple_index
+from trie import Trie, prefers_longest
+from units import UnitIndex
+
+
+
+def _load_wordnet():
+    '''Load the WordNet corpus of nltk.
+
+    Result
+    ------
+    WordNetCorpusReader
+        The WordNet, or None if it is not available.
+    '''
+    # make sure that WordNet is available
+    try:
+        from nltk.corpus import wordnet as wn
+        wn.synsets('dog') # try to use wordnet to see if it works
+        #TODO only works if ~/nltk_data/corpora/wordnet/ exists and contains all files --> script!
+    except Exception:
+        wn = None
+    return wn
+
+
+def _wordnet_version():
+    '''Read the version of the WordNet corpus of nltk from its data
+    files, without loading the corpus (cf.
+    WordNetCorpusReader.get_version()).
+
+    Result
+    ------
+    str
+        The version, or None if WordNet is not available.
+    '''
+    try:
+        from nltk.data import find
+        with find('corpora/wordnet/data.adj').open(encoding='utf8') as f:
+            for line in f:
+                m = re.search(r'Word[nN]et (\d+|\d+\.\d+) Copyright', line)
+                if m is not None:
+                    return m.group(1)
+    except Exception:
+        pass
+    return None
 
 
 
@@ -31,6 +81,44 @@ class Language:
     }
 
 
+    '''The categories a unit may belong to, together with a flag
+    stating whether the category is discrete (True) or continuous
+    (False). A unit is assigned the first category it belongs to.'''
+    unit_categories = [
+        ('time_period', False),
+        ('time_unit', False),
+        ('linear_unit', False),
+        ('magnitude_relation', False),
+        ('monetary_unit', False),
+        ('organism', True),
+        ('human_activity', True),
+        ('group', True),
+        ('location', True),
+        ('transport', True),
+        ('material', True),
+        ('unit_of_measurement', False)
+    ]
+    _discrete = dict(unit_categories)
+
+
+    '''The UnitIndex used to look up the category of units (None
+    means that all units are excluded).'''
+    unit_index = None
+
+
+    '''Compile lists of alternative words into tries.'''
+    _use_trie_flag = True
+
+
+    '''The thread started by warm_up() (None if not started).'''
+    _warm_up_thread = None
+
+
+    '''The engine finding the numerals in a line: 'regex' or 'tokens'
+    (see matchers.py and set_matcher()).'''
+    matcher = 'regex'
+
+
     @classmethod
     def create(cls,language):
         '''A convenience function to instantiate a language from a
@@ -71,24 +159,218 @@ class Language:
         # [p] changed regex to include word before and after number!
 
         words = self.numberwords_range(min,max) # uses method below to return list of numberwords
-        _numberwords_pattern = r'(?i)' + r'\b(?P<numword>' + '|'.join(words)+ r')\b'
+        self._numberwords = words
+        # number words are listed from max to min (see numberwords_range),
+        # so their values are known without converting them; matches
+        # are looked up case folded (matching ignores case, and accepts
+        # variants like the long s, which casefold() normalizes as well)
+        self._numberword_values = {word.casefold(): value for word, value
+                                   in zip(words, range(max, min-1, -1))}
+        _numberwords_pattern = r'\b(?P<numword>' + self._alternation(words) + r')\b'
         
         prec_approx = ['exactly', 'precisely', 'to be precise']
-        impr_approx = ['about', 'approximately', 'roughly', 'around', 'or so', 'round about', 'roughly around', 'some']
+        # 'roughly around' has to come before 'roughly' to be
+        # matched as a trie (for the matches it makes no difference,
+        # as 'roughly' can only be used if a numeral follows)
+        impr_approx = ['about', 'approximately', 'roughly around', 'roughly', 'around', 'or so', 'round about', 'some']
         asym_approx = ['more than', 'nearly', 'over', 'almost', 'approaching', 'below', 'above', 'fewer than', 'less than', 'at most', 'at least', 'close to', 'near to', 'up to', 'as high as', 'as low as', 'not quite']
-        _prec_approx_pattern = r'(?P<precise>' + '|'.join(prec_approx) + r')'
-        _impr_approx_pattern = r'(?P<imprecise>' + '|'.join(impr_approx) + r')'
-        _asym_approx_pattern = r'(?P<asymmetr>' + '|'.join(asym_approx) + r')'
+        _prec_approx_pattern = r'(?P<precise>' + self._alternation(prec_approx) + r')'
+        _impr_approx_pattern = r'(?P<imprecise>' + self._alternation(impr_approx) + r')'
+        _asym_approx_pattern = r'(?P<asymmetr>' + self._alternation(asym_approx) + r')'
+        self._approximators = [('prec', prec_approx), ('impr', impr_approx), ('asym', asym_approx)]
         _approx_pattern = r'(?P<approximator>(' + _prec_approx_pattern  + '|' + _impr_approx_pattern + '|' + _asym_approx_pattern + r') )?' # letzte aenderung: added space here since otherwise null-numeral without space at the beginning (beginning of sentence) can't be matched
         
-        _numeral_pattern = '(' + _numbers_pattern + '|' + _numberwords_pattern + r')(?! (hundred|thousand|million|billion|bn|bln)|\.\d+|\,\d+|\:\d+)' # letzte aenderung: hinzugefügter doppelpunkt
+        magnitudes = ['hundred', 'thousand', 'million', 'billion', 'bn', 'bln']
+        _exclusion_pattern = r'(?! (' + self._alternation(magnitudes) + r')|\.\d+|\,\d+|\:\d+)' # letzte aenderung: hinzugefügter doppelpunkt
+        _numeral_pattern = '(' + _numbers_pattern + '|' + _numberwords_pattern + r')' + _exclusion_pattern
         
         _unit_pattern = r'[ -]?(?P<unit>[^\s]+)' # letzte hinzugefuegte aenderung: bindestrich
+        # the parts following an approximator, used by the token matcher
+        self._number_pattern = _numbers_pattern
+        self._tail_pattern = _exclusion_pattern + _unit_pattern + r'\b'
         
-        self._complex_regex = re.compile(_approx_pattern + _numeral_pattern + _unit_pattern + r'\b') 
-        
+        # A line can only contain a numeral if it contains a digit or
+        # the first token of a number word (the prefilter). Only the
+        # existence of a match counts here, so the order of the
+        # alternatives does not matter.
+        starts = Trie(sorted(set(re.match(r'\w*', word).group(0) for word in words)))
+        self._candidate_regex = re.compile(r'\d|\b(?:' + starts.pattern() + r')\b', re.IGNORECASE)
+
+        # matching is case insensitive (this used to be an inline (?i)
+        # in the number word pattern, which always applied to the
+        # whole expression and is an error in recent Python versions)
+        self._complex_regex = re.compile(_approx_pattern + _numeral_pattern + _unit_pattern + r'\b', re.IGNORECASE)
+        self._matcher = matchers.engines[self.matcher](self)
+
+
+    def set_matcher(self, matcher):
+        '''Select the engine finding the numerals in a line (see
+        matchers.py). Both engines find the same matches; the token
+        matcher is faster. Select the engine before creating a
+        Processor for this language.
+
+        Arguments
+        ---------
+        matcher : str
+            'regex' or 'tokens'.
+
+        Raises
+        ------
+        ValueError
+            The engine is unknown.
+        '''
+        if matcher not in matchers.engines:
+            raise ValueError('unknown matcher "{}"'.format(matcher))
+        self.matcher = matcher
+        if hasattr(self, '_complex_regex'):
+            self._matcher = matchers.engines[matcher](self)
+
+    def unit_category(self, unit):
+        '''Determine the unit category of a unit.
+
+        Arguments
+        ---------
+        unit : str
+            The unit, i.e. the word following a numeral.
+
+        Result
+        ------
+        str or None
+            The first of the unit_categories the unit belongs to,
+            or None if the unit is in none of them.
+        '''
+        if self.unit_index is None:
+            return None
+        return self.unit_index.category(unit)
+
+
+    def fingerprint(self):
+        '''A fingerprint of the configuration of this language as set
+        up by precompile_regex(): the compiled regular expressions, the
+        values of the number words and the classification of units.
+        Languages with the same fingerprint find the same matches in
+        every line (cf. cache.py).
+
+        Result
+        ------
+        str
+            The fingerprint (a hexadecimal SHA-1 digest).
+        '''
+        parts = [type(self).__name__, self._candidate_regex.pattern,
+                 self._complex_regex.pattern,
+                 repr(sorted(self._numberword_values.items())),
+                 repr(self.unit_categories),
+                 self.unit_index.fingerprint() if self.unit_index is not None else '']
+        return hashlib.sha1(u'\n'.join(parts).encode('utf8')).hexdigest()
+
+
+    def warm_up(self):
+        '''Start loading the resources needed to classify units (i.e.
+        WordNet) in a background thread, so that loading overlaps with
+        other work (like compiling the regular expressions). The
+        thread has to be finished (see join_warm_up()) before forking
+        worker processes.
+
+        Result
+        ------
+        threading.Thread
+            The thread loading the resources.
+        '''
+        if self.unit_index is not None:
+            self._warm_up_thread = start_thread(self.unit_index.prepare)
+        return self._warm_up_thread
 
-    def match_expression(self, line):
+
+    def join_warm_up(self):
+        '''Wait until the resources started loading by warm_up()
+        are loaded.
+        '''
+        if self._warm_up_thread is not None:
+            self._warm_up_thread.join()
+
+
+    def has_numeral_candidate(self, line):
+        '''A quick check whether a line may contain a numeral. Lines for
+        which this returns False will not yield any matches in
+        match_expression().
+
+        Arguments
+        ---------
+        line: str
+            A line of text.
+
+        Result
+        ------
+        bool
+            False if the line contains neither a digit nor the
+            beginning of a number word.
+        '''
+        return self._candidate_regex.search(line) is not None
+
+
+    def _alternation(self, words):
+        '''Build a regular expression matching any of the given words.
+        Alternatives are compiled into a trie (see trie.py) if this
+        does not change the order in which they are tried, i.e. if
+        every word comes before all of its prefixes (as it is the case
+        for number words listed from max to min: a number word that
+        is the prefix of another one always denotes a smaller number).
+
+        Arguments
+        ---------
+        words : list of str
+            The alternatives, in the order in which they should be tried.
+
+        Result
+        ------
+        str
+            The regular expression.
+        '''
+        if self._use_trie_flag and prefers_longest(words):
+            return Trie(words).pattern()
+        return '|'.join(words)
+
+
+    def iter_matches(self, line, lineno=0):
+        '''Find all numerals (followed by a unit) in a given line.
+
+        Arguments
+        ---------
+        line: str
+            A line of text.
+        lineno: int
+            The number of the line (stored in the matches).
+
+        Result
+        ------
+        A generator yielding a Match (see matches.py) for every
+        expression found, including those that are not counted (the
+        unit is excluded or the numeral could not be converted).
+        '''
+        for text, approximator, numeral, kind, unit in self._matcher.finditer(line):
+            category = self.unit_category(unit)
+            value = None
+            if category is not None:
+                if kind == 'num':
+                    try:
+                        value = int(numeral.replace(self.thousandsSeparator, ""))
+                    except ValueError:
+                        pass
+                else:
+                    value = self._numberword_values.get(numeral.casefold())
+                    if value is None:
+                        try:
+                            value = self.convert_numberword(numeral)
+                        except ValueError:
+                            print("couldn't convert numberword:",numeral)
+
+            yield Match(lineno, text, approximator, value, kind,
+                        None if value is None else value % 5 == 0, unit,
+                        category, None if category is None else self._discrete[category],
+                        numeral)
+
+
+    def match_expression(self, line, writer=None):
         '''
         (1) Match numbers (written as digits) in a given line.
         (2) Match numbers (written as words) in a given line.
@@ -97,215 +379,45 @@ class Language:
         ---------
         line: str
             A line of text.
+        writer: MatchWriter
+            If given, the text of every match is recorded in the
+            classification files of this writer (all_matches.txt,
+            prec_roundnum_dis.txt, ..., excluded.txt, no_int.txt).
  
         Result
         ------
         (1) A list of integers, corresponding to the numbers found in the line.
         (2) A list of integers, corresponding to the numberwords found in the line. 
+        (3) A 12-tuple with the counts of the approximator-roundness-unit
+            combinations (prec_round_dis, prec_round_cont, prec_nonr_dis,
+            prec_nonr_cont, impr_round_dis, ..., null_nonr_cont).
+        (4) The number of asymmetrically modified numerals.
+        (5) A dictionary of unit counts (of the counted numerals).
         '''
-        
-        if not os.path.exists(os.environ['HOMEPATH']+r'\Desktop\Thesis\stats'):
-            os.mkdir(os.environ['HOMEPATH']+r'\Desktop\Thesis\stats')
-            
-        match_objects = []
         numbers = []
         numberwords = []
-        prec_round_dis = 0
-        prec_round_cont = 0
-        prec_nonr_dis = 0
-        prec_nonr_cont = 0
-        impr_round_dis = 0
-        impr_round_cont = 0
-        impr_nonr_dis = 0
-        impr_nonr_cont = 0
-        null_round_dis = 0
-        null_round_cont = 0
-        null_nonr_dis = 0
-        null_nonr_cont = 0
+        tripleMatches = 12*[0]
         asym = 0
         unit_count = {}
-        
-        unit_categories = {'time_period':0,'time_unit':0,'linear_unit':0,'magnitude_relation':0,'monetary_unit':0,'organism':1,'human_activity':1,'group':1,'location':1,'transport':1,'material':1,'unit_of_measurement':0}
-        
-        m_o_iterator = self._complex_regex.finditer(line)
-        
-        for m_o in m_o_iterator:
-            match_objects.append(m_o)
-        
-        for m in match_objects:
-            try:
-                pass
-                # with open(os.environ['HOMEPATH']+r'\Desktop\Thesis\stats\all_matches.txt', 'a') as matches: # [p] look into environment
-                    # matches.write(str(m.group(0))+"\n") # instead of m.groups()
-                # if not m.group('unit') in unit_count:
-                    # unit_count[m.group('unit')] = 1
-                # else: unit_count[m.group('unit')] += 1
-            except UnicodeEncodeError:
-                print("couldn't be written to file:",m.groups()) # pass  
-                
-            try:
-                with open(os.environ['HOMEPATH']+r'\Desktop\Thesis\stats\all_matches.txt', 'a') as matches: # [p] look into environment
-                    matches.write(str(m.group(0))+"\n") # instead of m.groups()
-                    
-                # if not m.group('unit') in unit_count:
-                    # unit_count[m.group('unit')] = 1
-                # else: unit_count[m.group('unit')] += 1
-                
-                for category in unit_categories:
-                    if self.is_in_category(m.group('unit'), category):
-                                   
-                        if m.group('number'):
-                            numberstring = m.group('number').replace(self.thousandsSeparator, "")
-                            try:
-                                numbers.append(int(numberstring))    
-                                if (not int(numberstring)%5):
-                                    if m.group('precise'):
-                                        if unit_categories[category]:
-                                            prec_round_dis += 1
-                                            with open(os.environ['HOMEPATH']+r'\Desktop\Thesis\stats\prec_roundnum_dis.txt', 'a') as nrpd:
-                                                nrpd.write(m.group(0).casefold()+"\n")
-                                        else:
-                                            prec_round_cont += 1
-                                            with open(os.environ['HOMEPATH']+r'\Desktop\Thesis\stats\prec_roundnum_cont.txt', 'a') as nrpc:
-                                                nrpc.write(m.group(0).casefold()+"\n")
-                                    elif m.group('imprecise'):
-                                        if unit_categories[category]:
-                                            print("CATEGORY:",category)
-                                            impr_round_dis += 1
-                                            with open(os.environ['HOMEPATH']+r'\Desktop\Thesis\stats\impr_roundnum_dis.txt', 'a') as nrid:
-                                                nrid.write(m.group(0).casefold()+"\n")
-                                        else:
-                                            impr_round_cont += 1
-                                            with open(os.environ['HOMEPATH']+r'\Desktop\Thesis\stats\impr_roundnum_cont.txt', 'a') as nric:
-                                                nric.write(m.group(0).casefold()+"\n")
-                                    elif m.group('approximator') == None:
-                                        if unit_categories[category]:
-                                            null_round_dis += 1
-                                            with open(os.environ['HOMEPATH']+r'\Desktop\Thesis\stats\null_roundnum_dis.txt', 'a') as nrnd:
-                                                nrnd.write(m.group(0).casefold()+"\n")
-                                        else:
-                                            null_round_cont += 1
-                                            with open(os.environ['HOMEPATH']+r'\Desktop\Thesis\stats\null_roundnum_cont.txt', 'a') as nrnc:
-                                                nrnc.write(m.group(0).casefold()+"\n")
-                                    else: 
-                                        asym +=1
-                                        # print("Asymmetrical approximator count:",m.group(0))
-                                elif int(numberstring)%5:
-                                    if m.group('precise'):
-                                        if unit_categories[category]:
-                                            prec_nonr_dis += 1
-                                            with open(os.environ['HOMEPATH']+r'\Desktop\Thesis\stats\prec_nonrnum_dis.txt', 'a') as nnpd:
-                                                nnpd.write(m.group(0).casefold()+"\n")
-                                        else:
-                                            prec_nonr_cont += 1
-                                            with open(os.environ['HOMEPATH']+r'\Desktop\Thesis\stats\prec_nonrnum_cont.txt', 'a') as nnpc:
-                                                nnpc.write(m.group(0).casefold()+"\n")
-                                    elif m.group('imprecise'):
-                                        if unit_categories[category]:
-                                            impr_nonr_dis += 1
-                                            with open(os.environ['HOMEPATH']+r'\Desktop\Thesis\stats\impr_nonrnum_dis.txt', 'a') as nnid:
-                                                nnid.write(m.group(0).casefold()+"\n")
-                                        else:
-                                            impr_nonr_cont += 1
-                                            with open(os.environ['HOMEPATH']+r'\Desktop\Thesis\stats\impr_nonrnum_cont.txt', 'a') as nnic:
-                                                nnic.write(m.group(0).casefold()+"\n")
-                                    elif m.group('approximator') == None:
-                                        if unit_categories[category]:                                        
-                                            null_nonr_dis += 1
-                                            with open(os.environ['HOMEPATH']+r'\Desktop\Thesis\stats\null_nonrnum_dis.txt', 'a') as nnnd:
-                                                nnnd.write(m.group(0).casefold()+"\n")
-                                        else:
-                                            null_nonr_cont += 1
-                                            with open(os.environ['HOMEPATH']+r'\Desktop\Thesis\stats\null_nonrnum_cont.txt', 'a') as nnnc:
-                                                nnnc.write(m.group(0).casefold()+"\n")
-                                    else:
-                                        asym +=1
-                                        # print("Asymmetrical approximator count:",m.group(0))
-                                else: print("A problem with the number has occurred - seems neither round nor nonround:",m.group(0))
-                            except ValueError:
-                                # pass
-                                with open(os.environ['HOMEPATH']+r'\Desktop\Thesis\stats\no_int.txt', 'a') as no_int:
-                                    no_int.write(m.group(0).casefold()+"\n")
-                                # print('Number seems to be no int:',m.group(0))
-                        elif m.group('numword'):
-                            try:
-                                numberwords.append(self.convert_numberword(m.group('numword')))
-                            except NumberException:
-                                print("couldn't convert numberword:",m.group('numword'))
-                                
-                            if not digify.spelled_num_to_digits(m.group('numword'))%5:
-                                if m.group('precise'):
-                                    if unit_categories[category]:
-                                        prec_round_dis += 1
-                                        with open(os.environ['HOMEPATH']+r'\Desktop\Thesis\stats\prec_roundword_dis.txt', 'a') as wrpd:
-                                            wrpd.write(m.group(0).casefold()+"\n")
-                                    else:
-                                        prec_round_cont += 1
-                                        with open(os.environ['HOMEPATH']+r'\Desktop\Thesis\stats\prec_roundword_cont.txt', 'a') as wrpc:
-                                            wrpc.write(m.group(0).casefold()+"\n")
-                                elif m.group('imprecise'):
-                                    if unit_categories[category]:
-                                        impr_round_dis += 1
-                                        with open(os.environ['HOMEPATH']+r'\Desktop\Thesis\stats\impr_roundword_dis.txt', 'a') as wrid:
-                                            wrid.write(m.group(0).casefold()+"\n")
-                                    else:
-                                        impr_round_cont += 1
-                                        with open(os.environ['HOMEPATH']+r'\Desktop\Thesis\stats\impr_roundword_cont.txt', 'a') as wric:
-                                            wric.write(m.group(0).casefold()+"\n")
-                                elif m.group('approximator') == None:
-                                    if unit_categories[category]:
-                                        null_round_dis += 1
-                                        with open(os.environ['HOMEPATH']+r'\Desktop\Thesis\stats\null_roundword_dis.txt', 'a') as wrnd:
-                                            wrnd.write(m.group(0).casefold()+"\n")
-                                    else:
-                                        null_round_cont += 1
-                                        with open(os.environ['HOMEPATH']+r'\Desktop\Thesis\stats\null_roundword_cont.txt', 'a') as wrnc:
-                                            wrnc.write(m.group(0).casefold()+"\n")
-                                else: 
-                                    asym +=1
-                                    # print("Asymmetrical approximator count:",m.group(0))
-                            elif digify.spelled_num_to_digits(m.group('numword'))%5:
-                                if m.group('precise'):
-                                    if unit_categories[category]:
-                                        prec_nonr_dis += 1
-                                        with open(os.environ['HOMEPATH']+r'\Desktop\Thesis\stats\prec_nonrword_dis.txt', 'a') as wnpd:
-                                            wnpd.write(m.group(0).casefold()+"\n")
-                                    else:
-                                        prec_nonr_cont += 1
-                                        with open(os.environ['HOMEPATH']+r'\Desktop\Thesis\stats\prec_nonrword_cont.txt', 'a') as wnpc:
-                                            wnpc.write(m.group(0).casefold()+"\n")
-                                elif m.group('imprecise'):
-                                    if unit_categories[category]:
-                                        impr_nonr_dis += 1
-                                        with open(os.environ['HOMEPATH']+r'\Desktop\Thesis\stats\impr_nonrword_dis.txt', 'a') as wnid:
-                                            wnid.write(m.group(0).casefold()+"\n")
-                                    else:
-                                        impr_nonr_cont += 1
-                                        with open(os.environ['HOMEPATH']+r'\Desktop\Thesis\stats\impr_nonrword_cont.txt', 'a') as wnic:
-                                            wnic.write(m.group(0).casefold()+"\n")
-                                elif m.group('approximator') == None:
-                                    if unit_categories[category]:
-                                        null_nonr_dis += 1
-                                        with open(os.environ['HOMEPATH']+r'\Desktop\Thesis\stats\null_nonrword_dis.txt', 'a') as wnnd:
-                                            wnnd.write(m.group(0).casefold()+"\n")
-                                    else:
-                                        null_nonr_cont += 1
-                                        with open(os.environ['HOMEPATH']+r'\Desktop\Thesis\stats\null_nonrword_cont.txt', 'a') as wnnc:
-                                            wnnc.write(m.group(0).casefold()+"\n")
-                                else: 
-                                    asym +=1
-                                    # print("Asymmetrical approximator count:",m.group(0))
-                            else: print("A problem with the numberword has occurred - seems neither round nor nonround:",m.group(0))
-                        else: print("Expression has not been processed because neither int number nor numberword:",m.group(0))
-                        break
-                if all(not(self.is_in_category(m.group('unit'),category)) for category in unit_categories): # if the unit is not part of any category
-                    with open(os.environ['HOMEPATH']+r'\Desktop\Thesis\stats\excluded.txt', 'a') as exc: # exclude but record these excluded cases in a file
-                        exc.write(m.group(0)+"\n")
-            except UnicodeEncodeError: 
-                print("COULDN'T WRITE EXPRESSION TO FILE:",m.group(0))
+
+        matches = self.iter_matches(line)
+        if writer:
+            matches = writer.write_matches(matches)
+        for match in matches:
+            if not is_counted(match):
+                continue
+            (numbers if match.kind == 'num' else numberwords).append(match.value)
+            if match.unit:
+                unit_count[match.unit] = unit_count.get(match.unit, 0) + 1
+            index = triple_index(match)
+            if index is None:
+                asym += 1
+            else:
+                tripleMatches[index] += 1
                 
-        return [numbers,numberwords,(prec_round_dis,prec_round_cont,prec_nonr_dis,prec_nonr_cont,impr_round_dis,impr_round_cont,impr_nonr_dis,impr_nonr_cont,null_round_dis,null_round_cont,null_nonr_dis,null_nonr_cont),asym,unit_count]
-        
+        return [numbers,numberwords,tuple(tripleMatches),asym,unit_count]
+
+
 class English(Language):
 
     decimalSeparator = "."
@@ -342,13 +454,17 @@ class English(Language):
 
     _use_num2words_flag = True
     
-    # make sure that WordNet is available
-    try:
-        from nltk.corpus import wordnet as wn
-        wn.synsets('dog') # try to use wordnet to see if it works
-        #TODO only works if ~/nltk_data/corpora/wordnet/ exists and contains all files --> script!
-    except Exception:
-        wn = None
+
+    '''The WordNet corpus reader (None if WordNet is not available).
+    WordNet is loaded when it is first needed.'''
+    wn = LazyAttribute(_load_wordnet)
+
+
+    def __init__(self):
+        self.unit_index = UnitIndex([category for category, _ in self.unit_categories],
+                                    wordnet_loader=lambda: self.wn,
+                                    wordnet_version=_wordnet_version)
+
     
     def is_in_category(self, word, category):
         '''Checks whether 'word' is in 'category' according to the wordNet hierarchy.'''
@@ -401,9 +517,15 @@ class English(Language):
         Raises
         ------
         ValueError
-            The number word was not understood.
+            The number word was not understood (or digify is not
+            available).
         '''
-        return digify.spelled_num_to_digits(numberword)
+        try:
+            return digify.spelled_num_to_digits(numberword)
+        except ValueError:
+            raise
+        except Exception as e: # digify.NumberException, or importing digify failed
+            raise ValueError('could not convert "{}": {}'.format(numberword, e))
 
 
 
@@ -0,0 +1,101 @@
+"""
+Import modules and load resources when they are first used.
+
+Some of the libraries used by this package take long to import or to
+initialize (nltk and its WordNet corpus, matplotlib), but they are
+only needed for some tasks: showing the help, processing German texts
+or running most unit tests does not need WordNet, and only plotting
+needs matplotlib. Deferring them keeps short runs short.
+"""
+
+import importlib
+import threading
+
+
+class LazyModule:
+    '''A placeholder for a module, which is imported when one of
+    its attributes is accessed for the first time.
+    '''
+
+    def __init__(self, name):
+        '''Create a new placeholder.
+
+        Arguments
+        ---------
+        name : str
+            The (absolute) name of the module.
+        '''
+        self._name = name
+        self._module = None
+
+
+    def __getattr__(self, attribute):
+        # only called for attributes of the module, the attributes
+        # of the placeholder itself are found in its __dict__
+        if self._module is None:
+            self._module = importlib.import_module(self._name)
+        return getattr(self._module, attribute)
+
+
+class LazyAttribute(object):
+    '''A class attribute whose value is computed when it is accessed
+    for the first time (from the class or any of its instances). The
+    value is computed only once, even if it is first accessed from
+    several threads at the same time.
+    '''
+
+    def __init__(self, load):
+        '''Create a new attribute.
+
+        Arguments
+        ---------
+        load : callable
+            A function without arguments computing the value.
+        '''
+        self._load = load
+        self._lock = threading.Lock()
+        self._loaded = False
+        self._value = None
+
+
+    def __get__(self, obj, cls=None):
+        if not self._loaded:
+            with self._lock:
+                if not self._loaded:
+                    self._value = self._load()
+                    self._loaded = True
+        return self._value
+
+
+def optional_import(name):
+    '''Import a module, if it is available.
+
+    Arguments
+    ---------
+    name : str
+        The (absolute) name of the module.
+
+    Result
+    ------
+    module
+        The module, or None if it could not be imported.
+    '''
+    try:
+        return importlib.import_module(name)
+    except ImportError:
+        return None
+
+
+def start_thread(target, *args):
+    '''Run a function in a background (daemon) thread, e.g. to load
+    resources while the main thread is busy with something else.
+
+    Result
+    ------
+    threading.Thread
+        The started thread.
+    '''
+    thread = threading.Thread(target=target, args=args)
+    thread.daemon = True
+    thread.start()
+    return thread
@@ -0,0 +1,294 @@
+"""
+Engines finding the numerals (with approximator and unit) in a line.
+
+A Language finds its matches with one of these engines (selected by
+Language.matcher, see Language.set_matcher()). Both find exactly the
+same expressions, as defined by the regular expression compiled in
+Language.precompile_regex(): an optional approximator followed by a
+space, a number or number word not followed by a magnitude or decimal
+digits, and a unit.
+
+regex
+    The RegexMatcher scans the line with this regular expression. It
+    tries the approximators and the number words at every position of
+    the line, so its cost grows with the length of the line and the
+    number of alternatives.
+tokens
+    The TokenMatcher looks only at the tokens (runs of word characters)
+    that may start a numeral: digits and the first words of number
+    words, found in one scan of the lower cased line. Number words are
+    looked up in a trie of their tokens, approximators by their last
+    word in a dictionary. The exclusions (magnitudes, decimals) and the
+    unit are matched with the same parts of the regular expression,
+    anchored at the end of the numeral.
+
+Lines containing characters that match letters of the approximators
+or number words when ignoring case, but do not lower case to them
+(like the long s), are passed to the regular expression.
+
+Every engine yields (text, approximator, numeral, kind, unit) for
+every expression found (cf. Language.iter_matches()).
+"""
+
+import re
+
+from trie import Trie
+
+
+_word = re.compile(r'\w+')
+
+
+def _case_fixes():
+    '''The characters that the re module matches when ignoring case
+    besides those with the same lower case (like the long s for s),
+    as a dictionary from the ordinal of a lower case character to the
+    ordinals of its other case variants.
+    '''
+    try:
+        from re._casefix import _EXTRA_CASES # Python 3.11+
+        return _EXTRA_CASES
+    except ImportError:
+        pass
+    try:
+        import sre_compile
+        return sre_compile._ignorecase_fixes
+    except AttributeError:
+        return {} # Python 2 matches only ASCII letters ignoring case
+
+
+_fixes = _case_fixes()
+
+
+def _unicode_variants(letters):
+    '''The characters that match one of the given (lower case) letters
+    when ignoring case, but do not lower case to one of them. (The
+    characters lower casing to several characters, like the dotted
+    capital I, change the length of the line and are not included.)
+    '''
+    return set(chr(variant) for letter in letters for variant in _fixes.get(ord(letter), ())
+               if chr(variant).lower() not in letters)
+
+
+class RegexMatcher:
+    '''Find the expressions with the regular expression of a Language.
+    '''
+
+    def __init__(self, language):
+        '''Create a new matcher.
+
+        Arguments
+        ---------
+        language : Language
+            The language (after precompile_regex()).
+        '''
+        self._regex = language._complex_regex
+
+
+    def finditer(self, line):
+        '''Find all expressions in a line.
+
+        Arguments
+        ---------
+        line : str
+            A line of text.
+
+        Result
+        ------
+        A generator yielding (text, approximator, numeral, kind, unit)
+        for every expression found (cf. matches.Match).
+        '''
+        for m in self._regex.finditer(line):
+            if m.group('precise'):
+                approximator = 'prec'
+            elif m.group('imprecise'):
+                approximator = 'impr'
+            elif m.group('approximator') is None:
+                approximator = 'null'
+            else:
+                approximator = 'asym'
+            number = m.group('number')
+            yield (m.group(0), approximator, number or m.group('numword'),
+                   'num' if number else 'word', m.group('unit'))
+
+
+class TokenMatcher:
+    '''Find the expressions of a Language with token lookups (see
+    above). The expressions are those of the RegexMatcher: among all
+    possible matches, the one starting first (and, at the same start,
+    the one the regular expression tries first) is taken, and the next
+    one is searched after its end.
+    '''
+
+    def __init__(self, language):
+        '''Create a new matcher.
+
+        Arguments
+        ---------
+        language : Language
+            The language (after precompile_regex()).
+
+        Raises
+        ------
+        ValueError
+            A number word does not start with a word character, or
+            an approximator not with a letter.
+        '''
+        words = [word.lower() for word in language._numberwords]
+        approximators = [(approximator, phrase.lower())
+                         for approximator, phrases in language._approximators
+                         for phrase in phrases]
+        if not all(_word.match(word) for word in words) or \
+           not all(phrase[:1].isalpha() and phrase[-1:].isalpha() for _, phrase in approximators):
+            raise ValueError('the number words and approximators can not be matched as tokens')
+        self._fallback = RegexMatcher(language)
+
+        # the number words as a trie of their tokens (words and single
+        # other characters), with their index in the alternation
+        self._trie = {}
+        for index, word in enumerate(words):
+            node = self._trie
+            for token in re.findall(r'\w+|\W', word):
+                node = node.setdefault(token, {})
+            node.setdefault(None, index) # the first one is tried first
+        self._candidates = re.compile(r'\b(?:(?P<digit>\d)|' + Trie(self._trie).pattern() + r'\b)')
+
+        # the approximators by their last word, with their rank in the
+        # alternation (the regular expression tries them in this order,
+        # followed by no approximator)
+        self._approximators = {}
+        for rank, (approximator, phrase) in enumerate(approximators):
+            last = phrase.rsplit(' ', 1)[-1]
+            self._approximators.setdefault(last, []).append((rank, phrase))
+        self._classes = [approximator for approximator, _ in approximators] + ['null']
+        self._last_lengths = sorted(set(len(last) for last in self._approximators))
+        self._reach = max(len(phrase) for _, phrase in approximators) + 1 if approximators else 0
+
+        self._number = re.compile(language._number_pattern + language._tail_pattern,
+                                  re.IGNORECASE)
+        self._tail = re.compile(language._tail_pattern, re.IGNORECASE)
+
+        variants = _unicode_variants(set(''.join(words + [phrase for _, phrase in approximators])))
+        self._variants = re.compile('[' + ''.join(re.escape(c) for c in sorted(variants)) + ']') \
+            if variants else None
+
+
+    def finditer(self, line):
+        '''Find all expressions in a line.
+
+        Arguments
+        ---------
+        line : str
+            A line of text.
+
+        Result
+        ------
+        A generator yielding (text, approximator, numeral, kind, unit)
+        for every expression found (cf. matches.Match).
+        '''
+        lower = line.lower()
+        if len(lower) != len(line) or (self._variants is not None and self._variants.search(line)):
+            for match in self._fallback.finditer(line):
+                yield match
+            return
+
+        candidates = [(m.start(), m.group('digit') is not None)
+                      for m in self._candidates.finditer(lower)]
+        numerals = {}
+        position = 0
+        k, n = 0, len(candidates)
+        while k < n:
+            q, digit = candidates[k]
+            k += 1
+            if q < position:
+                continue
+            best = self._first_match(line, lower, q, digit, position, numerals)
+            if best is None:
+                continue
+            # the approximator of a numeral further right may start
+            # before this match (or at the same position)
+            for q, digit in candidates[k:]:
+                if q - self._reach > best[0]:
+                    break
+                other = self._first_match(line, lower, q, digit, position, numerals)
+                if other is not None and other[:2] < best[:2]:
+                    best = other
+            start, rank, (numeral, kind, unit, end) = best
+            yield line[start:end], self._classes[rank], numeral, kind, unit
+            position = end
+
+
+    def _first_match(self, line, lower, q, digit, position, numerals):
+        '''The first match (in the order of the regular expression)
+        with the numeral starting at q, starting at or after position.
+
+        Result
+        ------
+        (start, rank, numeral) or None
+            The start of the match, the rank of its approximator and
+            the result of _numeral().
+        '''
+        if q in numerals:
+            numeral = numerals[q]
+        else:
+            numeral = numerals[q] = self._numeral(line, lower, q, digit)
+        if numeral is None:
+            return None
+        best = (q, len(self._classes) - 1, numeral)
+        if q > 0 and lower[q - 1] == ' ':
+            for length in self._last_lengths:
+                if length >= q:
+                    break
+                for rank, phrase in self._approximators.get(lower[q - 1 - length:q - 1], ()):
+                    start = q - 1 - len(phrase)
+                    if start >= position and (start, rank) < best[:2] and \
+                       lower.startswith(phrase, start):
+                        best = (start, rank, numeral)
+        return best
+
+
+    def _numeral(self, line, lower, q, digit):
+        '''The numeral starting at q, followed by a unit.
+
+        Result
+        ------
+        (numeral, kind, unit, end) or None
+            The numeral (as written), its kind ('num' or 'word'), the
+            unit and the end of the match.
+        '''
+        if digit:
+            m = self._number.match(line, q)
+            if m is None:
+                return None
+            return m.group('number'), 'num', m.group('unit'), m.end()
+        for end in self._numberwords(lower, q):
+            m = self._tail.match(line, end)
+            if m is not None:
+                return line[q:end], 'word', m.group('unit'), m.end()
+        return None
+
+
+    def _numberwords(self, lower, q):
+        '''The ends of the number words starting at q, in the order in
+        which the regular expression tries them.
+        '''
+        node, p, found = self._trie, q, []
+        while True:
+            m = _word.match(lower, p)
+            if m is not None:
+                token, end = m.group(), m.end()
+            elif p < len(lower):
+                token, end = lower[p], p + 1
+            else:
+                break
+            node = node.get(token)
+            if node is None:
+                break
+            p = end
+            if None in node:
+                found.append((node[None], p))
+        found.sort()
+        return [end for _, end in found]
+
+
+'''The matcher engines by name.'''
+engines = {'regex': RegexMatcher, 'tokens': TokenMatcher}
@@ -0,0 +1,81 @@
+"""
+Records describing individual matches of numerals.
+
+Languages and Processors yield one Match per expression found in the
+text (see `Language.iter_matches()` and `Processor.iter_matches()`).
+Everything else (counting, writing match files, plotting) consumes
+this stream of records.
+"""
+
+from collections import namedtuple
+
+
+'''A single match of a (possibly approximated) numeral followed by a unit.
+
+line : int
+    The number of the line containing the match (counted from 0).
+text : str
+    The text of the whole match (approximator, numeral and unit).
+approximator : str
+    The class of the approximator: 'prec' (precise, e.g. "exactly"),
+    'impr' (imprecise, e.g. "about"), 'asym' (asymmetric, e.g.
+    "more than") or 'null' (no approximator).
+value : int
+    The value of the numeral. None if it could not be determined
+    (the number could not be converted or the unit is excluded).
+kind : str
+    'num' for numbers written as digits, 'word' for number words.
+round : bool
+    Whether the value is round (a multiple of 5). None if the
+    value is None.
+unit : str
+    The word following the numeral.
+category : str
+    The unit category (cf. `Language.unit_categories`) or None
+    if the unit does not belong to any category (excluded).
+discrete : bool
+    Whether the unit category is discrete. None for excluded units.
+numeral : str
+    The numeral as it is written in the text.
+'''
+Match = namedtuple('Match', ['line', 'text', 'approximator', 'value', 'kind',
+                             'round', 'unit', 'category', 'discrete', 'numeral'])
+
+
+'''The symmetric approximator classes, in the order used for the
+approximator-roundness-unit counts.'''
+approximator_classes = ('prec', 'impr', 'null')
+_approximator_index = {name: i for i, name in enumerate(approximator_classes)}
+
+
+def is_counted(match):
+    '''Check whether a match counts as a numeral (its value is known
+    and its unit belongs to a category).
+    '''
+    return match.value is not None and match.category is not None
+
+
+def triple_index(match):
+    '''The index of a counted match with a symmetric approximator in
+    the approximator-roundness-unit counts (prec_round_dis,
+    prec_round_cont, prec_nonr_dis, ..., null_nonr_cont).
+
+    Result
+    ------
+    int or None
+        The index (0-11) or None for asymmetric approximators.
+    '''
+    index = _approximator_index.get(match.approximator)
+    if index is None:
+        return None
+    return 4*index + 2*(not match.round) + (not match.discrete)
+
+
+def match_file(match):
+    '''The name of the classification file a counted match with a
+    symmetric approximator is recorded in (e.g. "impr_roundnum_dis").
+    '''
+    return '{0}_{1}{2}_{3}'.format(match.approximator,
+                                   'round' if match.round else 'nonr',
+                                   match.kind,
+                                   'dis' if match.discrete else 'cont')
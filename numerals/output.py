@@ -0,0 +1,226 @@
+from __future__ import print_function
+
+import io
+import os
+import shutil
+
+from matches import match_file
+
+
+def default_directory():
+    '''The directory that match files are written to if no other
+    directory is given. For historical reasons, this is
+    "Desktop/Thesis/stats" in the user's home on Windows (if HOMEPATH
+    is set) and "stats" in the current working directory otherwise.
+
+    Result
+    ------
+    str
+        The path to the default match directory.
+    '''
+    if 'HOMEPATH' in os.environ:
+        return os.path.join(os.environ['HOMEPATH'], 'Desktop', 'Thesis', 'stats')
+    return os.path.join(os.getcwd(), 'stats')
+
+
+class MatchWriter:
+    '''A MatchWriter records the text of individual matches in a set of
+    classification files (all_matches.txt, prec_roundnum_dis.txt,
+    excluded.txt, ...) in a common directory.
+
+    Each file is opened (in append mode) on its first use and then kept
+    open, writing through a large buffer. The buffers are flushed
+    every `flush_interval` writes, on `flush()` and on `close()`.
+    A disabled MatchWriter silently discards everything, which is
+    useful if only the counts are of interest.
+    '''
+
+    # The size of the output buffer of each file (in bytes).
+    buffer_size = 1 << 20
+
+    # Flush all files after this number of writes.
+    flush_interval = 100000
+
+
+    def __init__(self, directory=None, enabled=True, encoding=None):
+        '''Create a new MatchWriter.
+
+        Arguments
+        ---------
+        directory : str
+            The directory to put the match files in. It will be
+            created when the first file is opened. If None,
+            the `default_directory()` is used.
+        enabled : bool
+            If False, nothing will be written at all.
+        encoding : str
+            The encoding of the match files (None means the
+            preferred encoding of the platform).
+        '''
+        self.directory = default_directory() if directory is None else directory
+        self.enabled = enabled
+        self.encoding = encoding
+        self._streams = {}
+        self._writes = 0
+
+
+    def __bool__(self):
+        return self.enabled
+
+    __nonzero__ = __bool__
+
+
+    def __enter__(self):
+        return self
+
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+    def _stream(self, name):
+        '''Get the (open) stream for the match file `name`.
+        '''
+        stream = self._streams.get(name)
+        if stream is None:
+            if not os.path.isdir(self.directory):
+                os.makedirs(self.directory)
+            path = os.path.join(self.directory, name + '.txt')
+            stream = io.open(path, 'a', buffering=self.buffer_size,
+                             encoding=self.encoding)
+            self._streams[name] = stream
+        return stream
+
+
+    def write(self, name, text):
+        '''Write one match to a match file.
+
+        Arguments
+        ---------
+        name : str
+            The name of the match file, without the ".txt" suffix
+            (e.g. "all_matches" or "prec_roundnum_dis").
+        text : str
+            The text of the match. A newline will be appended.
+
+        Raises
+        ------
+        UnicodeEncodeError
+            The text can not be represented in the file encoding.
+        '''
+        if not self.enabled:
+            return
+        self._stream(name).write(text + "\n")
+        self._writes += 1
+        if self._writes >= self.flush_interval:
+            self.flush()
+
+
+    def write_match(self, match):
+        '''Record a match in the match files: every match goes to
+        all_matches.txt and to one of excluded.txt (the unit is not
+        in any category), no_int.txt (the number could not be
+        converted) or the classification file of the match (e.g.
+        prec_roundnum_dis.txt). Matches with asymmetric approximators
+        are not classified.
+
+        Arguments
+        ---------
+        match : Match
+            The match to record (see matches.py).
+
+        Raises
+        ------
+        UnicodeEncodeError
+            The text can not be represented in the file encoding.
+        '''
+        if not self.enabled:
+            return
+        self.write('all_matches', match.text)
+        if match.category is None:
+            self.write('excluded', match.text)
+        elif match.value is None:
+            if match.kind == 'num':
+                self.write('no_int', match.text.casefold())
+        elif match.approximator != 'asym':
+            self.write(match_file(match), match.text.casefold())
+
+
+    def write_matches(self, matches):
+        '''Record matches in the match files (see write_match()).
+        Matches whose text can not be represented in the file encoding
+        are reported and left out (they are not counted either).
+
+        Arguments
+        ---------
+        matches : iterable of Match
+            The matches to record.
+
+        Result
+        ------
+        list of Match
+            The matches recorded.
+        '''
+        written = []
+        for match in matches:
+            try:
+                self.write_match(match)
+            except UnicodeEncodeError:
+                print("COULDN'T WRITE EXPRESSION TO FILE:", match.text)
+                continue
+            written.append(match)
+        return written
+
+
+    def flush(self):
+        '''Flush the buffers of all open match files.
+        '''
+        for stream in self._streams.values():
+            stream.flush()
+        self._writes = 0
+
+
+    def close(self):
+        '''Flush and close all open match files. The writer can still
+        be used afterwards, files will then be reopened on demand.
+        '''
+        streams, self._streams = self._streams, {}
+        self._writes = 0
+        error = None
+        for stream in streams.values():
+            # make sure that every file gets closed, even if
+            # flushing one of them fails
+            try:
+                stream.close()
+            except (IOError, OSError) as e:
+                error = error or e
+        if error is not None:
+            raise error
+
+
+    def append(self, directory, remove=True):
+        '''Append the match files of another directory (e.g. written
+        by another MatchWriter) to the files of this writer and
+        remove that directory afterwards.
+
+        Arguments
+        ---------
+        directory : str
+            The directory containing the match files to append.
+        remove : bool
+            Remove the directory (set this to False to keep it,
+            e.g. in a cache).
+        '''
+        if not os.path.isdir(directory):
+            return
+        if self.enabled:
+            # everything written so far has to go first
+            self.close()
+            if not os.path.isdir(self.directory):
+                os.makedirs(self.directory)
+            for name in sorted(os.listdir(directory)):
+                with io.open(os.path.join(directory, name), 'rb') as source:
+                    with io.open(os.path.join(self.directory, name), 'ab') as target:
+                        shutil.copyfileobj(source, target, self.buffer_size)
+        if remove:
+            shutil.rmtree(directory)
@@ -0,0 +1,365 @@
+"""
+Process a corpus file with several worker processes.
+
+The file is split into shards (byte ranges starting and ending at line
+boundaries). Each shard is processed in a worker process with its own
+Language object and compiled regular expressions. The Results of the
+shards are merged in the order of the shards, so that they are
+identical to the Results of processing the whole file at once. The
+same holds for the match files: every worker writes its matches into
+a separate directory, which is appended to the main match files once
+the shard is done.
+
+If the processor drops repeated lines (see dedup.py), this is done in
+two phases: first the workers collect the sentences of their shards,
+then every shard is processed starting from the sentences of the
+earlier shards it contains (cf. Dedup.shard_states()), so that the
+same lines are dropped as by a single process.
+
+If the processor uses memory mapped files, the corpus file is mapped
+once before the worker processes are started. Workers created by
+forking share this mapping, other workers map the file themselves.
+"""
+
+from __future__ import print_function
+
+import io
+import os
+import sys
+import shutil
+import multiprocessing
+
+import corpus
+
+
+def shard_ranges(path, shards, start=0):
+    '''Split a file into shards of roughly equal size.
+
+    Arguments
+    ---------
+    path : str
+        The name of the file to split.
+    shards : int
+        The desired number of shards. The actual number may be
+        smaller for small files.
+    start : int
+        The position to start at (the beginning of a line), e.g.
+        to split only the rest of a file.
+
+    Result
+    ------
+    list of (int, int)
+        The byte ranges (start, end) of the shards. Every shard
+        starts at the beginning of a line and ends after the end
+        of a line (or at the end of the file).
+    '''
+    size = os.path.getsize(path)
+    bounds = [start]
+    with io.open(path, 'rb') as f:
+        for i in range(1, shards):
+            pos = start + (size - start) * i // shards
+            if pos <= bounds[-1]:
+                continue
+            # move to the beginning of the next line (unless
+            # pos already is the beginning of a line)
+            f.seek(pos - 1)
+            f.readline()
+            pos = f.tell()
+            if bounds[-1] < pos < size:
+                bounds.append(pos)
+    bounds.append(size)
+    return list(zip(bounds[:-1], bounds[1:]))
+
+
+class ShardReader(io.RawIOBase):
+    '''A raw stream reading a byte range of a file.
+    '''
+
+    def __init__(self, path, start, end):
+        self._file = io.open(path, 'rb', buffering=0)
+        self._file.seek(start)
+        self._position = start
+        self._end = end
+
+
+    def readable(self):
+        return True
+
+
+    def readinto(self, b):
+        n = min(len(b), self._end - self._position)
+        if n <= 0:
+            return 0
+        data = self._file.read(n)
+        b[:len(data)] = data
+        self._position += len(data)
+        return len(data)
+
+
+    def close(self):
+        self._file.close()
+        super(ShardReader, self).close()
+
+
+def open_shard(path, start, end, encoding="utf8"):
+    '''Open a byte range of a file as text stream. Lines are read in
+    the same way as when opening the whole file in text mode.
+
+    Arguments
+    ---------
+    path : str
+        The name of the file.
+    start, end : int
+        The byte range to read.
+    encoding : str
+        The encoding of the file.
+
+    Result
+    ------
+    A text stream.
+    '''
+    return io.TextIOWrapper(io.BufferedReader(ShardReader(path, start, end), 1 << 20),
+                            encoding=encoding)
+
+
+def shard_directory(directory, index):
+    '''The directory in which a worker writes the match files of
+    a shard.
+    '''
+    return os.path.join(directory, '.shard-{:04d}'.format(index))
+
+
+# The processor of a worker process (see _init_worker()).
+_worker = None
+
+# The MappedCorpus shared with the worker processes.
+_mapping = None
+
+
+def _mapped_corpus(path):
+    '''The MappedCorpus for a file, reusing the shared mapping if
+    possible.
+    '''
+    global _mapping
+    if _mapping is None or _mapping.path != path:
+        if _mapping is not None:
+            _mapping.close()
+        _mapping = corpus.MappedCorpus(path)
+    return _mapping
+
+
+def _close_mapping():
+    '''Close the shared mapping (if any).
+    '''
+    global _mapping
+    if _mapping is not None:
+        _mapping.close()
+        _mapping = None
+
+
+def _init_worker(config):
+    '''Initialize a worker process: create a Language and a Processor
+    with the given configuration.
+
+    Arguments
+    ---------
+    config : dict
+        The configuration of the parent processor (see process()).
+    '''
+    global _worker
+    from processor import Processor
+
+    language = config['language']()
+    language.set_matcher(config['matcher'])
+    if language.unit_index is not None:
+        language.unit_index.update(config['units'])
+        language.unit_index.new_items()
+
+    _worker = Processor(language, *config['range'],
+                        write_matches=config['write_matches'],
+                        ranges=config['ranges'],
+                        unit_capacity=config['unit_capacity'],
+                        head=config['head'], sketch=config['sketch'])
+    _worker.n_low, _worker.n_high = config['n_range']
+    _worker.verbosity = 0
+    _worker._show_progress_flag = False
+    _worker._prefilter_flag = config['prefilter']
+    _worker._use_mmap_flag = config['mmap']
+    _worker.match_writer.encoding = config['encoding']
+    if config['profile']:
+        _worker.enableProfiling()
+    if config['dedup'] is not None:
+        _worker.enableDedup(*config['dedup'])
+
+
+def _hash_shard(task):
+    '''Collect the sentences of a shard for deduplication (this runs
+    in a worker process).
+
+    Arguments
+    ---------
+    task : tuple
+        The task of the shard (cf. _process_shard()).
+
+    Result
+    ------
+    The sentences of the shard (cf. Dedup.summary()).
+    '''
+    path, start, end = task[:3]
+    if _worker._use_mmap_flag:
+        sentences = _mapped_corpus(path).sentences(start, end)
+        return _worker.dedup.summary(sentences, split_ids=False)
+    with open_shard(path, start, end) as lines:
+        return _worker.dedup.summary(lines)
+
+
+def _process_shard(task):
+    '''Process a single shard (this runs in a worker process).
+
+    Arguments
+    ---------
+    task : (str, int, int, str, object)
+        The name of the file, the byte range of the shard, the
+        directory for the match files and the sentences seen before
+        (for deduplication, cf. Dedup.shard_states(), else None).
+
+    Result
+    ------
+    (Results, list, Profile)
+        The Results for the shard, the units that have been newly
+        classified while processing it and the profile of the
+        shard (None if profiling is not enabled).
+    '''
+    path, start, end, directory, seen = task
+    _worker.match_writer.directory = directory
+    if seen is not None:
+        _worker.dedup.seen = seen
+    results = _worker.newResults()
+    try:
+        if _worker._use_mmap_flag:
+            sentences = _mapped_corpus(path).sentences(start, end)
+            _worker.processLines(sentences, results, split_ids=False)
+        else:
+            with open_shard(path, start, end) as lines:
+                _worker.processLines(lines, results)
+    finally:
+        _worker.close()
+
+    unit_index = _worker.language.unit_index
+    units = unit_index.new_items() if unit_index is not None else []
+    profile = _worker.profile.detach() if _worker.profile is not None else None
+    return results, units, profile
+
+
+def process(processor, path, jobs, shards=None, start=0, results=None,
+            ranges=None, done=None):
+    '''Process a file using several worker processes.
+
+    Arguments
+    ---------
+    processor : Processor
+        The processor providing the configuration (language, range,
+        match output). Its match files are extended and newly
+        classified units are added to the unit index of its language.
+    path : str
+        The name of the file to process.
+    jobs : int
+        The number of worker processes.
+    shards : int
+        The number of shards to split the file into (default:
+        4 shards per job, to keep all workers busy).
+    start : int
+        The position in the file to start at.
+    results : Results
+        The Results to add the shards to (e.g. the Results up to
+        `start` restored from a checkpoint).
+    ranges : list of (int, int)
+        The byte ranges of the shards (instead of splitting the file
+        from `start` into `shards` shards).
+    done : callable
+        A function called for every shard (in order) with the index
+        of the shard, its Results and the directory of its match files
+        (before they are appended to the match files of the processor).
+
+    If the processor saves checkpoints, they are saved after a shard
+    has been added to the Results.
+
+    If the processor drops repeated lines, the shards are read twice:
+    once to collect their sentences, and once to process them.
+
+    Result
+    ------
+    Results
+        The merged Results of all shards.
+    '''
+    language = processor.language
+    writer = processor.match_writer
+    unit_index = language.unit_index
+    config = {
+        'language': type(language),
+        'matcher': language.matcher,
+        'units': unit_index.items() if unit_index is not None else [],
+        'range': processor._range,
+        'ranges': processor._ranges[1:],
+        'unit_capacity': processor.unit_capacity,
+        'head': processor.head,
+        'sketch': processor.sketch,
+        'n_range': (processor.n_low, processor.n_high),
+        'write_matches': writer.enabled,
+        'encoding': writer.encoding,
+        'prefilter': processor._prefilter_flag,
+        'mmap': processor._use_mmap_flag,
+        'profile': processor.profile is not None,
+        'dedup': None if processor.dedup is None else
+                 (processor.dedup.capacity, processor.dedup.error)
+    }
+    tasks = [(path, shard_start, end, shard_directory(writer.directory, index), None)
+             for index, (shard_start, end) in
+             enumerate(ranges or shard_ranges(path, shards or 4*jobs, start))]
+
+    if results is None:
+        results = processor.newResults()
+    checkpoints = processor.checkpoints
+    # forking while resources are loaded in another thread could leave
+    # the workers with a half loaded WordNet (or a lock that is never
+    # released), so wait for the warm-up (the workers inherit its results)
+    language.join_warm_up()
+    if processor._use_mmap_flag:
+        # map the file before forking, so all workers share the mapping
+        _mapped_corpus(path)
+    pool = multiprocessing.Pool(jobs, _init_worker, (config,))
+    try:
+        if processor.dedup is not None:
+            states = processor.dedup.shard_states(pool.imap(_hash_shard, tasks))
+            tasks = [task[:4] + (seen,) for task, seen in zip(tasks, states)]
+        # one dot per 100000 lines, as when processing in one process
+        dots = -(-results.lines // 100000)
+        for index, (shard_results, new_units, profile) in enumerate(
+                pool.imap(_process_shard, tasks)):
+            results.merge(shard_results)
+            if done is not None:
+                done(index, shard_results, tasks[index][3])
+            if profile is not None:
+                processor.profile.merge(profile)
+                processor.profile.sample(results.lines)
+            writer.append(tasks[index][3])
+            if unit_index is not None:
+                unit_index.update(new_units)
+            if checkpoints is not None:
+                checkpoints.update(processor, results, offset=tasks[index][2])
+            if processor._show_progress_flag:
+                due = -(-results.lines // 100000)
+                sys.stderr.write('.' * (due - dots) if processor.verbosity > 0 else
+                                 r'{}\r'.format(results.lines))
+                sys.stderr.flush()
+                dots = due
+        pool.close()
+    except BaseException:
+        pool.terminate()
+        for task in tasks:
+            shutil.rmtree(task[3], ignore_errors=True)
+        raise
+    finally:
+        pool.join()
+        _close_mapping()
+    return results
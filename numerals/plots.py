@@ -0,0 +1,234 @@
+"""
+Plot the histograms of Results.
+
+For every range, three bar charts are drawn: the frequencies of all
+numerals (numbers and number words), of numbers and of number words.
+Small ranges get one bar per value. Wider ranges are downsampled to a
+fixed number of bins (of equal width or, on a logarithmic scale, of
+growing width), so drawing takes time in the number of bins, not in
+the size of the range.
+
+The plots are either shown (interactively) or exported to files (PNG,
+SVG, PDF, ...). Exporting uses the non-interactive Agg backend of
+matplotlib, so it also works on servers without a display.
+"""
+
+from __future__ import print_function
+
+import os
+import math
+
+from counter import Counter, CountMinSketch
+from lazy import optional_import
+
+
+'''Ranges with more values than this are drawn in bins.'''
+max_bars = 1000
+
+'''The number of bins of logarithmic plots (if not given).'''
+log_bins = 100
+
+'''The charts drawn for each range: name (used in file names), title.'''
+charts = [('all', 'numbers + numberwords frequency'),
+          ('numbers', 'numbers frequency'),
+          ('numberwords', 'numberwords frequency')]
+
+
+def pyplot(export=False):
+    '''Import matplotlib.pyplot (this takes long, so it is only done
+    when plotting).
+
+    Arguments
+    ---------
+    export : bool
+        Select the non-interactive Agg backend (for exporting plots
+        to files).
+
+    Result
+    ------
+    module
+        matplotlib.pyplot, None if matplotlib is not installed.
+    '''
+    matplotlib = optional_import('matplotlib')
+    if matplotlib is None:
+        return None
+    if export:
+        matplotlib.use('Agg')
+    return optional_import('matplotlib.pyplot')
+
+
+def bin_edges(low, high, bins=None, log=False):
+    '''Split a range of values into bins.
+
+    Arguments
+    ---------
+    low, high : int
+        The range (inclusive).
+    bins : int
+        The (maximal) number of bins. By default, there is one bin per
+        value for ranges of up to max_bars values, and max_bars bins
+        (log_bins on a logarithmic scale) otherwise.
+    log : bool
+        Make the bins grow exponentially (for a logarithmic scale).
+        Values below 1 are put into a bin of their own.
+
+    Result
+    ------
+    list of int
+        The edges of the bins: bin i contains the values from edges[i]
+        to edges[i+1]-1.
+    '''
+    size = high - low + 1
+    if size <= 0:
+        return [low]
+    if log and high >= 1:
+        start = max(low, 1)
+        n = min(bins or log_bins, high - start + 1)
+        ratio = math.log(high + 1.0) - math.log(start)
+        edges = [start] + [int(round(start * math.exp(ratio * i / n))) for i in range(1, n)] + [high + 1]
+        edges = ([low] if low < start else []) + sorted(set(edges))
+    else:
+        n = min(bins or (size if size <= max_bars else max_bars), size)
+        edges = sorted(set(low + (size * i) // n for i in range(n + 1)))
+    return edges
+
+
+def histogram(counts, low, high, bins=None, log=False):
+    '''Bin the counts of a range of values.
+
+    Arguments
+    ---------
+    counts : list or Counter
+        The counts: a histogram of the values from 0 (cf. Results.nums)
+        or a Counter.
+    low, high : int
+        The range to bin.
+    bins, log :
+        cf. bin_edges()
+
+    Result
+    ------
+    (list of int, list of int)
+        The edges of the bins and the sum of the counts in each bin.
+        If the counts above the head of a Counter are only estimated
+        (by a CountMinSketch), they are combined into one last bin
+        (their sum is exact).
+    '''
+    if isinstance(counts, Counter) and isinstance(counts.tail, CountMinSketch) and high > counts.head:
+        edges = bin_edges(low, counts.head, bins, log) + [high + 1]
+    else:
+        edges = bin_edges(low, high, bins, log)
+    if isinstance(counts, list):
+        sums = [sum(counts[a:b]) for a, b in zip(edges, edges[1:])]
+    else:
+        sums = [counts.sum(a, b - 1) for a, b in zip(edges, edges[1:])]
+    return edges, sums
+
+
+def plot_range(plt, counter, nums, numwords, low, high, title='', figure=1,
+               bins=None, log=False):
+    '''Draw the bar charts of a range.
+
+    Arguments
+    ---------
+    plt : module
+        matplotlib.pyplot (cf. pyplot()).
+    counter : Counter
+        The counts of all numerals.
+    nums, numwords : list or Counter
+        The histograms of numbers and number words (cf. Results).
+    low, high : int
+        The range.
+    title : str
+        Appended to the titles of the charts.
+    figure : int
+        The number of the first figure (the charts are drawn in this
+        and the next two figures).
+    bins, log :
+        cf. bin_edges()
+
+    Result
+    ------
+    list of (str, Figure)
+        The names (cf. charts) and figures of the charts.
+    '''
+    figures = []
+    for index, ((name, chart_title), counts) in enumerate(zip(charts, [counter, nums, numwords])):
+        edges, sums = histogram(counts, low, high, bins, log)
+        widths = [b - a for a, b in zip(edges, edges[1:])]
+        current = plt.figure(figure + index)
+        plt.title(chart_title + title)
+        if max(widths or [1]) == 1 and not log:
+            plt.bar(edges[:-1], sums) # one bar per value
+        else:
+            plt.bar(edges[:-1], sums, width=widths, align='edge')
+            if log:
+                plt.xscale('symlog' if low < 1 else 'log')
+        figures.append((name, current))
+    return figures
+
+
+def save(plt, figures, directory, prefix='', format='png'):
+    '''Save figures to files (and close them).
+
+    Arguments
+    ---------
+    plt : module
+        matplotlib.pyplot
+    figures : list of (str, Figure)
+        The names and figures (cf. plot_range()).
+    directory : str
+        The directory to save the files to.
+    prefix : str
+        The beginning of the file names (the name of the figure and
+        the file format are appended).
+    format : str
+        The file format (png, svg, pdf, ...).
+
+    Result
+    ------
+    list of str
+        The names of the files.
+    '''
+    if not os.path.isdir(directory):
+        os.makedirs(directory)
+    paths = []
+    for name, figure in figures:
+        path = os.path.join(directory, '{0}{1}.{2}'.format(prefix, name, format))
+        figure.savefig(path, format=format)
+        plt.close(figure)
+        paths.append(path)
+    return paths
+
+
+def export_results(results, metadata, directory, prefix='', format='png', bins=None, log=False):
+    '''Export the charts of all ranges of stored Results (cf. store.py),
+    without processing the corpora again.
+
+    Arguments
+    ---------
+    results : Results
+        The Results (including those of further ranges).
+    metadata : dict
+        The description of the run (cf. Processor.metadata()).
+    directory, prefix, format :
+        cf. save()
+    bins, log :
+        cf. bin_edges()
+
+    Result
+    ------
+    list of str
+        The names of the files.
+    '''
+    plt = pyplot(export=True)
+    if plt is None:
+        raise ImportError('matplotlib is not installed')
+    ranges = [tuple(metadata['n_range'])] + [tuple(r) for r in metadata.get('ranges', [])]
+    paths = []
+    for (low, high), range_results in zip(ranges, [results] + results.ranges):
+        figures = plot_range(plt, range_results.counter, range_results.nums, range_results.numwords,
+                             low, high, ' ({0}-{1})'.format(low, high), bins=bins, log=log)
+        paths.extend(save(plt, figures, directory,
+                          '{0}{1}-{2}-'.format(prefix, low, high), format))
+    return paths
@@ -1,15 +1,14 @@
 from __future__ import print_function
 
 import sys
+import copy
+import itertools
 import locale
 
-from counter import Counter
-
-
-try:
-    import matplotlib.pyplot as plt
-except ImportError:
-    plt = None
+import corpus
+from counter import Counter, CountMinSketch
+from output import MatchWriter
+from results import Results
 
 
 class Processor:
@@ -24,13 +23,44 @@ class Processor:
     n_high = 100
 
     _match_number_words_flag = True
+    _prefilter_flag = True
+    _use_mmap_flag = False
+    _from_wordlist_flag = False
     _show_progress_flag = True
     verbosity = 1
 
+    # The number of lines matched before the matches are added to
+    # the Results (see processLines()).
+    block_lines = 10000
+
     _counter = None
 
+    # The MatchWriter recording individual matches.
+    match_writer = None
+
+    # The Profile measuring the stages of processing (None if
+    # profiling is not enabled, see enableProfiling()).
+    profile = None
+
+    # The Checkpoints of long runs (None if checkpoints are not
+    # enabled, see enableCheckpoints()).
+    checkpoints = None
 
-    def __init__(self, language, min=0, max=100):
+    # The ResultCache of processed chunks of corpus files (None if
+    # caching is not enabled, see enableCache()).
+    cache = None
+
+    # The Sample of the lines to process (None if all lines are
+    # processed, see enableSampling()).
+    sampling = None
+
+    # The Dedup dropping repeated lines (None if all lines are
+    # processed, see enableDedup()).
+    dedup = None
+
+
+    def __init__(self, language, min=0, max=100, match_directory=None,
+                 write_matches=True, ranges=(), unit_capacity=None, head=None, sketch=None):
         '''Create a new Processor.
 
         Arguments
@@ -40,13 +70,77 @@ class Processor:
             The minimal value to count. All smaller values will be ignored.
         max : int
             The maximal value to count. All larger values will be ignored.
+        match_directory : str
+            The directory to write the match files to (None means
+            the default directory, see `output.default_directory()`).
+        write_matches : bool
+            If False, no match files will be written at all. Use this
+            if you are only interested in the counts.
+        ranges : list of (int, int)
+            Further ranges (min, max) to count in the same pass (see
+            _iter_lines()). Their results are available as the
+            `ranges` of the Results (the match files, the match stream
+            of iter_matches() and the return values of processFile()
+            refer to the range min to max only).
+        unit_capacity : int
+            Count only (about) the unit_capacity most frequent units,
+            in bounded memory (see topk.py). None means to count all
+            units exactly.
+        head : int
+            Count the values up to head exactly in dense arrays, and
+            larger values in sparse arrays or a sketch (see Counter).
+            This is meant for very wide ranges (e.g. up to 10^9).
+            Number words are only matched up to head then (converting
+            all number words of such a range is not feasible).
+        sketch : int
+            Count the values above the head approximately (in fixed
+            memory) with Count-Min sketches of this width.
         '''
         self.language = language
-        self._counter = Counter(min=min, max=max)
+        self.unit_capacity = unit_capacity
+        self.head, self.sketch = head, sketch
+        self._range = (min, max)
+        self._ranges = [self._range] + [tuple(r) for r in ranges]
+        self.n_low, self.n_high = min, max
+        self._counters = [Counter(min=low, max=high, head=head, sketch=sketch)
+                          for low, high in self._ranges]
+        self._counter = self._counters[0]
+        self.match_writer = MatchWriter(match_directory, enabled=write_matches)
+        self.results = None
+        self.total = self.newResults() # the Results of all files
+        self.corpora = []              # the corpus files processed
 
         # if self._match_number_words_flag:
             # self.language.precompile_numberwords(min,max)
-        self.language.precompile_regex(min,max)
+        # all ranges are matched with the regular expression for the
+        # widest range (see _iter_lines())
+        lows, highs = zip(*self._ranges)
+        low, high = sorted(lows)[0], sorted(highs)[-1]
+        self.language.precompile_regex(*self._word_range((low, high)))
+        self._narrow = None
+        if len(self._ranges) > 1 or (low, high) != self._range:
+            self._narrow = [self._narrow_language(r) if r != (low, high) else None
+                            for r in self._ranges]
+
+
+    def _word_range(self, range):
+        '''The range of the number words matched for a range of values:
+        up to the head of its Counter (the head, if given, otherwise the
+        dense_limit of Counter), as larger number words can not all be
+        generated in reasonable time (cf. reportStatistics()).
+        '''
+        low, high = range
+        head = low + Counter.dense_limit - 1 if self.head is None else self.head
+        return low, max(low, min(high, head))
+
+
+    def _narrow_language(self, range):
+        '''A copy of the language with the regular expressions for a
+        range, together with the (lower case) number words of that range.
+        '''
+        language = copy.copy(self.language)
+        language.precompile_regex(*self._word_range(range))
+        return language, language._numberword_values
 
 
     def reset(self):
@@ -54,10 +148,234 @@ class Processor:
         Resetting will only affect the counters, but not the
         configuration (range of interest, verbosity, etc.).
         '''
-        self._counter.reset()
+        for counter in self._counters:
+            counter.reset()
+        self.total = self.newResults()
+        self.corpora = []
+
+
+    def close(self):
+        '''Close this processor. This will flush and close all
+        match files.
+        '''
+        self.match_writer.close()
+
+
+    def enableProfiling(self, cprofile=False, memory=False):
+        '''Measure the time spent in the stages of processing (see
+        profiling.py) in all following runs.
+
+        Arguments
+        ---------
+        cprofile : bool
+            Additionally profile all function calls with cProfile.
+        memory : bool
+            Additionally trace memory allocations with tracemalloc.
+
+        Result
+        ------
+        Profile
+            The profile (also available as self.profile).
+        '''
+        from profiling import Profile, TimedPattern
+
+        profile = Profile(cprofile, memory)
+        language = self.language
+        language._candidate_regex = TimedPattern(language._candidate_regex, profile, 'prefilter')
+        language._matcher = TimedPattern(language._matcher, profile, 'regex')
+        profile.instrument(language, 'unit_category', 'unit_category')
+        if language.unit_index is not None:
+            profile.instrument(language.unit_index, 'classify', 'wordnet')
+        if hasattr(language, 'convert_numberword'):
+            profile.instrument(language, 'convert_numberword', 'convert')
+        profile.instrument(self.match_writer, 'write_match', 'write')
+        self.profile = profile
+        return profile
+
+
+    def profileReport(self):
+        '''Report the measurements of profiling.
+
+        Result
+        ------
+        ProfileReport
+            The report (None if profiling is not enabled).
+        '''
+        return None if self.profile is None else self.profile.report()
+
+
+    def enableCheckpoints(self, path, interval=None, resume=False):
+        '''Save checkpoints periodically while processing corpus files
+        (with processPath()), so that an interrupted run can be
+        resumed (see checkpoint.py).
+
+        Arguments
+        ---------
+        path : str
+            The file to store the checkpoints in.
+        interval : float
+            The minimal time (in seconds) between two checkpoints.
+        resume : bool
+            Resume the run saved in the checkpoint file: the overall
+            counts are restored, the match files are cut back to the
+            state of the checkpoint, finished corpus files are skipped
+            and the current file is continued where it was left.
+
+        Result
+        ------
+        Checkpoints
+            The checkpoints (also available as self.checkpoints).
+
+        Raises
+        ------
+        IOError
+            The checkpoint to resume could not be read.
+        ValueError
+            The checkpoint was made with another configuration.
+        '''
+        from checkpoint import Checkpoints
+
+        checkpoints = Checkpoints(path, interval)
+        if resume:
+            checkpoints.load(self)
+        self.checkpoints = checkpoints
+        return checkpoints
+
+
+    def enableCache(self, directory, max_size=None):
+        '''Cache the Results (and match files) of corpus files
+        processed with processPath(), so that only new or changed
+        parts of the files are processed again (see cache.py).
+
+        Arguments
+        ---------
+        directory : str
+            The directory of the cache.
+        max_size : int
+            The maximal size of the cache (in bytes).
+
+        Result
+        ------
+        ResultCache
+            The cache (also available as self.cache).
+        '''
+        from cache import ResultCache
+
+        self.cache = ResultCache(directory, max_size)
+        return self.cache
+
+
+    def enableSampling(self, rate=None, method='uniform', size=None, seed=None, replicates=None):
+        '''Process only a random sample of the lines (see sampling.py).
+        The Results are those of the sample; estimates of the counts of
+        the whole corpus (with confidence intervals) are available from
+        sampleEstimates(). Sampling can not be combined with several
+        jobs, a cache or checkpoints.
+
+        Arguments
+        ---------
+        rate : float
+            The fraction of the lines (or blocks) to process.
+        method : str
+            'uniform', 'reservoir' or 'blocks' (cf. sampling.Sample).
+        size : int
+            The number of lines to process (reservoir sampling).
+        seed : int
+            The seed of the random numbers.
+        replicates : int
+            The number of bootstrap replicates.
+
+        Result
+        ------
+        Sample
+            The sample (also available as self.sampling).
+        '''
+        from sampling import Sample
 
+        self.sampling = Sample(rate, method, size, seed, replicates)
+        return self.sampling
+
+
+    def enableDedup(self, capacity=None, error=0.001):
+        '''Process only the first occurrence of every sentence: repeated
+        lines (of all files processed) are dropped before matching and
+        counted as duplicates in the Results (see dedup.py). With
+        several jobs, the shards are deduplicated in two phases, dropping
+        the same lines as a single process. Deduplication can not be
+        combined with sampling, a cache, checkpoints or word lists
+        (processPath() raises a ValueError).
+
+        Arguments
+        ---------
+        capacity : int
+            Keep the sentences seen in a Bloom filter for about this
+            number of distinct sentences (in fixed memory), instead of
+            keeping their hashes exactly (8 bytes per sentence).
+        error : float
+            The rate of distinct sentences the Bloom filter may drop.
 
-    def processFile(self, inputStream):
+        Result
+        ------
+        Dedup
+            The deduplication (also available as self.dedup).
+        '''
+        from dedup import Dedup
+
+        self.dedup = Dedup(capacity, error)
+        return self.dedup
+
+
+    def sampleEstimates(self):
+        '''Estimate the counts of the whole corpus from the sample
+        (for the range of interest).
+
+        Result
+        ------
+        SampleEstimates
+        '''
+        return self.sampling.estimates(self.n_low, self.n_high)
+
+
+    def metadata(self):
+        '''A description of the runs of this processor, e.g. to be
+        stored with the Results (see store.py).
+
+        Result
+        ------
+        dict
+            The 'language', the 'range' counted, the further 'ranges',
+            the range of interest ('n_range'), the 'unit_capacity', the
+            'head' and 'sketch' of the counts, the 'source' of the counts
+            ('sentences' or 'wordlist'), the 'sample' processed (if any),
+            the deduplication ('dedup', if any) and the 'corpora' processed.
+        '''
+        return {'language': type(self.language).__name__,
+                'range': list(self._range),
+                'ranges': [list(r) for r in self._ranges[1:]],
+                'n_range': [self.n_low, self.n_high],
+                'unit_capacity': self.unit_capacity,
+                'head': self.head, 'sketch': self.sketch,
+                'source': 'wordlist' if self._from_wordlist_flag else 'sentences',
+                'sample': None if self.sampling is None else self.sampling.metadata(),
+                'dedup': None if self.dedup is None else self.dedup.metadata(),
+                'corpora': list(self.corpora)}
+
+
+    def newResults(self):
+        '''Create new (empty) Results suitable for this processor.
+
+        Result
+        ------
+        Results
+        '''
+        results = Results(self.n_high+1, *self._range, unit_capacity=self.unit_capacity,
+                          head=self.head, sketch=self.sketch)
+        results.ranges = [Results(high+1, low, high, self.unit_capacity, self.head, self.sketch)
+                          for low, high in self._ranges[1:]]
+        return results
+
+
+    def processFile(self, inputStream, split_ids=True, results=None):
         '''Process an input stream. This is the main function of
         this class. It will read the stream line by line,
         look for numerals, either provided as numbers, or
@@ -67,142 +385,490 @@ class Processor:
         ---------
         inputStream
             The input stream to read.
+        split_ids : bool
+            Remove the sentence IDs from the lines (cf. iter_matches()).
+        results : Results
+            The Results to continue (e.g. restored from a checkpoint).
+
+        If sampling is enabled, only a sample of the lines is processed.
         '''
-        num = {'lines': 0, 'matches': 0, 'numbers': 0, 'words': 0}
-        nums = (self.n_high+1)*[0] # [p] initialise number count
-        numwords = (self.n_high+1)*[0] # [p] initialise numberword count
-        asym = 0
-        tripleMatches = [0,0,0,0,0,0,0,0,0,0,0,0] # [p] initialise triple count
-        unit_info = {}
-        
         if self.verbosity > 0:
             sys.stderr.write("Starting to process ")
+        if self.sampling is not None:
+            inputStream = self.sampling.select(inputStream)
+
+        if results is None:
+            results = self.newResults()
+        if self.profile is not None:
+            self.profile.start()
+        try:
+            self.processLines(inputStream, results, split_ids)
+        except BaseException:
+            # do not leave half-written buffers behind
+            self.match_writer.close()
+            raise
+        finally:
+            if self.profile is not None:
+                self.profile.stop(results.lines)
+        self.match_writer.flush()
 
-        for sentence in inputStream:
+        return self.finish(results)
+
+
+    def processPath(self, path, jobs=1):
+        '''Process a corpus file.
+
+        Arguments
+        ---------
+        path : str
+            The name of the file to process.
+            Compressed files and Wortschatz archives are read
+            on the fly (see corpus.py).
+        jobs : int
+            The number of worker processes to use. If larger than 1,
+            the file is split into shards that are processed in
+            parallel (see parallel.py). The results are the same
+            as when processing the file with a single process.
+            Compressed files are always processed by a single process.
+
+        If the _use_mmap_flag is set, uncompressed files are mapped
+        into memory (see corpus.MappedCorpus) instead of being read
+        in text mode.
+
+        If checkpoints are enabled, processing is resumed at the
+        position of the checkpoint (and finished files are skipped).
+        Files are then read with a corpus.LineReader (memory mapping
+        is only used with several jobs).
+
+        If a cache is enabled (and checkpoints are not), the Results
+        of unchanged parts of the file are taken from the cache.
+
+        If sampling is enabled, the file is processed by a single
+        process (for block sampling, only the selected blocks of
+        uncompressed files are read).
+
+        If deduplication is enabled, lines repeating sentences of
+        this or earlier files are dropped (with several jobs, every
+        shard is read twice, see parallel.process()).
+
+        If the _from_wordlist_flag is set, the word frequency list of
+        the (Wortschatz) corpus is processed instead of its sentences
+        (see processWordlist()).
+
+        Raises
+        ------
+        ValueError
+            Deduplication is combined with a cache, checkpoints,
+            sampling or a word list (the cached Results, checkpoints
+            and samples do not take the sentences seen into account).
+        '''
+        if self.dedup is not None and (self.cache is not None or self.checkpoints is not None or
+                                       self.sampling is not None or self._from_wordlist_flag):
+            raise ValueError('deduplication can not be combined with a cache, '
+                             'checkpoints, sampling or a word list')
+        if self._from_wordlist_flag:
+            with corpus.open_wordlist(path) as lines:
+                counts = self.processWordlist(lines)
+            self.corpora.append(path)
+            return counts
+        checkpoints = self.checkpoints
+        results, start = None, 0
+        if checkpoints is not None:
+            if checkpoints.skip(path):
+                if self.verbosity > 0:
+                    print("Skipping \"{}\" (finished before)".format(path), file=sys.stderr)
+                self.results = checkpoints.last_results(path)
+                return (None, None) if self.results is None else \
+                    (self.results.nums, self.results.numwords)
+            results, start = checkpoints.resume(path)
+            checkpoints.start(path)
+
+        compressed = corpus.is_compressed(path)
+        if self.sampling is not None:
+            if self.sampling.method == 'blocks' and not compressed:
+                counts = self.processFile(self.sampling.blocks(path))
+            else:
+                with corpus.open_corpus(path) as inputStream:
+                    counts = self.processFile(inputStream)
+        elif self.cache is not None and checkpoints is None:
+            import cache
+            if self.verbosity > 0:
+                sys.stderr.write("Starting to process ")
+            if self.profile is not None:
+                self.profile.start()
+            results = cache.process(self, path, jobs)
+            if self.profile is not None:
+                self.profile.stop(results.lines)
+            counts = self.finish(results)
+        elif jobs > 1 and not compressed:
+            import parallel
+            if self.verbosity > 0:
+                sys.stderr.write("Starting to process ")
+            if self.profile is not None:
+                self.profile.start()
+            results = parallel.process(self, path, jobs, start=start, results=results)
+            if self.profile is not None:
+                self.profile.stop(results.lines)
+            counts = self.finish(results)
+        elif checkpoints is not None:
+            with corpus.LineReader(path, start) as reader:
+                checkpoints.start(path, reader)
+                counts = self.processFile(reader, results=results)
+        elif self._use_mmap_flag and not compressed:
+            with corpus.MappedCorpus(path) as mapping:
+                counts = self.processFile(mapping.sentences(), split_ids=False)
+        else:
+            with corpus.open_corpus(path) as inputStream:
+                counts = self.processFile(inputStream)
+        self.corpora.append(path)
+        if checkpoints is not None:
+            checkpoints.finish(self, self.results)
+        return counts
+
+
+    def processWordlist(self, inputStream):
+        '''Process the word frequency list of a corpus instead of its
+        sentences. This is much faster, but only yields approximations
+        of the histograms of numbers and number words (see wordlist.py).
+
+        Arguments
+        ---------
+        inputStream
+            The word list to read ("*-words.txt" of Wortschatz corpora,
+            cf. corpus.open_wordlist()).
+
+        Result
+        ------
+        (nums, numwords)
+            The histograms of numbers and number words.
+        '''
+        import wordlist
+        if self.verbosity > 0:
+            sys.stderr.write("Starting to process word list ")
+        return self.finish(wordlist.count(self, inputStream))
+
+
+    def iter_matches(self, lines, results=None, split_ids=True):
+        '''Look for numerals in a sequence of lines. This is a lazy
+        alternative to processFile(): matches are generated one after
+        another while reading the lines, so that they can be filtered
+        or aggregated without writing (and rereading) match files.
+
+        Arguments
+        ---------
+        lines : iterable of str
+            The lines to process (e.g. an input stream).
+        results : Results
+            If given, the number of lines read (and skipped) is
+            counted in these Results. Matches are not added.
+        split_ids : bool
+            Remove the sentence IDs of "Wortschatz" corpora from
+            the lines (everything up to the first tabulator). Set
+            this to False if the IDs have already been removed
+            (e.g. by corpus.MappedCorpus).
+
+        Result
+        ------
+        A generator yielding a Match (see matches.py) for every
+        expression found. The line numbers of the matches count
+        the lines from 0 (or from results.lines, if results are given).
+        '''
+        for matches in self._iter_lines(lines, results, split_ids):
+            for match in matches[0]:
+                yield match
+
+
+    def _iter_lines(self, lines, results, split_ids):
+        '''Look for numerals in a sequence of lines, for all ranges.
+
+        Each line is matched only once, with the regular expression
+        of the widest range. These matches are also the matches of a
+        narrower range, unless they contain a number word of the wider
+        range only (then the narrower range would have split the line
+        differently, e.g. "one hundred and five" into "five" for the
+        range 0 to 100). Only in this case, the line is matched again
+        with the regular expression of the narrower range.
+
+        Arguments
+        ---------
+        cf. iter_matches()
+
+        Result
+        ------
+        A generator yielding, for each line containing numeral
+        candidates, a list with the list of matches for each range.
+        '''
+        language = self.language
+        narrow = self._narrow
+        profile = self.profile
+        lineno = results.lines if results is not None else 0
+        for sentence in lines:
 
             # Remove everything before the first tabulator.
             # This is relevant for lines from the "Wortschatz" corpus,
             # as these lines have the format running_number-TAB-sentence.
-            if "\t" in sentence:
+            if split_ids and "\t" in sentence:
                 sentence = sentence.split("\t")[1]
 
-            # look for ALL occurences of numbers (digits)
-            info = self.language.match_expression(sentence)
-            self._counter(info[0]) # occurrences of numbers
-            self._counter(info[1]) # occurrences of numberwords
-
-            if info[0]:
-                num['matches'] += 1 # increase if at least one match is found in line
-                num['numbers'] += len(info[0])
-                for i in info[0]: # [p]
-                    if i in range(len(nums)):
-                        nums[i] += 1
-            if info[1]: # look for occurences of number words
-                num['words'] += len(info[1])
-                for i in info[1]: #[p]
-                    if i in range(len(numwords)):
-                        numwords[i] += 1
-
-            # look for occurences of number words
-            # if self._match_number_words_flag:
-                # wordMatches = self.language.match_number_words(sentence)
-                # self._counter(wordMatches)
-
-                # if wordMatches:
-                    # num['words'] += len(wordMatches)
-                    # for i in wordMatches: #[p]
-                        # if i in range(len(numwords)):
-                            # numwords[i] += 1
-                    
-            
-            # [p]
-            tripleMatches = [tripleMatches[i]+info[2][i] for i in range(len(tripleMatches))]
-            
-            asym += info[3] # count modified numerals besides imprecise/precise approximators
-            
-            for key in info[4]:
-                if not key in unit_info:
-                    unit_info[key] = info[4][key]
-                else: unit_info[key] += info[4][key]
-            
+            # skip lines that contain neither digits nor number words
+            if self._prefilter_flag and not language.has_numeral_candidate(sentence):
+                if results is not None:
+                    results.skipped += 1
+            else:
+                matches = list(language.iter_matches(sentence, lineno))
+                if narrow is None:
+                    yield [matches]
+                else:
+                    yield [matches if n is None or
+                           all(m.kind == 'num' or m.numeral.casefold() in n[1] for m in matches)
+                           else list(n[0].iter_matches(sentence, lineno))
+                           for n in narrow]
+
             # output progress information (if desired)
-            if self._show_progress_flag and (num['lines'] % 100000 == 0):
+            if self._show_progress_flag and (lineno % 100000 == 0):
                 sys.stderr.write('.' if self.verbosity > 0 else
-                                 r'{}\r'.format(num['lines']))
+                                 r'{}\r'.format(lineno))
                 sys.stderr.flush()
-            num['lines'] += 1
-        
-        #sort unit counts in descending order
-        unit_list = []
-            
-        for unit in unit_info.items(): # retrieve key-value-pairs as tuple
-            item_list = list(unit) # turn tuple into list
-            item_list.reverse() # reverse order such that sorting is w.r.t. counts
-            unit_list.append(item_list)
-        unit_list.sort(reverse=True) # sort list
+            if profile is not None and lineno % 1000 == 0:
+                profile.sample(lineno)
+            lineno += 1
+            if results is not None:
+                results.lines = lineno
+
+
+    def processLines(self, lines, results, split_ids=True):
+        '''Look for numerals in a sequence of lines, record them in the
+        match files and add them to the results.
+
+        Arguments
+        ---------
+        lines : iterable of str
+            The lines to process.
+        results : Results
+            The Results to which the findings are added.
+        split_ids : bool
+            Remove the sentence IDs from the lines (cf. iter_matches()).
+
+        The lines are processed in blocks of block_lines lines: the
+        matches of a block are collected and then added to the Results
+        at once (see Results.add_matches()). Checkpoints are saved
+        between blocks.
+
+        If deduplication is enabled, the repetitions of sentences seen
+        before are dropped from each block (they are counted as the
+        duplicates of the Results, not as lines).
+        '''
+        writer = self.match_writer
+        sample = self.sampling
+        dedup = self.dedup
+        checkpoints = self.checkpoints
+        all_results = [results] + results.ranges
+        lines = iter(lines)
+        while True:
+            block = list(itertools.islice(lines, self.block_lines))
+            if not block:
+                break
+            if dedup is not None:
+                kept = dedup.filter(block, split_ids)
+                results.duplicates += len(block) - len(kept)
+                block = kept
+            block_matches = [[] for _ in all_results]
+            for matches in self._iter_lines(block, results, split_ids):
+                for range_matches, new_matches in zip(block_matches, matches):
+                    range_matches.extend(new_matches)
+            if writer:
+                block_matches[0] = writer.write_matches(block_matches[0])
+            for range_results, range_matches in zip(all_results, block_matches):
+                range_results.add_matches(range_matches)
+                range_results.lines = results.lines
+            if sample is not None:
+                for match in block_matches[0]:
+                    sample.add_match(match)
+            if checkpoints is not None:
+                checkpoints.update(self, results)
+
+
+    def finish(self, results):
+        '''Finish processing a file: add the results to the overall
+        counts and report them.
+
+        Arguments
+        ---------
+        results : Results
+            The results for the file. They are kept as self.results.
+
+        Result
+        ------
+        (nums, numwords)
+            The histograms of numbers and number words.
+        '''
+        self.results = results
+        for counter, range_results in zip(self._counters, [results] + results.ranges):
+            counter.merge(range_results.counter)
+        self.total.merge(results)
+        self.report(results)
+        return results.nums, results.numwords # [p]
+
+
+    def report(self, results):
+        '''Print the results of processing a file (depending on
+        the verbosity).
 
+        Arguments
+        ---------
+        results : Results
+            The results to report.
+        '''
         if self.verbosity > 0:
             print(" processed {0} lines.".
-                  format(locale.format("%d", num['lines'], grouping=True)),
+                  format(locale.format("%d", results.lines, grouping=True)),
                   file=sys.stderr)
         elif self._show_progress_flag:
             print(file=sys.stderr)
 
         if self.verbosity > 1:
+            wordlist = self._from_wordlist_flag
+            self.reportStatistics(results, self.n_low, self.n_high, self._counter, wordlist=wordlist)
+            if self._prefilter_flag and not wordlist:
+                print(' * {0} lines without numeral candidates were skipped'.
+                      format(locale.format("%d", results.skipped, grouping=True)))
+            if self.dedup is not None and not wordlist:
+                print(' * {0} repeated lines were dropped (only first occurrences are counted)'.
+                      format(locale.format("%d", results.duplicates, grouping=True)))
+            for (low, high), range_results, counter in zip(self._ranges[1:], results.ranges,
+                                                           self._counters[1:]):
+                print("Range {0}-{1}:".format(low, high))
+                self.reportStatistics(range_results, low, high, counter, wordlist=wordlist)
+                    
+        return results.nums, results.numwords # [p]
+
+
+    @staticmethod
+    def reportStatistics(results, n_low, n_high, counter, units=10, wordlist=False):
+        '''Print the statistics of a range.
+
+        Arguments
+        ---------
+        results : Results
+            The results for the range.
+        n_low, n_high : int
+            The range.
+        counter : Counter
+            The overall counts for the range.
+        units : int
+            The number of (most frequent) units to list.
+        wordlist : bool
+            The results were obtained from a word frequency list: the
+            statistics depending on the context of the numerals are
+            not available (see wordlist.py).
+        '''
+        num = {'lines': results.lines, 'matches': results.matches,
+               'numbers': results.numbers, 'words': results.words}
+        tripleMatches = results.tripleMatches
+        asym = results.asym
+        first = n_low if n_low > 0 else 1 # without 0
+        numbers_of_interest, words_of_interest = results.sum_from(first)
+
+        if wordlist:
+            print("Some statistics (approximated from the word list, counting all occurrences"
+                  " of single-word numerals regardless of their context):")
+        else:
             print("Some statistics:")
             print(" * {0} of these lines ({1}%) contain numbers".
                   format(locale.format("%d", num['matches'], grouping=True),
                          num['matches']*100//num['lines'] if num['lines'] > 0 else 100))
-            print(" * in total we found {0} numbers".
-                  format(locale.format("%d", num['numbers'], grouping=True)))
-            print(" * {0} of these numbers are in the range of interest ({1}-{2})".
-                  format(locale.format("%d", sum(nums[1:]),
-                                       grouping=True),
-                         self.n_low,self.n_high)) # [p] modified - replaced self._counter.sum() by sum(nums[1:])
-            print(" * there were also {0} occurences of number words (not used yet!)".
-                  format(locale.format("%d", num['words'], grouping=True)))
-            print(' * number words of interest: {0}'.
-                  format(locale.format("%d", sum(numwords[1:]), grouping=True)))
-            print(' * total amount of numerals between {1} and {2} (used for plot in fig1): {0}'.
-                  format(locale.format("%d", (self._counter.sum() - self._counter[0]), grouping=True),
-                         self.n_low,self.n_high)) # [p] modified to subtract the occurrences of 0
-            print(' * occurrences of approx-num-combinations \n prec-round-dis: {0} \n prec-round-cont: {1} \
+        print(" * in total we found {0} numbers".
+              format(locale.format("%d", num['numbers'], grouping=True)))
+        print(" * {0} of these numbers are in the range of interest ({1}-{2})".
+              format(locale.format("%d", numbers_of_interest,
+                                   grouping=True),
+                     n_low,n_high)) # [p] modified - replaced self._counter.sum() by sum(nums[1:])
+        print(" * there were also {0} occurences of number words (not used yet!)".
+              format(locale.format("%d", num['words'], grouping=True)))
+        print(' * number words of interest: {0}'.
+              format(locale.format("%d", words_of_interest, grouping=True)))
+        print(' * total amount of numerals between {1} and {2} (used for plot in fig1): {0}'.
+              format(locale.format("%d", (counter.sum() - counter[0]), grouping=True),
+                     n_low,n_high)) # [p] modified to subtract the occurrences of 0
+        sketch = counter.tail if isinstance(counter.tail, CountMinSketch) else None
+        if sketch is not None:
+            print('   (counts of values above {0} are estimates, each may be up to {1} too high)'.
+                  format(counter.head,
+                         locale.format("%d", sketch.error(), grouping=True)))
+        if counter.head < n_high:
+            print('   (number words were only matched up to {0}, the head of the counts:'
+                  ' larger ones are not included in any of these statistics)'.format(counter.head))
+        if wordlist:
+            from wordlist import unavailable
+            print(' * not available from word lists: {0}'.format('; '.join(unavailable)))
+            return
+        print(' * occurrences of approx-num-combinations \n prec-round-dis: {0} \n prec-round-cont: {1} \
                   \n prec-nonr-dis: {2} \n prec-nonr-cont: {3} \n impr-round-dis: {4} \n impr-round-cont: {5} \
                   \n impr-nonr-dis: {6} \n impr-nonr-cont: {7} \n null-round-dis: {8} \n null-round-cont: {9} \
                   \n null-nonr-dis: {10} \n null-nonr-cont: {11}'.
-                  format(locale.format("%d",tripleMatches[0],grouping=True),locale.format("%d",tripleMatches[1],grouping=True),locale.format("%d",tripleMatches[2],grouping=True), \
-                                       locale.format("%d",tripleMatches[3],grouping=True), locale.format("%d",tripleMatches[4],grouping=True), locale.format("%d",tripleMatches[5],grouping=True), locale.format("%d",tripleMatches[6],grouping=True), \
-                                       locale.format("%d",tripleMatches[7],grouping=True), locale.format("%d",tripleMatches[8],grouping=True), locale.format("%d",tripleMatches[9],grouping=True), locale.format("%d",tripleMatches[10],grouping=True), \
-                                       locale.format("%d",tripleMatches[11],grouping=True)))
-            print('number of asymmetrically modified numerals:',asym)
-                    
-        return nums,numwords # [p]
+              format(locale.format("%d",tripleMatches[0],grouping=True),locale.format("%d",tripleMatches[1],grouping=True),locale.format("%d",tripleMatches[2],grouping=True), \
+                                   locale.format("%d",tripleMatches[3],grouping=True), locale.format("%d",tripleMatches[4],grouping=True), locale.format("%d",tripleMatches[5],grouping=True), locale.format("%d",tripleMatches[6],grouping=True), \
+                                   locale.format("%d",tripleMatches[7],grouping=True), locale.format("%d",tripleMatches[8],grouping=True), locale.format("%d",tripleMatches[9],grouping=True), locale.format("%d",tripleMatches[10],grouping=True), \
+                                   locale.format("%d",tripleMatches[11],grouping=True)))
+        print('number of asymmetrically modified numerals:',asym)
+        unit_list = results.unit_list()[:units]
+        if unit_list:
+            print(' * most frequent units: {0}'.
+                  format(', '.join('{0} ({1})'.format(unit, locale.format("%d", count, grouping=True))
+                                   for count, unit in unit_list)))
+        if results.unit_error():
+            print('   (counting only about {0} units, each count may be up to {1} too low)'.
+                  format(results.unit_capacity(),
+                         locale.format("%d", results.unit_error(), grouping=True)))
 
-    def plotBars(self, nums, numwords): # [p] modified
+
+    def plotBars(self, nums, numwords, range_index=0, show=True, output=None,
+                 format='png', bins=None, log=False): # [p] modified
         '''Plot a bar chart.
+
+        Arguments
+        ---------
+        nums, numwords : list of int
+            The histograms of numbers and number words.
+        range_index : int
+            The range the histograms belong to (0 is the range
+            min to max, 1 the first of the further ranges etc.).
+        show : bool
+            Show the plots (set this to False to add further plots
+            before showing all of them).
+        output : str
+            Export the plots to files in this directory (with the
+            non-interactive Agg backend) instead of showing them.
+        format : str
+            The format of the exported files (png, svg, pdf, ...).
+        bins : int
+            The number of bins for wide ranges (see plots.py).
+        log : bool
+            Use bins of growing width and a logarithmic scale.
+
+        Result
+        ------
+        list of str
+            The names of the exported files (if any).
         '''
         # print('num array len:',len(nums))
         # print('numword array len:',len(numwords))
         # print('numword occurrences of 500:',numwords[500])
         
+        # matplotlib takes long to import, so this is done only when plotting
+        import plots
+        plt = plots.pyplot(export=output is not None)
         if plt is None:
             print("error: no matplotlib seems to be installed. Install it before trying to plot.", file=sys.stderr)
             print("info: matplotlib is available for free from https://matplotlib.org/", file=sys.stderr)
-        else:
-            numbers = range(self.n_low, self.n_high + 1)
-            # print('x axis len:',len(numbers))
-            values = list(map(lambda x: self._counter[x], numbers))
-            # print('values len:',len(values))
-            plt.figure(1)
-            plt.title('numbers + numberwords frequency')
-            plt.bar(numbers, values) # num+numwords
-            
-            plt.figure(2)
-            plt.title('numbers frequency')
-            plt.bar(numbers, nums[1:]) # numbers
-            
-            plt.figure(3)
-            plt.title('numberwords frequency')
-            plt.bar(numbers, numwords[1:]) # numwords
-            
+            return []
+        n_low, n_high = (self.n_low, self.n_high) if range_index == 0 else self._ranges[range_index]
+        counter = self._counters[range_index]
+        title = '' if range_index == 0 else ' ({0}-{1})'.format(n_low, n_high)
+        figures = plots.plot_range(plt, counter, nums, numwords, n_low, n_high, title,
+                                   3*range_index + 1, bins, log)
+        if output is not None:
+            return plots.save(plt, figures, output, '{0}-{1}-'.format(n_low, n_high), format)
+        if show:
             plt.show()
+        return []
@@ -0,0 +1,317 @@
+"""
+Measure where the time goes while processing a corpus.
+
+A Profile keeps cumulative timers and call counts for the stages of
+processing (the prefilter, scanning lines with the regular expression,
+looking up unit categories in WordNet, converting number words and
+writing the match files) and samples the throughput (lines and
+matches per second) over time. Optionally, the run is profiled with
+cProfile and/or its memory allocations are traced with tracemalloc.
+
+The timers are installed as wrappers around the functions of the
+stages (see Profile.instrument()), so that nothing has to be measured
+if profiling is not enabled.
+"""
+
+from __future__ import print_function
+
+import io
+import timeit
+
+
+'''The stages of processing, in the order in which they are reported.
+The unit category lookup includes the time spent in WordNet.'''
+STAGES = [
+    ('prefilter', 'checking lines for numeral candidates'),
+    ('regex', 'finding the numerals (see matchers.py)'),
+    ('unit_category', 'looking up unit categories'),
+    ('wordnet', 'classifying new units with WordNet'),
+    ('convert', 'converting number words'),
+    ('write', 'writing match files')
+]
+
+
+class TimedPattern:
+    '''A wrapper around a compiled regular expression, measuring the
+    time spent in search() and finditer(). The matches of finditer()
+    are collected at once (so that the time spent matching can be
+    measured) and counted.
+    '''
+
+    def __init__(self, pattern, profile, stage):
+        self._pattern = pattern
+        self._profile = profile
+        self._timer = profile.timer(stage)
+
+
+    def search(self, *args):
+        start = self._profile.clock()
+        try:
+            return self._pattern.search(*args)
+        finally:
+            self._timer[0] += self._profile.clock() - start
+            self._timer[1] += 1
+
+
+    def finditer(self, *args):
+        start = self._profile.clock()
+        matches = list(self._pattern.finditer(*args))
+        self._timer[0] += self._profile.clock() - start
+        self._timer[1] += 1
+        self._profile.matches += len(matches)
+        return iter(matches)
+
+
+    def __getattr__(self, name):
+        return getattr(self._pattern, name)
+
+
+class Profile:
+    '''Timers, counters and throughput samples of one or more runs.
+    '''
+
+    '''The clock used for all measurements.'''
+    clock = staticmethod(timeit.default_timer)
+
+    '''The minimal time (in seconds) between two throughput samples.'''
+    sample_interval = 1.0
+
+
+    def __init__(self, cprofile=False, memory=False):
+        '''Create a new Profile.
+
+        Arguments
+        ---------
+        cprofile : bool
+            Profile all function calls with cProfile.
+        memory : bool
+            Trace memory allocations with tracemalloc.
+        '''
+        self.stages = {}
+        self.seconds = 0.0   # total time of all runs
+        self.lines = 0       # lines processed
+        self.matches = 0     # matches of the regular expression
+        self.samples = []    # (seconds, lines, matches) since the start
+        self.memory = None   # (peak, statistics) if traced
+        self._cprofile = None
+        self._trace_memory = memory
+        self._start = None
+        self._last_sample = 0.0
+        if cprofile:
+            import cProfile
+            self._cprofile = cProfile.Profile()
+
+
+    def timer(self, stage):
+        '''The timer of a stage: a list [seconds, calls].
+        '''
+        return self.stages.setdefault(stage, [0.0, 0])
+
+
+    def instrument(self, obj, name, stage):
+        '''Measure the calls of a method of an object. The method is
+        replaced by a wrapper adding the time of each call to the
+        timer of the stage.
+
+        Arguments
+        ---------
+        obj : object
+            The object whose method should be measured.
+        name : str
+            The name of the method.
+        stage : str
+            The stage to account the time to.
+        '''
+        function = getattr(obj, name)
+        timer = self.timer(stage)
+        clock = self.clock
+        def timed(*args, **kwargs):
+            start = clock()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                timer[0] += clock() - start
+                timer[1] += 1
+        setattr(obj, name, timed)
+
+
+    def start(self):
+        '''Start a run.
+        '''
+        self._start = self.clock()
+        self._last_sample = 0.0
+        if self._cprofile is not None:
+            self._cprofile.enable()
+        if self._trace_memory:
+            import tracemalloc
+            tracemalloc.start()
+
+
+    def sample(self, lines):
+        '''Record the throughput (if sample_interval has passed since
+        the last sample).
+
+        Arguments
+        ---------
+        lines : int
+            The number of lines processed in the current run so far.
+        '''
+        if self._start is None:
+            return
+        elapsed = self.clock() - self._start
+        if elapsed - self._last_sample >= self.sample_interval:
+            self._last_sample = elapsed
+            self.samples.append((self.seconds + elapsed, self.lines + lines, self.matches))
+
+
+    def stop(self, lines):
+        '''Stop a run.
+
+        Arguments
+        ---------
+        lines : int
+            The number of lines processed in this run.
+        '''
+        if self._start is None:
+            return
+        if self._cprofile is not None:
+            self._cprofile.disable()
+        if self._trace_memory:
+            import tracemalloc
+            peak = tracemalloc.get_traced_memory()[1]
+            statistics = tracemalloc.take_snapshot().statistics('lineno')[:10]
+            tracemalloc.stop()
+            if self.memory is not None:
+                peak = max(peak, self.memory[0])
+            self.memory = (peak, [str(s) for s in statistics])
+        self.seconds += self.clock() - self._start
+        self.lines += lines
+        self.samples.append((self.seconds, self.lines, self.matches))
+        self._start = None
+
+
+    def detach(self):
+        '''Move the timers and counters to a new Profile and reset
+        them in this Profile.
+
+        Result
+        ------
+        Profile
+            A profile with the measurements so far.
+        '''
+        profile = Profile()
+        profile.merge(self)
+        for timer in self.stages.values():
+            timer[0], timer[1] = 0.0, 0
+        self.matches = 0
+        return profile
+
+
+    def merge(self, other):
+        '''Add the timers and counters of another Profile (e.g. of
+        a worker process) to this Profile.
+        '''
+        for stage, (seconds, calls) in other.stages.items():
+            timer = self.timer(stage)
+            timer[0] += seconds
+            timer[1] += calls
+        self.matches += other.matches
+
+
+    def report(self):
+        '''Create a report of the measurements so far.
+
+        Result
+        ------
+        ProfileReport
+        '''
+        stats = None
+        if self._cprofile is not None:
+            import pstats
+            stream = io.StringIO()
+            try:
+                pstats.Stats(self._cprofile, stream=stream).sort_stats('cumulative').print_stats(25)
+                stats = stream.getvalue()
+            except TypeError:
+                pass # nothing has been profiled yet
+        return ProfileReport(self, stats)
+
+
+class ProfileReport:
+    '''The results of profiling a Processor.
+
+    Attributes
+    ----------
+    seconds : float
+        The total processing time.
+    lines, matches : int
+        The number of lines processed and matches found.
+    stages : list of dict
+        For every stage: its 'name', 'description', 'seconds'
+        and 'calls'.
+    samples : list of dict
+        The throughput over time: 'seconds' (since the start),
+        'lines_per_sec' and 'matches_per_sec' (since the last sample).
+    memory : dict
+        The 'peak' memory usage (in bytes) and the 'top' allocation
+        sites, if memory was traced (None otherwise).
+    cprofile : str
+        The statistics of cProfile (None if not used).
+    '''
+
+    def __init__(self, profile, cprofile=None):
+        self.seconds = profile.seconds
+        self.lines = profile.lines
+        self.matches = profile.matches
+        descriptions = dict(STAGES)
+        names = [name for name, _ in STAGES if name in profile.stages]
+        names += sorted(set(profile.stages) - set(names))
+        self.stages = [{'name': name, 'description': descriptions.get(name, ''),
+                        'seconds': profile.stages[name][0],
+                        'calls': profile.stages[name][1]} for name in names]
+        self.samples = []
+        previous = (0.0, 0, 0)
+        for sample in profile.samples:
+            elapsed = sample[0] - previous[0]
+            if elapsed > 0:
+                self.samples.append({'seconds': sample[0],
+                                     'lines_per_sec': (sample[1] - previous[1]) / elapsed,
+                                     'matches_per_sec': (sample[2] - previous[2]) / elapsed})
+            previous = sample
+        self.memory = None if profile.memory is None else \
+            {'peak': profile.memory[0], 'top': profile.memory[1]}
+        self.cprofile = cprofile
+
+
+    def as_dict(self):
+        '''The report as dictionary (e.g. for storing it as JSON).
+        '''
+        return dict(self.__dict__)
+
+
+    def format(self):
+        '''The report as human readable text.
+        '''
+        lines = ['Profile: {0} lines, {1} matches in {2:.2f}s ({3:.0f} lines/s, {4:.0f} matches/s)'.
+                 format(self.lines, self.matches, self.seconds,
+                        self.lines / self.seconds if self.seconds else 0,
+                        self.matches / self.seconds if self.seconds else 0)]
+        lines.append(' {0:<15} {1:>10} {2:>10} {3:>10} {4:>7}'.
+                     format('stage', 'calls', 'seconds', 'us/call', 'share'))
+        for stage in self.stages:
+            lines.append(' {0:<15} {1:>10} {2:>9.3f}s {3:>10.2f} {4:>6.1f}%'.
+                         format(stage['name'], stage['calls'], stage['seconds'],
+                                1e6 * stage['seconds'] / stage['calls'] if stage['calls'] else 0,
+                                100 * stage['seconds'] / self.seconds if self.seconds else 0))
+        if len(self.samples) > 1:
+            lines.append(' throughput over time (lines/s, matches/s):')
+            for sample in self.samples:
+                lines.append('  {0:>8.1f}s {1:>12.0f} {2:>12.0f}'.
+                             format(sample['seconds'], sample['lines_per_sec'],
+                                    sample['matches_per_sec']))
+        if self.memory is not None:
+            lines.append(' peak memory (traced): {0:.1f} MiB'.format(self.memory['peak'] / 2.0**20))
+            lines.extend('  ' + line for line in self.memory['top'])
+        if self.cprofile is not None:
+            lines.append(self.cprofile)
+        return '\n'.join(lines)
@@ -0,0 +1,388 @@
+from counter import Counter
+from matches import is_counted, triple_index
+from topk import TopK
+
+
+def _histogram(size, head, sketch):
+    '''A histogram of the values from 0 to size-1: a list, or a Counter
+    with a head and a tail if a list would be too large (cf. Counter).
+    '''
+    if Counter.dense(0, size - 1, head):
+        return size*[0]
+    return Counter(0, size - 1, head, sketch)
+
+
+def _count(histogram, value):
+    if isinstance(histogram, list):
+        if 0 <= value < len(histogram):
+            histogram[value] += 1
+    else:
+        histogram(value)
+
+
+def _count_all(histogram, values):
+    if isinstance(histogram, list):
+        size = len(histogram)
+        for value in values:
+            if 0 <= value < size:
+                histogram[value] += 1
+    else:
+        histogram.update(values)
+
+
+def _as_plain(histogram):
+    return list(histogram) if isinstance(histogram, list) else histogram.as_dict()
+
+
+def _from_plain(values):
+    return list(values) if isinstance(values, list) else Counter.from_dict(values)
+
+
+def _merge(histogram, other):
+    if isinstance(histogram, list) and isinstance(other, list):
+        return [a + b for a, b in zip(histogram, other)]
+    if isinstance(histogram, list) or isinstance(other, list):
+        raise ValueError('can not merge histograms with different heads')
+    histogram.merge(other)
+    return histogram
+
+
+class Results:
+    '''The Results of processing (a part of) a corpus: the number of
+    lines and matches, histograms of numbers and number words, the
+    counts of the approximator-roundness-unit combinations and the
+    unit counts. Like the numerals, units are only counted if the
+    numeral is counted (cf. matches.is_counted()).
+
+    The units are counted exactly (in the dictionary unit_info) or,
+    with a unit_capacity, approximately in bounded memory (unit_info
+    is then a TopK summary of the most frequent units, see topk.py).
+
+    The histograms are lists, unless the range is very wide: then they
+    are Counters (indexed by value as well), counting the values above
+    the head in their tail (see Counter).
+
+    Results of different parts of a corpus can be merged, yielding
+    the same Results as processing the whole corpus at once.
+    '''
+
+    def __init__(self, size=101, min=0, max=100, unit_capacity=None, head=None, sketch=None):
+        '''Create new (empty) Results.
+
+        Arguments
+        ---------
+        size : int
+            The size of the number (word) histograms. Values
+            from 0 to size-1 will be counted.
+        min, max: int
+            The range of the Counter (cf. Counter).
+        unit_capacity : int
+            The number of units to keep track of (None means to
+            count all units exactly).
+        head, sketch : int
+            The head of the histograms and of the Counter, and the
+            width of the sketch counting their tails (cf. Counter).
+        '''
+        self.lines = 0   # lines processed
+        self.skipped = 0 # lines skipped by the prefilter
+        self.duplicates = 0 # repeated lines dropped (not included in lines)
+        self.matches = 0 # lines containing at least one number
+        self.numbers = 0 # numbers found (digits)
+        self.words = 0   # number words found
+        self.nums = _histogram(size, head, sketch)
+        self.numwords = _histogram(size, head, sketch)
+        self.tripleMatches = 12*[0]
+        self.asym = 0
+        self.unit_info = {} if unit_capacity is None else TopK(unit_capacity)
+        self.counter = Counter(min=min, max=max, head=head, sketch=sketch)
+        self._last_line = None # the last line counted in matches
+        self.ranges = []         # Results for further ranges (cf. Processor)
+
+
+    def add(self, info):
+        '''Add the information obtained from a single line.
+
+        Arguments
+        ---------
+        info : list
+            The result of Language.match_expression().
+        '''
+        self.counter(info[0]) # occurrences of numbers
+        self.counter(info[1]) # occurrences of numberwords
+
+        if info[0]:
+            self.matches += 1 # increase if at least one match is found in line
+            self.numbers += len(info[0])
+            for i in info[0]: # [p]
+                _count(self.nums, i)
+        if info[1]: # look for occurences of number words
+            self.words += len(info[1])
+            for i in info[1]: # [p]
+                _count(self.numwords, i)
+
+        triples = info[2]
+        for i in range(12):
+            self.tripleMatches[i] += triples[i]
+
+        self.asym += info[3] # count modified numerals besides imprecise/precise approximators
+
+        for key in info[4]:
+            self.add_unit(key, info[4][key])
+
+
+    def add_unit(self, unit, count=1):
+        '''Count a unit.
+
+        Arguments
+        ---------
+        unit : str
+            The unit.
+        count : int
+            The number of occurrences.
+        '''
+        if isinstance(self.unit_info, TopK):
+            self.unit_info.add(unit, count)
+        else:
+            self.unit_info[unit] = self.unit_info.get(unit, 0) + count
+
+
+    def add_match(self, match):
+        '''Add a single match. Matches have to be added in the order
+        of their lines.
+
+        Arguments
+        ---------
+        match : Match
+            A match as yielded by Language.iter_matches().
+        '''
+        if not is_counted(match):
+            return
+        if match.unit:
+            self.add_unit(match.unit)
+        self.counter(match.value)
+        if match.kind == 'num':
+            if match.line != self._last_line:
+                self.matches += 1 # first number in this line
+                self._last_line = match.line
+            self.numbers += 1
+            _count(self.nums, match.value)
+        else:
+            self.words += 1
+            _count(self.numwords, match.value)
+
+        index = triple_index(match)
+        if index is None:
+            self.asym += 1
+        else:
+            self.tripleMatches[index] += 1
+
+
+    def add_matches(self, matches):
+        '''Add the matches of a block of lines. This is the same as
+        adding them one by one with add_match(), but the values are
+        collected first and counted once per block (in bulk, cf.
+        Counter.update()), and the unit and approximator counts are
+        updated in place.
+
+        Arguments
+        ---------
+        matches : list of Match
+            The matches, in the order of their lines.
+        '''
+        numbers, words = [], []
+        triples = 13*[0] # the approximator counts and asym
+        units = {}
+        last_line, lines = self._last_line, 0
+        for match in matches:
+            if match.value is None or match.category is None: # cf. is_counted()
+                continue
+            unit = match.unit
+            if unit:
+                units[unit] = units.get(unit, 0) + 1
+            if match.kind == 'num':
+                if match.line != last_line:
+                    lines += 1 # first number in this line
+                    last_line = match.line
+                numbers.append(match.value)
+            else:
+                words.append(match.value)
+            index = triple_index(match)
+            triples[12 if index is None else index] += 1
+
+        self._last_line = last_line
+        self.matches += lines
+        self.numbers += len(numbers)
+        self.words += len(words)
+        self.counter.update(numbers)
+        self.counter.update(words)
+        _count_all(self.nums, numbers)
+        _count_all(self.numwords, words)
+        tripleMatches = self.tripleMatches
+        for i in range(12):
+            tripleMatches[i] += triples[i]
+        self.asym += triples[12]
+        if isinstance(self.unit_info, TopK):
+            for unit, count in units.items():
+                self.unit_info.add(unit, count)
+        else:
+            unit_info = self.unit_info
+            for unit, count in units.items():
+                unit_info[unit] = unit_info.get(unit, 0) + count
+
+
+    def add_counts(self, kind, counts):
+        '''Add the counts of numbers or number words found without
+        their context (e.g. in a word frequency list, see wordlist.py).
+        Only the histograms, the Counter and the totals are affected.
+
+        Arguments
+        ---------
+        kind : str
+            'num' for numbers, 'word' for number words.
+        counts : dict
+            The number of occurrences of each value.
+        '''
+        values, numbers = list(counts.keys()), list(counts.values())
+        self.counter.update(values, numbers)
+        histogram = self.nums if kind == 'num' else self.numwords
+        if isinstance(histogram, list):
+            for value, count in zip(values, numbers):
+                if 0 <= value < len(histogram):
+                    histogram[value] += count
+        else:
+            histogram.update(values, numbers)
+        if kind == 'num':
+            self.numbers += sum(numbers)
+        else:
+            self.words += sum(numbers)
+
+
+    def merge(self, other):
+        '''Add other Results to these Results.
+
+        Arguments
+        ---------
+        other : Results
+            The Results to add. They have to use the same histogram
+            size and Counter range (and the same further ranges).
+        '''
+        self.lines += other.lines
+        self.skipped += other.skipped
+        self.duplicates += other.duplicates
+        self.matches += other.matches
+        self.numbers += other.numbers
+        self.words += other.words
+        self.nums = _merge(self.nums, other.nums)
+        self.numwords = _merge(self.numwords, other.numwords)
+        self.tripleMatches = [a + b for a, b in zip(self.tripleMatches, other.tripleMatches)]
+        self.asym += other.asym
+        if isinstance(other.unit_info, TopK) and not isinstance(self.unit_info, TopK):
+            units, self.unit_info = self.unit_info, TopK(other.unit_info.capacity)
+            self.unit_info.merge(units)
+        if isinstance(self.unit_info, TopK):
+            self.unit_info.merge(other.unit_info)
+        else:
+            for key, count in other.unit_info.items():
+                self.unit_info[key] = self.unit_info.get(key, 0) + count
+        self.counter.merge(other.counter)
+        for results, other_results in zip(self.ranges, other.ranges):
+            results.merge(other_results)
+
+
+    def as_dict(self):
+        '''The Results as dictionary of plain values (e.g. for storing
+        them as JSON, cf. from_dict()).
+        '''
+        return {
+            'lines': self.lines, 'skipped': self.skipped, 'duplicates': self.duplicates,
+            'matches': self.matches,
+            'numbers': self.numbers, 'words': self.words,
+            'nums': _as_plain(self.nums), 'numwords': _as_plain(self.numwords),
+            'tripleMatches': list(self.tripleMatches), 'asym': self.asym,
+            'unit_info': dict(self.unit_info.items()),
+            'unit_capacity': self.unit_capacity(), 'unit_error': self.unit_error(),
+            'counter': self.counter.as_dict(),
+            'ranges': [results.as_dict() for results in self.ranges]
+        }
+
+
+    @classmethod
+    def from_dict(cls, values):
+        '''Restore Results stored by as_dict().
+
+        Arguments
+        ---------
+        values : dict
+            The result of as_dict().
+
+        Result
+        ------
+        Results
+        '''
+        results = cls(0, values['counter']['min'], values['counter']['max'],
+                      values.get('unit_capacity'))
+        for key in ('lines', 'skipped', 'matches', 'numbers', 'words', 'asym'):
+            setattr(results, key, values[key])
+        results.duplicates = values.get('duplicates', 0)
+        results.nums = _from_plain(values['nums'])
+        results.numwords = _from_plain(values['numwords'])
+        results.tripleMatches = list(values['tripleMatches'])
+        results.set_units(values['unit_info'], values.get('unit_error', 0))
+        results.counter = Counter.from_dict(values['counter'])
+        results.ranges = [cls.from_dict(r) for r in values['ranges']]
+        return results
+
+
+    def unit_capacity(self):
+        '''The number of units kept track of (None if all units are
+        counted exactly).
+        '''
+        return self.unit_info.capacity if isinstance(self.unit_info, TopK) else None
+
+
+    def unit_error(self):
+        '''The maximal undercount of the unit counts (0 if all units
+        are counted exactly, cf. TopK).
+        '''
+        return self.unit_info.error if isinstance(self.unit_info, TopK) else 0
+
+
+    def set_units(self, counts, error=0):
+        '''Set the unit counts (e.g. restored from a file).
+
+        Arguments
+        ---------
+        counts : dict
+            The unit counts.
+        error : int
+            The maximal undercount of the counts (cf. TopK).
+        '''
+        if isinstance(self.unit_info, TopK):
+            self.unit_info = TopK(self.unit_info.capacity, counts, error)
+        else:
+            self.unit_info = dict(counts)
+
+
+    def unit_list(self):
+        '''The unit counts, sorted in descending order.
+
+        Result
+        ------
+        list of [count, unit]
+        '''
+        unit_list = [[count, unit] for unit, count in self.unit_info.items()]
+        unit_list.sort(reverse=True)
+        return unit_list
+
+
+    def sum_from(self, first):
+        '''The number of numbers and number words with a value of at
+        least first.
+
+        Result
+        ------
+        (int, int)
+        '''
+        return tuple(sum(histogram[first:]) if isinstance(histogram, list)
+                     else histogram.sum(first)
+                     for histogram in (self.nums, self.numwords))
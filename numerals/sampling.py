@@ -0,0 +1,439 @@
+"""
+Process a random sample of the lines of a corpus.
+
+To see the shape of the distribution of numerals, a sample of the
+lines is often enough. A Sample selects the lines to process in one
+of three ways:
+
+uniform
+    Every line is selected independently with probability `rate`
+    (the gaps between selected lines are drawn from a geometric
+    distribution, so only the selected lines cost random numbers).
+reservoir
+    A fixed number of lines (`size`), selected uniformly from the
+    whole file (reservoir sampling, Algorithm L, Li 1994). The lines
+    are kept in memory until the end of the file.
+blocks
+    The file is divided into blocks of block_size bytes, and a
+    fraction `rate` of the blocks is read (the lines starting in a
+    block). Unlike the other methods, this does not read the whole
+    file, but it only works for uncompressed files (other input is
+    sampled uniformly). Lines in the same block are not independent,
+    so the blocks are the units of resampling (cluster sampling).
+
+The counts found in the sample are scaled up to estimates for the
+whole corpus (each sampled line or block stands for 1/rate lines or
+blocks). Their uncertainty is estimated with the Poisson bootstrap:
+every replicate weights each sampled unit (line or block) with a
+random Poisson(1) count, and the confidence intervals are percentiles
+of the replicated estimates. The replicates are computed with NumPy
+for all histogram bins and approximator-roundness-unit counts at
+once (see Sample.estimates()).
+"""
+
+from __future__ import print_function
+
+import io
+import math
+import random
+from array import array
+
+from matches import is_counted, triple_index
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+'''The sampling methods.'''
+methods = ('uniform', 'reservoir', 'blocks')
+
+'''The size of the blocks of block sampling (in bytes).'''
+block_size = 1 << 14
+
+'''The names of the approximator-roundness-unit counts.'''
+triple_names = ['{0}-{1}-{2}'.format(approximator, roundness, unit)
+                for approximator in ('prec', 'impr', 'null')
+                for roundness in ('round', 'nonr') for unit in ('dis', 'cont')]
+
+
+class Blocks:
+    '''The lines of a random sample of the blocks of a file (see
+    Sample.blocks()).
+    '''
+
+    def __init__(self, sample, path, encoding='utf8'):
+        self._sample = sample
+        self.path = path
+        self.encoding = encoding
+
+
+    def __iter__(self):
+        sample = self._sample
+        with io.open(self.path, 'rb') as f:
+            size = f.seek(0, io.SEEK_END)
+            blocks = max((size + block_size - 1) // block_size, 1)
+            chosen = max(int(round(sample.rate * blocks)), 1)
+            sample._start_file(float(blocks) / chosen, blocks=True)
+            for block in sorted(sample._random.sample(range(blocks), chosen)):
+                start, end = block * block_size, (block + 1) * block_size
+                sample._start_unit()
+                if start > 0:
+                    # skip the line starting in the previous block
+                    f.seek(start - 1)
+                    f.readline()
+                else:
+                    f.seek(0)
+                position = f.tell()
+                while position < end:
+                    line = f.readline()
+                    if not line:
+                        break
+                    position += len(line)
+                    sample.lines += 1
+                    yield line.decode(self.encoding)
+        sample._end_file(None)
+
+
+class Sample:
+    '''A random sample of lines (see the description of the module).
+    The matches of the selected lines are recorded (see add_match())
+    to estimate the counts of the whole corpus.
+    '''
+
+    '''The default number of bootstrap replicates.'''
+    replicates = 200
+
+    '''The confidence level of the intervals.'''
+    level = 0.95
+
+
+    def __init__(self, rate=None, method='uniform', size=None, seed=None, replicates=None):
+        '''Create a new sample.
+
+        Arguments
+        ---------
+        rate : float
+            The probability of selecting a line (uniform) or block
+            (blocks), between 0 and 1.
+        method : str
+            The sampling method (one of methods).
+        size : int
+            The number of lines to select (reservoir).
+        seed : int
+            The seed of the random numbers (for reproducible samples).
+        replicates : int
+            The number of bootstrap replicates.
+        '''
+        if method not in methods:
+            raise ValueError('unknown sampling method "{}"'.format(method))
+        if method == 'reservoir':
+            if not size or size < 1:
+                raise ValueError('reservoir sampling needs a size of at least 1')
+        elif rate is None or not 0 < rate <= 1:
+            raise ValueError('the sampling rate has to be between 0 and 1, not {}'.format(rate))
+        self.rate, self.method, self.size = rate, method, size
+        self.seed = seed
+        if replicates is not None:
+            self.replicates = replicates
+        self._random = random.Random(seed)
+        self.lines = 0       # lines selected
+        self.total_lines = 0 # lines of the corpus (estimated for blocks)
+        self._units = 0      # units (lines or blocks) selected
+        self._file_base = 0  # the number of lines selected before the current file
+        self._blocks = None  # the first line of every block of the current file
+        self._scale = 1.0    # the number of lines represented by a selected line
+        # the matches recorded: unit, column (cf. _column()), scale
+        self._match_units = array('q')
+        self._match_columns = array('q')
+        self._match_scales = array('d')
+        self._columns = {}
+
+
+    def metadata(self):
+        '''A description of the sample (cf. Processor.metadata()).
+        '''
+        return {'method': self.method, 'rate': self.rate, 'size': self.size,
+                'seed': self.seed, 'lines': self.lines, 'total_lines': int(round(self.total_lines))}
+
+
+    def _start_file(self, scale, blocks=False):
+        self._file_base = self.lines
+        self._scale = scale
+        self._blocks = [] if blocks else None
+
+
+    def _start_unit(self):
+        self._blocks.append(self.lines)
+
+
+    def _end_file(self, total):
+        if self._blocks is not None:
+            self._units += len(self._blocks)
+            self.total_lines += (self.lines - self._file_base) * self._scale
+        else:
+            self._units = self.lines
+            self.total_lines += total
+
+
+    def select(self, lines):
+        '''Select a sample of lines.
+
+        Arguments
+        ---------
+        lines : iterable of str
+            The lines of a file. Blocks of a file (see blocks()) are
+            used as they are. For block sampling of other input, the
+            lines are sampled uniformly.
+
+        Result
+        ------
+        A generator yielding the selected lines (in their order).
+        '''
+        if isinstance(lines, Blocks):
+            return iter(lines)
+        if self.method == 'reservoir':
+            return self._reservoir(lines)
+        return self._uniform(lines)
+
+
+    def blocks(self, path, encoding='utf8'):
+        '''Select a sample of the blocks of an (uncompressed) file.
+
+        Result
+        ------
+        Blocks
+            The lines starting in the selected blocks.
+        '''
+        return Blocks(self, path, encoding)
+
+
+    def _uniform(self, lines):
+        rate, generator = self.rate, self._random
+        log = math.log(1.0 - rate) if rate < 1 else None
+
+        def gap():
+            # the number of lines to skip (geometric distribution)
+            return 0 if log is None else int(math.log(1.0 - generator.random()) / log)
+
+        self._start_file(1.0 / rate)
+        total, skip = 0, gap()
+        for line in lines:
+            total += 1
+            if skip:
+                skip -= 1
+                continue
+            self.lines += 1
+            yield line
+            skip = gap()
+        self._end_file(total)
+
+
+    def _reservoir(self, lines):
+        size, generator = self.size, self._random
+        reservoir = []
+        # Algorithm L: skip ahead to the next line replacing one in the
+        # reservoir, instead of drawing a random number for every line
+        weight = math.exp(math.log(generator.random() or 1e-300) / size)
+        following = size + int(math.log(generator.random() or 1e-300) / math.log(1.0 - weight)) \
+            if weight < 1 else size
+        total = 0
+        for index, line in enumerate(lines):
+            total += 1
+            if index < size:
+                reservoir.append((index, line))
+            elif index == following:
+                reservoir[generator.randrange(size)] = (index, line)
+                weight *= math.exp(math.log(generator.random() or 1e-300) / size)
+                following += 1 + int(math.log(generator.random() or 1e-300) / math.log(1.0 - weight)) \
+                    if weight < 1 else 1
+        reservoir.sort()
+        self._start_file(float(total) / len(reservoir) if reservoir else 1.0)
+        for _, line in reservoir:
+            self.lines += 1
+            yield line
+        self._end_file(total)
+
+
+    def _column(self, key):
+        column = self._columns.get(key)
+        if column is None:
+            column = self._columns[key] = len(self._columns)
+        return column
+
+
+    def add_match(self, match):
+        '''Record a match of a selected line.
+
+        Arguments
+        ---------
+        match : Match
+            The match. Its line is counted from the beginning of the
+            file (as in Processor.processLines()).
+        '''
+        if not is_counted(match):
+            return
+        line = self._file_base + match.line
+        unit = line
+        if self._blocks is not None:
+            # the block containing the line (blocks are short, and
+            # matches come in order, so this is usually the last one)
+            index = len(self._blocks) - 1
+            while self._blocks[index] > line:
+                index -= 1
+            unit = self._units + index
+        index = triple_index(match)
+        for key in ((match.kind, match.value), ('asym', 0) if index is None else ('triple', index)):
+            self._match_units.append(unit)
+            self._match_columns.append(self._column(key))
+            self._match_scales.append(self._scale)
+
+
+    def estimates(self, low=None, high=None):
+        '''Estimate the counts of the whole corpus.
+
+        Arguments
+        ---------
+        low, high : int
+            The range of interest (for the estimated numbers and number
+            words of interest).
+
+        Result
+        ------
+        SampleEstimates
+        '''
+        return SampleEstimates(self, low, high)
+
+
+class SampleEstimates:
+    '''The counts of a corpus estimated from a Sample, together with
+    their bootstrap confidence intervals. Every estimate is a list
+    [estimate, lower bound, upper bound].
+
+    Attributes
+    ----------
+    sample : dict
+        The description of the sample (cf. Sample.metadata()).
+    replicates : int
+        The number of bootstrap replicates.
+    level : float
+        The confidence level of the intervals.
+    nums, numwords : list of list
+        For every value found in the sample: [value, estimate, lower,
+        upper] (for numbers and number words).
+    tripleMatches : list of list
+        The estimated approximator-roundness-unit counts.
+    asym : list
+        The estimated number of asymmetrically modified numerals.
+    totals : dict
+        The estimated 'numbers', 'words', 'numbers_of_interest' and
+        'words_of_interest'.
+    '''
+
+    def __init__(self, sample, low=None, high=None):
+        self.sample = sample.metadata()
+        self.replicates = sample.replicates
+        self.level = sample.level
+        index = sample._columns
+        n = len(index)
+        if np is None:
+            # no intervals without NumPy, only the estimates
+            point = [0.0] * n
+            for column, scale in zip(sample._match_columns, sample._match_scales):
+                point[column] += scale
+            boot = None
+        else:
+            units = np.asarray(sample._match_units, dtype=np.int64)
+            columns = np.asarray(sample._match_columns, dtype=np.int64)
+            scales = np.asarray(sample._match_scales, dtype=np.float64)
+            point = np.bincount(columns, weights=scales, minlength=n)
+            boot = self._bootstrap(units, columns, scales, n, sample.replicates,
+                                   np.random.RandomState(sample.seed))
+
+        def estimate(selected):
+            value = float(sum(point[column] for column in selected))
+            if boot is None:
+                return [value, None, None]
+            replicated = boot[:, selected].sum(axis=1)
+            bounds = np.percentile(replicated, [50 * (1 - self.level), 50 * (1 + self.level)])
+            return [value, float(bounds[0]), float(bounds[1])]
+
+        def columns_of(kind, low=None, high=None):
+            return [column for key, column in index.items() if key[0] == kind and
+                    (low is None or key[1] >= low) and (high is None or key[1] <= high)]
+
+        self.nums = sorted([key[1]] + estimate([column]) for key, column in index.items()
+                           if key[0] == 'num')
+        self.numwords = sorted([key[1]] + estimate([column]) for key, column in index.items()
+                               if key[0] == 'word')
+        self.tripleMatches = [estimate(columns_of('triple', i, i)) for i in range(12)]
+        self.asym = estimate(columns_of('asym'))
+        self.totals = {'numbers': estimate(columns_of('num')),
+                       'words': estimate(columns_of('word')),
+                       'numbers_of_interest': estimate(columns_of('num', low, high)),
+                       'words_of_interest': estimate(columns_of('word', low, high))}
+
+
+    @staticmethod
+    def _bootstrap(units, columns, scales, n, replicates, generator):
+        '''The Poisson bootstrap replicates of the counts.
+
+        Result
+        ------
+        numpy.ndarray
+            The replicated counts (replicates x n).
+        '''
+        if not len(units):
+            return np.zeros((replicates, n))
+        unit_ids, inverse = np.unique(units, return_inverse=True)
+        inverse = inverse.ravel()
+        boot = np.empty((replicates, n))
+        # as many replicates at a time as fit into about 10^7 weights
+        batch = max(1, min(replicates, 10**7 // len(columns)))
+        for first in range(0, replicates, batch):
+            count = min(batch, replicates - first)
+            weights = generator.poisson(1.0, (count, len(unit_ids)))[:, inverse] * scales
+            cells = (np.arange(count)[:, None] * n + columns[None, :]).ravel()
+            boot[first:first + count] = np.bincount(cells, weights=weights.ravel(),
+                                                    minlength=count * n).reshape(count, n)
+        return boot
+
+
+    def as_dict(self):
+        '''The estimates as dictionary (e.g. for storing them as JSON).
+        '''
+        return dict(self.__dict__)
+
+
+    def format(self, bins=0):
+        '''The estimates as human readable text.
+
+        Arguments
+        ---------
+        bins : int
+            The number of the most frequent values to list (for
+            numbers and number words).
+        '''
+        def interval(values):
+            if values[1] is None:
+                return '{0:,.0f}'.format(values[0])
+            return '{0:,.0f} [{1:,.0f}, {2:,.0f}]'.format(*values)
+
+        sample = self.sample
+        lines = ['Estimates from a {0} sample of {1:,} of about {2:,} lines '
+                 '({3:.0f}% bootstrap intervals, {4} replicates):'.
+                 format(sample['method'], sample['lines'], sample['total_lines'],
+                        100 * self.level, self.replicates)]
+        for name in ('numbers', 'numbers_of_interest', 'words', 'words_of_interest'):
+            lines.append(' * {0}: {1}'.format(name.replace('_', ' '), interval(self.totals[name])))
+        for name, values in zip(triple_names, self.tripleMatches):
+            lines.append(' * {0}: {1}'.format(name, interval(values)))
+        lines.append(' * asymmetrically modified: {0}'.format(interval(self.asym)))
+        for name, histogram in (('numbers', self.nums), ('number words', self.numwords)):
+            top = sorted(histogram, key=lambda values: -values[1])[:bins]
+            if top:
+                lines.append(' * most frequent {0}: {1}'.format(
+                    name, ', '.join('{0} ({1})'.format(values[0], interval(values[1:]))
+                                    for values in top)))
+        return '\n'.join(lines)
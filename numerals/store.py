@@ -0,0 +1,292 @@
+"""
+Store Results in files, so that they can be combined later.
+
+A results file contains the Results of a run (the histograms of
+numbers and number words, the approximator-roundness-unit counts, the
+number of asymmetrically modified numerals, the unit counts, the line
+and match totals and the counts of the Counter), including the Results
+of further ranges, together with a description of the run (language,
+ranges, corpus files). Results files of runs with the same ranges can
+be merged without processing the corpora again (see merge()).
+
+The files use a simple versioned binary layout:
+
+    magic         6 bytes  b'NUMRES'
+    version       uint16
+    metadata      uint32 length + UTF-8 encoded JSON
+    data          uint32 length + zlib compressed Results
+
+where the data consist of the number of further ranges (uint32),
+followed by the Results (and then the Results of every further range),
+each stored as
+
+    totals        7 int64  lines, skipped, duplicates, matches, numbers,
+                           words, asym
+    triples       12 int64 the approximator-roundness-unit counts
+    nums          counts (of the values from 0)
+    numwords      counts
+    counter       counts
+    units         uint32 capacity (0: exact counts), int64 error
+                  (cf. topk.py), uint32 number of units, for each
+                  unit: uint32 length + UTF-8 encoded unit, int64 count
+
+and all counts (cf. Counter) are stored as
+
+    range         3 int64  min, max, head
+    head          (head-min+1) int64 values
+    tail          uint8 0 (no tail), 1 (exact) or 2 (sketch), then for
+                  exact tails: uint32 n, n int64 values, n int64 counts,
+                  for sketches: uint32 width, uint32 depth,
+                  width*depth int64 counters
+
+All numbers are little endian.
+"""
+
+import io
+import sys
+import json
+import zlib
+import struct
+from array import array
+
+from counter import Counter, CountMinSketch
+from results import Results
+
+
+'''The identification of results files.'''
+magic = b'NUMRES'
+
+'''The version of the file format.'''
+version = 1
+
+_header = struct.Struct('<6sH')
+_length = struct.Struct('<I')
+_count = struct.Struct('<q')
+_tail = struct.Struct('<B')
+_sketch = struct.Struct('<II')
+
+
+def _pack_values(values):
+    data = array('q', [int(v) for v in values])
+    if sys.byteorder != 'little':
+        data.byteswap()
+    return data.tobytes()
+
+
+def _unpack_values(data, offset, n):
+    values = array('q')
+    values.frombytes(data[offset:offset + 8*n])
+    if len(values) != n:
+        raise ValueError('truncated results file')
+    if sys.byteorder != 'little':
+        values.byteswap()
+    return values.tolist(), offset + 8*n
+
+
+def _pack_counts(counts, out):
+    if isinstance(counts, list):
+        # a histogram of the values from 0
+        out.append(_pack_values([0, len(counts) - 1, len(counts) - 1]))
+        out.append(_pack_values(counts))
+        out.append(_tail.pack(0))
+        return
+    out.append(_pack_values([counts._min_value, counts._max_value, counts.head]))
+    out.append(_pack_values(counts.to_array()))
+    tail = counts.tail
+    if tail is None:
+        out.append(_tail.pack(0))
+    elif isinstance(tail, CountMinSketch):
+        out.append(_tail.pack(2))
+        out.append(_sketch.pack(tail.width, tail.depth))
+        out.append(_pack_values(tail.to_array()))
+    else:
+        values, tail_counts = tail.to_arrays()
+        out.append(_tail.pack(1))
+        out.append(_length.pack(len(values)))
+        out.append(_pack_values(values))
+        out.append(_pack_values(tail_counts))
+
+
+def _unpack_counts(data, offset, histogram=False):
+    (low, high, head), offset = _unpack_values(data, offset, 3)
+    values, offset = _unpack_values(data, offset, max(head - low + 1, 0))
+    tail, = _tail.unpack_from(data, offset)
+    offset += _tail.size
+    if tail == 0 and histogram:
+        return values, offset
+    values = {'min': low, 'max': high, 'counts': values}
+    if tail == 1:
+        n, = _length.unpack_from(data, offset)
+        tail_values, offset = _unpack_values(data, offset + _length.size, n)
+        tail_counts, offset = _unpack_values(data, offset, n)
+        values.update(head=head, tail=[tail_values, tail_counts])
+    elif tail == 2:
+        width, depth = _sketch.unpack_from(data, offset)
+        values.update(head=head, sketch=width)
+        values['tail'], offset = _unpack_values(data, offset + _sketch.size, width*depth)
+    return Counter.from_dict(values), offset
+
+
+def _pack_results(results, out):
+    out.append(_pack_values([results.lines, results.skipped, results.duplicates,
+                             results.matches, results.numbers, results.words, results.asym]))
+    out.append(_pack_values(results.tripleMatches))
+    for counts in (results.nums, results.numwords, results.counter):
+        _pack_counts(counts, out)
+    out.append(_length.pack(results.unit_capacity() or 0))
+    out.append(_count.pack(results.unit_error()))
+    out.append(_length.pack(len(results.unit_info)))
+    for unit, count in sorted(results.unit_info.items()):
+        name = unit.encode('utf8')
+        out.append(_length.pack(len(name)))
+        out.append(name)
+        out.append(_count.pack(count))
+
+
+def _unpack_results(data, offset):
+    (lines, skipped, duplicates, matches, numbers, words, asym), offset = \
+        _unpack_values(data, offset, 7)
+    triples, offset = _unpack_values(data, offset, 12)
+    histograms = []
+    for _ in range(2):
+        histogram, offset = _unpack_counts(data, offset, histogram=True)
+        histograms.append(histogram)
+    counter, offset = _unpack_counts(data, offset)
+    capacity, = _length.unpack_from(data, offset)
+    error, = _count.unpack_from(data, offset + _length.size)
+    offset += _length.size + _count.size
+    results = Results(0, counter._min_value, counter._max_value, capacity or None)
+    results.counter = counter
+    results.lines, results.skipped, results.matches = lines, skipped, matches
+    results.duplicates = duplicates
+    results.numbers, results.words, results.asym = numbers, words, asym
+    results.tripleMatches = triples
+    results.nums, results.numwords = histograms
+    n, = _length.unpack_from(data, offset)
+    offset += _length.size
+    units = {}
+    for _ in range(n):
+        length, = _length.unpack_from(data, offset)
+        offset += _length.size
+        unit = data[offset:offset + length].decode('utf8')
+        offset += length
+        units[unit], = _count.unpack_from(data, offset)
+        offset += _count.size
+    results.set_units(units, error)
+    return results, offset
+
+
+def save(path, results, metadata):
+    '''Save Results to a file.
+
+    Arguments
+    ---------
+    path : str
+        The name of the file.
+    results : Results
+        The Results to save (including the Results of further ranges).
+    metadata : dict
+        The description of the run (see Processor.metadata()).
+        It has to be serializable as JSON.
+    '''
+    meta = json.dumps(metadata).encode('utf8')
+    out = [_length.pack(len(results.ranges))]
+    for r in [results] + results.ranges:
+        _pack_results(r, out)
+    data = zlib.compress(b''.join(out))
+    with io.open(path, 'wb') as f:
+        f.write(_header.pack(magic, version))
+        f.write(_length.pack(len(meta)))
+        f.write(meta)
+        f.write(_length.pack(len(data)))
+        f.write(data)
+
+
+def load(path):
+    '''Load Results from a file.
+
+    Arguments
+    ---------
+    path : str
+        The name of the file.
+
+    Result
+    ------
+    (Results, dict)
+        The Results and the description of the run.
+
+    Raises
+    ------
+    ValueError
+        The file is not a (valid) results file.
+    '''
+    with io.open(path, 'rb') as f:
+        header = f.read(_header.size)
+        if len(header) != _header.size or _header.unpack(header)[0] != magic:
+            raise ValueError('"{}" is not a results file'.format(path))
+        file_version = _header.unpack(header)[1]
+        if file_version != version:
+            raise ValueError('"{}" has the unsupported version {}'.
+                             format(path, file_version))
+        try:
+            n, = _length.unpack(f.read(_length.size))
+            metadata = json.loads(f.read(n).decode('utf8'))
+            n, = _length.unpack(f.read(_length.size))
+            data = zlib.decompress(f.read(n))
+            ranges, = _length.unpack_from(data, 0)
+            results, offset = _unpack_results(data, _length.size)
+            for _ in range(ranges):
+                range_results, offset = _unpack_results(data, offset)
+                results.ranges.append(range_results)
+        except (struct.error, zlib.error) as e:
+            raise ValueError('"{}" is damaged ({})'.format(path, e))
+    return results, metadata
+
+
+'''The parts of the description of runs that have to be the same
+to merge their Results.'''
+compatible_keys = ('range', 'ranges', 'n_range', 'head', 'sketch', 'source')
+
+'''The values of these parts for files that do not contain them.'''
+_defaults = {'source': 'sentences'}
+
+
+def merge(paths):
+    '''Merge the Results of several files. The runs have to count the
+    same ranges. Only the histograms and counts are added, i.e. this
+    takes time in the size of the histograms, not of the corpora.
+
+    Arguments
+    ---------
+    paths : list of str
+        The names of the files.
+
+    Result
+    ------
+    (Results, dict)
+        The sum of the Results and the description of the merged
+        runs (the 'corpora' of all runs are listed).
+
+    Raises
+    ------
+    ValueError
+        A file is not a results file or the ranges differ.
+    '''
+    results, metadata = None, None
+    for path in paths:
+        other, other_metadata = load(path)
+        if results is None:
+            results, metadata = other, other_metadata
+            metadata['corpora'] = list(metadata.get('corpora', []))
+            continue
+        for key in compatible_keys:
+            value, other_value = (m.get(key, _defaults.get(key)) for m in (metadata, other_metadata))
+            if value != other_value:
+                raise ValueError('"{}" can not be merged: its {} is {}, not {}'.
+                                 format(path, key, other_value, value))
+        results.merge(other)
+        metadata['corpora'].extend(other_metadata.get('corpora', []))
+        metadata['unit_capacity'] = results.unit_capacity()
+        if other_metadata.get('language') != metadata.get('language'):
+            metadata['language'] = None # mixed
+    return results, metadata
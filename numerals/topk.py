@@ -0,0 +1,138 @@
+"""
+Count the most frequent items of a stream in bounded memory.
+
+The units following numerals are arbitrary tokens, so on a large
+corpus an exact count of all units needs a lot of memory. A TopK
+summary keeps at most 2*capacity counters (Misra-Gries, with the
+counters being pruned in batches): whenever the summary grows too
+large, the (capacity+1)-th largest count is subtracted from all
+counters and the counters that drop to zero are removed.
+
+The counts of a summary are lower bounds: the true count of an item
+is at most `error` larger, where `error` (the total amount subtracted)
+never exceeds N/(capacity+1) for a stream of N items. Every item
+occurring more often than that is in the summary. Summaries (e.g. of
+shards of a corpus) can be merged, and the bound holds for the merged
+summary as well (cf. Agarwal et al., Mergeable Summaries, 2012). As
+long as there are no more than capacity different items, the counts
+are exact.
+"""
+
+import heapq
+
+
+class TopK:
+    '''A summary of the counts of the most frequent items.
+    '''
+
+    def __init__(self, capacity, counts=None, error=0):
+        '''Create a new summary.
+
+        Arguments
+        ---------
+        capacity : int
+            The number of items to keep (at least 1).
+        counts : dict
+            The counts of the summary (e.g. restored from a file).
+        error : int
+            The maximal undercount of these counts.
+        '''
+        if capacity < 1:
+            raise ValueError('the capacity has to be at least 1, not {}'.format(capacity))
+        self.capacity = capacity
+        self.error = error # the maximal undercount of every item
+        self._counts = dict(counts or {})
+
+
+    def __len__(self):
+        return len(self._counts)
+
+
+    def __contains__(self, item):
+        return item in self._counts
+
+
+    def __getitem__(self, item):
+        return self._counts[item]
+
+
+    def get(self, item, default=None):
+        return self._counts.get(item, default)
+
+
+    def items(self):
+        '''The items in the summary and their (lower bound) counts.
+        '''
+        return self._counts.items()
+
+
+    def add(self, item, count=1):
+        '''Count an item.
+
+        Arguments
+        ---------
+        item : hashable
+            The item.
+        count : int
+            The number of occurrences.
+        '''
+        counts = self._counts
+        counts[item] = counts.get(item, 0) + count
+        if len(counts) > 2*self.capacity:
+            self._prune()
+
+
+    def _prune(self):
+        '''Reduce the summary to (at most) capacity items.
+        '''
+        counts = self._counts
+        if len(counts) <= self.capacity:
+            return
+        cut = heapq.nlargest(self.capacity + 1, counts.values())[-1]
+        self._counts = {item: count - cut for item, count in counts.items() if count > cut}
+        self.error += cut
+
+
+    def merge(self, other):
+        '''Add another summary (or a dictionary of exact counts).
+
+        Arguments
+        ---------
+        other : TopK or dict
+            The counts to add.
+        '''
+        counts = self._counts
+        for item, count in other.items():
+            counts[item] = counts.get(item, 0) + count
+        if isinstance(other, TopK):
+            self.error += other.error
+        self._prune()
+
+
+    def bounds(self, item):
+        '''The range of the true count of an item.
+
+        Result
+        ------
+        (int, int)
+            The minimal and maximal count.
+        '''
+        count = self._counts.get(item, 0)
+        return count, count + self.error
+
+
+    def most_common(self, n=None):
+        '''The most frequent items.
+
+        Arguments
+        ---------
+        n : int
+            The number of items (default: all items in the summary).
+
+        Result
+        ------
+        list of (item, int)
+            The items and their counts, most frequent first.
+        '''
+        items = sorted(self._counts.items(), key=lambda item: (-item[1], item[0]))
+        return items if n is None else items[:n]
@@ -0,0 +1,95 @@
+import re
+
+
+class Trie:
+    '''A prefix tree of words, used to build compact regular
+    expressions matching any of these words.
+
+    A flat alternation "one|two|twenty|twenty-one|..." is tried one
+    branch after another at every position of the text. The
+    regular expression built from a Trie shares common prefixes
+    ("t(?:w(?:o|enty(?:\\-one)?)...)"), so that each character of the
+    text is only compared against the possible continuations.
+
+    The resulting expression prefers longer words: if several words
+    match at the same position (which means that one of them is a
+    prefix of the other), the longest one is tried first, followed by
+    its prefixes in decreasing length.
+    '''
+
+    def __init__(self, words=()):
+        '''Create a new Trie.
+
+        Arguments
+        ---------
+        words : iterable of str
+            The words to add to the trie.
+        '''
+        self._root = {}
+        for word in words:
+            self.add(word)
+
+
+    def add(self, word):
+        '''Add a word to the trie.
+
+        Arguments
+        ---------
+        word : str
+            The word to add.
+        '''
+        node = self._root
+        for char in word:
+            node = node.setdefault(char, {})
+        # the empty string marks the end of a word
+        node[''] = None
+
+
+    def pattern(self):
+        '''Build a regular expression matching all words in this trie.
+
+        Result
+        ------
+        str
+            The regular expression (without any capturing groups).
+        '''
+        return self._pattern(self._root)
+
+
+    def _pattern(self, node):
+        terminal = '' in node
+        alternatives = [re.escape(char) + self._pattern(child)
+                        for char, child in node.items() if char]
+        if not alternatives:
+            return ''
+        if len(alternatives) == 1 and not terminal:
+            return alternatives[0]
+        pattern = '(?:' + '|'.join(alternatives) + ')'
+        return pattern + '?' if terminal else pattern
+
+
+def prefers_longest(words):
+    '''Check whether an ordered alternation of the given words behaves
+    like a Trie, i.e. whether every word is listed before all
+    of its prefixes.
+
+    Arguments
+    ---------
+    words : list of str
+        The alternatives, in the order in which they are tried.
+
+    Result
+    ------
+    bool
+        True if a Trie of the words matches the same as the
+        alternation "|".join(words).
+    '''
+    seen = set()
+    for word in words:
+        # a prefix of this word that has already been seen
+        # would be tried first by the alternation
+        for i in range(1, len(word)):
+            if word[:i] in seen:
+                return False
+        seen.add(word)
+    return True
@@ -0,0 +1,311 @@
+from __future__ import print_function
+
+import io
+import json
+import os
+import hashlib
+from collections import OrderedDict
+
+
+class UnitIndex:
+    '''A UnitIndex maps units (the word following a numeral) to the
+    first unit category they belong to according to the WordNet
+    hierarchy, or to None if they belong to no category at all
+    (i.e. the unit is excluded).
+
+    The hyponym closure of every category is computed once from
+    WordNet, after which classifying a new unit only costs a single
+    synset lookup. Classified units are kept in a table (bounded to
+    `max_size` entries, least recently used entries are dropped first),
+    so that every further occurrence of a unit costs just one
+    dictionary lookup. The table can be saved to and loaded from disk
+    to be reused between runs.
+    '''
+
+    # The version of the file format written by save().
+    version = 1
+
+    # The maximal number of units to keep in the table.
+    max_size = 1000000
+
+
+    def __init__(self, categories, wordnet=None, wordnet_loader=None, wordnet_version=None):
+        '''Create a new UnitIndex.
+
+        Arguments
+        ---------
+        categories : list of str
+            The names of the unit categories, in the order in which
+            they should be tested.
+        wordnet : WordNetCorpusReader
+            The WordNet used to classify units. If None, only units
+            already in the table (e.g. loaded from a file) can be
+            assigned to a category.
+        wordnet_loader : callable
+            A function without arguments returning the WordNet (or
+            None). It is called when WordNet is needed for the first
+            time, i.e. WordNet is not loaded as long as all units
+            are found in the table. Replaces `wordnet` if given.
+        wordnet_version : callable
+            A function without arguments returning the version of the
+            WordNet the loader would return (or None if there is none)
+            without loading it (see fingerprint()).
+        '''
+        self.categories = list(categories)
+        self._wordnet = wordnet
+        self._wordnet_loader = wordnet_loader
+        self._wordnet_version = wordnet_version
+        self._members = None
+        self._table = OrderedDict()
+        self._new = None
+        self.dirty = False
+
+
+    def __len__(self):
+        return len(self._table)
+
+
+    def __contains__(self, unit):
+        return unit.lower() in self._table
+
+
+    @property
+    def wordnet(self):
+        '''The WordNet used to classify units (loaded on first use).
+        '''
+        if self._wordnet_loader is not None:
+            self._wordnet = self._wordnet_loader()
+            self._wordnet_loader = None
+        return self._wordnet
+
+
+    @wordnet.setter
+    def wordnet(self, wordnet):
+        self._wordnet = wordnet
+        self._wordnet_loader = None
+
+
+    def prepare(self):
+        '''Load WordNet and compute the members of the categories in
+        advance (otherwise this happens when the first unit not in
+        the table is classified).
+        '''
+        if self.wordnet is not None:
+            self._category_members()
+
+
+    def fingerprint(self):
+        '''A fingerprint of the classification of units: the categories
+        and the version of WordNet, or (without WordNet) the entries of
+        the table. Units are classified in the same way by indexes with
+        the same fingerprint. WordNet is not loaded for this if its
+        version can be determined otherwise (see __init__()).
+
+        Result
+        ------
+        str
+            The fingerprint (a hexadecimal SHA-1 digest).
+        '''
+        digest = hashlib.sha1(repr(self.categories).encode('utf8'))
+        if self._wordnet_loader is not None and self._wordnet_version is not None:
+            version = self._wordnet_version()
+        else:
+            version = self.wordnet.get_version() if self.wordnet is not None else None
+        if version is not None:
+            digest.update(u'WordNet {}'.format(version).encode('utf8'))
+        else:
+            for key, category in sorted(self._table.items(), key=lambda item: item[0]):
+                digest.update(u'{0}\t{1}\n'.format(key, category).encode('utf8'))
+        return digest.hexdigest()
+
+
+    def _category_members(self):
+        '''The sets of synsets belonging to each category, i.e.
+        the (transitive) hyponyms of all synsets of the category name.
+        A synset belongs to a category if and only if one of
+        the category synsets is in its hypernym closure (cf.
+        English.is_in_category()).
+        '''
+        if self._members is None:
+            # assigned when complete, as this may run in a warm-up
+            # thread (see prepare())
+            all_members = []
+            for category in self.categories:
+                members = set()
+                for c in self.wordnet.synsets(category):
+                    members.update(c.closure(lambda s: s.hyponyms()))
+                all_members.append((category, members))
+            self._members = all_members
+        return self._members
+
+
+    def classify(self, unit):
+        '''Determine the category of a unit from WordNet, bypassing
+        the table.
+
+        Arguments
+        ---------
+        unit : str
+            The unit to classify.
+
+        Result
+        ------
+        str or None
+            The first category the unit belongs to, or None if it is
+            in no category (or if no WordNet is available).
+        '''
+        if self.wordnet is None:
+            return None
+        synsets = self.wordnet.synsets(unit)
+        if synsets:
+            for category, members in self._category_members():
+                for s in synsets:
+                    if s in members:
+                        return category
+        return None
+
+
+    def category(self, unit):
+        '''Look up the category of a unit.
+
+        Arguments
+        ---------
+        unit : str
+            The unit to look up.
+
+        Result
+        ------
+        str or None
+            The first category the unit belongs to, or None if it
+            is excluded.
+        '''
+        # WordNet does not distinguish case either
+        key = unit.lower()
+        try:
+            category = self._table[key]
+        except KeyError:
+            category = self.classify(key)
+            if self.wordnet is not None:
+                self._store(key, category)
+            return category
+        self._table.move_to_end(key)
+        return category
+
+
+    def _store(self, key, category):
+        self._table[key] = category
+        if self._new is not None:
+            self._new.append(key)
+        self.dirty = True
+        if len(self._table) > self.max_size:
+            self._table.popitem(last=False)
+
+
+    def items(self):
+        '''All entries of the table.
+
+        Result
+        ------
+        list of (str, str or None)
+            The units and their categories.
+        '''
+        return list(self._table.items())
+
+
+    def new_items(self):
+        '''The entries added to the table since the last call of
+        this method. New entries are only tracked after this method
+        has been called for the first time.
+
+        Result
+        ------
+        list of (str, str or None)
+            The units and their categories.
+        '''
+        new, self._new = self._new or [], []
+        return [(key, self._table[key]) for key in new if key in self._table]
+
+
+    def update(self, items):
+        '''Add entries to the table (e.g. obtained from items() of
+        another UnitIndex).
+
+        Arguments
+        ---------
+        items : iterable of (str, str or None)
+            The units and their categories.
+        '''
+        for key, category in items:
+            if key not in self._table:
+                self._store(key, category)
+
+
+    def precompute(self, units=None):
+        '''Classify a collection of units in advance.
+
+        Arguments
+        ---------
+        units : iterable of str
+            The units to classify. If None, all lemma names
+            known to WordNet are classified.
+        '''
+        if units is None:
+            if self.wordnet is None:
+                return
+            units = self.wordnet.all_lemma_names()
+        for unit in units:
+            key = unit.lower()
+            if key not in self._table:
+                self._store(key, self.classify(key))
+
+
+    def load(self, path):
+        '''Load a table previously stored by save(). Entries
+        of the file are added to the current table.
+
+        Arguments
+        ---------
+        path : str
+            The file to read.
+
+        Raises
+        ------
+        ValueError
+            The file was not written by a compatible UnitIndex,
+            or for other unit categories.
+        '''
+        with io.open(path, 'r', encoding='utf8') as f:
+            data = json.load(f)
+        if data.get('version') != self.version:
+            raise ValueError("unsupported unit index version: {}".
+                             format(data.get('version')))
+        if data.get('categories') != self.categories:
+            raise ValueError("unit index \"{}\" was built for different categories".
+                             format(path))
+        for key, category in data['units']:
+            self._table[key] = category
+        while len(self._table) > self.max_size:
+            self._table.popitem(last=False)
+
+
+    def save(self, path):
+        '''Store the current table in a file.
+
+        Arguments
+        ---------
+        path : str
+            The file to write. It is replaced atomically.
+        '''
+        data = {
+            'version': self.version,
+            'categories': self.categories,
+            'units': list(self._table.items())
+        }
+        directory = os.path.dirname(os.path.abspath(path))
+        if not os.path.isdir(directory):
+            os.makedirs(directory)
+        tmp = path + '.tmp'
+        with io.open(tmp, 'w', encoding='utf8') as f:
+            f.write(json.dumps(data, ensure_ascii=False))
+        os.replace(tmp, path)
+        self.dirty = False
@@ -0,0 +1,101 @@
+"""
+Count numerals in the word frequency lists of Wortschatz corpora.
+
+Every Wortschatz corpus comes with a list of the frequencies of all
+its words ("*-words.txt", one word per line: ID, word, frequency,
+separated by tabulators). The histograms of numbers and number words
+can be obtained from this list directly, which is much faster than
+searching all sentences.
+
+The words are parsed with the rules of the language: numbers are
+digits with optional thousands separators ("1,000" in English,
+"1.000" in German), number words are those of the range counted
+(cf. Language.numberwords_range(), matched ignoring case).
+
+These counts are approximations of the counts obtained from the
+sentences: the context of the words is not known, so all occurrences
+are counted (also those followed by an excluded unit or by a
+magnitude, as in "5 million"), and number words consisting of several
+words ("one hundred") are only counted if the list contains them as
+one entry. Statistics that depend on the context (approximators,
+roundness combinations, units, lines containing numbers) are not
+available (see unavailable).
+"""
+
+import re
+
+
+'''The statistics that can not be obtained from a word list.'''
+unavailable = ['approximators and approximator-roundness-unit combinations',
+               'asymmetrically modified numerals', 'units and unit categories',
+               'lines containing numbers']
+
+
+def read(lines):
+    '''Read a word frequency list.
+
+    Arguments
+    ---------
+    lines : iterable of str
+        The lines of the list (ID, word and frequency separated by
+        tabulators; further columns between word and frequency are
+        ignored). Malformed lines are skipped.
+
+    Result
+    ------
+    A generator yielding (word, frequency) for every line.
+    '''
+    for line in lines:
+        fields = line.rstrip('\r\n').split('\t')
+        if len(fields) < 3:
+            continue
+        try:
+            frequency = int(fields[-1])
+        except ValueError:
+            continue
+        yield fields[1], frequency
+
+
+def count(processor, lines):
+    '''Count the numbers and number words of a word frequency list.
+
+    Arguments
+    ---------
+    processor : Processor
+        The processor providing the language and the ranges to count.
+    lines : iterable of str
+        The lines of the word list (cf. read()).
+
+    Result
+    ------
+    Results
+        The Results for the word list (with further ranges). Only the
+        histograms, the Counters and the numbers of numbers and number
+        words are set; `lines` is the number of lines of the list.
+    '''
+    language = processor.language
+    number = re.compile(r'\d+(?:{0}\d\d\d)*$'.format(re.escape(language.thousandsSeparator)))
+    words = language._numberword_values # of the widest range
+    separator = language.thousandsSeparator
+    numbers, numberwords = {}, {}
+    entries = 0
+    for word, frequency in read(lines):
+        entries += 1
+        if number.match(word):
+            value = int(word.replace(separator, ''))
+            numbers[value] = numbers.get(value, 0) + frequency
+        else:
+            value = words.get(word.casefold())
+            if value is not None:
+                numberwords[value] = numberwords.get(value, 0) + frequency
+
+    results = processor.newResults()
+    for (low, high), range_results in zip(processor._ranges, [results] + results.ranges):
+        # only the number words of the range are matched in sentences
+        word_low, word_high = processor._word_range((low, high))
+        range_results.lines = entries
+        range_results.add_counts('num', numbers)
+        range_results.add_counts('word', {value: frequency for value, frequency
+                                          in numberwords.items()
+                                          if word_low <= value <= word_high})
+    return results
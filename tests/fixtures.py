@@ -0,0 +1,50 @@
+import os
+import io
+import shutil
+import tempfile
+import unittest
+
+from languages import English
+from processor import Processor
+
+class CorpusTestCase(unittest.TestCase):
+    '''A test case with a small corpus file (self.path) in a temporary
+    directory (self.directory), processed with a range and a further
+    range and a fixed set of unit categories.'''
+
+    units = ['people', 'dogs', 'percent', 'years']
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'corpus.txt')
+        self.write(5000)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def write(self, n, mode='w'):
+        units = self.units
+        with io.open(self.path, mode, encoding='utf8') as f:
+            for i in range(n):
+                f.write(u'{0}\tAbout {1} {2} and {3} {4} came.\n'.format(
+                    i, i % 150, units[i % 4], i % 7, units[i % 3]))
+
+    def processor(self, name):
+        '''A processor writing its match files to the directory name.'''
+        language = English()
+        language.unit_index.update([('people', 'organism'), ('dogs', 'organism'),
+                                    ('percent', None), ('years', 'time_period')])
+        processor = Processor(language, 0, 100, os.path.join(self.directory, name),
+                              ranges=[(0, 10)])
+        processor.verbosity = 0
+        processor._show_progress_flag = False
+        return processor
+
+    def read(self, name):
+        '''The contents of the match files in the directory name.'''
+        directory = os.path.join(self.directory, name)
+        files = {}
+        for file in os.listdir(directory):
+            with io.open(os.path.join(directory, file), 'rb') as f:
+                files[file] = f.read()
+        return files
@@ -0,0 +1,75 @@
+import os
+import io
+import unittest
+
+import cache
+from languages import English
+from processor import Processor
+from tests.fixtures import CorpusTestCase
+
+class CacheTest(CorpusTestCase):
+
+    def setUp(self):
+        super(CacheTest, self).setUp()
+        self.chunk_size, cache.chunk_size = cache.chunk_size, 40000
+
+    def tearDown(self):
+        cache.chunk_size = self.chunk_size
+        super(CacheTest, self).tearDown()
+
+    def process(self, name, cached=True, max_size=None):
+        processor = self.processor(name)
+        if cached:
+            processor.enableCache(os.path.join(self.directory, 'cache'), max_size)
+        processor.processPath(self.path)
+        processor.close()
+        return processor
+
+    def assertSame(self, processor, name, other, other_name):
+        self.assertEqual(processor.total.as_dict(), other.total.as_dict())
+        self.assertEqual(self.read(name), self.read(other_name))
+
+    def test_cached(self):
+        whole = self.process('whole', cached=False)
+        first = self.process('first')
+        self.assertEqual(first.cache.hits, 0)
+        second = self.process('second')
+        self.assertEqual(second.cache.misses, 0)
+        self.assertSame(first, 'first', whole, 'whole')
+        self.assertSame(second, 'second', whole, 'whole')
+
+    def test_changed(self):
+        first = self.process('first')
+        self.write(10, 'a')
+        changed = self.process('changed')
+        self.assertEqual(changed.cache.misses, 1)
+        self.assertEqual(changed.cache.hits, first.cache.misses - 1)
+        self.assertSame(changed, 'changed', self.process('whole', cached=False), 'whole')
+
+    def test_inserted(self):
+        first = self.process('first')
+        with io.open(self.path, encoding='utf8') as f:
+            lines = f.readlines()
+        with io.open(self.path, 'w', encoding='utf8') as f:
+            f.write(u''.join(lines[:100] + [u'x\tAbout 3 dogs came.\n'] + lines[100:]))
+        changed = self.process('changed')
+        self.assertEqual(changed.cache.misses, 1) # only the chunk of the new line
+        self.assertEqual(changed.cache.hits, first.cache.misses - 1)
+        self.assertSame(changed, 'changed', self.process('whole', cached=False), 'whole')
+
+    def test_other_configuration(self):
+        self.process('first')
+        processor = Processor(English(), 0, 50, os.path.join(self.directory, 'other'))
+        processor.enableCache(os.path.join(self.directory, 'cache'))
+        processor.verbosity = 0
+        processor._show_progress_flag = False
+        processor.processPath(self.path)
+        self.assertEqual(processor.cache.hits, 0)
+
+    def test_evict(self):
+        processor = self.process('first', max_size=120000)
+        self.assertLessEqual(processor.cache.size(), 120000)
+        self.assertGreater(processor.cache.size(), 0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,69 @@
+import os
+import unittest
+
+from languages import English
+from processor import Processor
+from results import Results
+from tests.fixtures import CorpusTestCase
+
+class CheckpointTest(CorpusTestCase):
+
+    def run_interrupted(self, jobs, checkpoints):
+        '''Process the corpus, interrupted after some checkpoints, and
+        resume the run.
+        '''
+        checkpoint = os.path.join(self.directory, 'checkpoint.gz')
+        processor = self.processor('resumed')
+        processor.enableCheckpoints(checkpoint, interval=0)
+        save = processor.checkpoints.save
+        def interrupt(*args):
+            save(*args)
+            if len(processor.checkpoints.finished) or interrupt.calls == checkpoints:
+                raise KeyboardInterrupt()
+            interrupt.calls += 1
+        interrupt.calls = 0
+        processor.checkpoints.save = interrupt
+        with self.assertRaises(KeyboardInterrupt):
+            processor.processPath(self.path, jobs)
+
+        processor = self.processor('resumed')
+        processor.enableCheckpoints(checkpoint, interval=0, resume=True)
+        processor.processPath(self.path, jobs)
+        processor.close()
+        return processor
+
+    def assertResumed(self, jobs, checkpoints):
+        whole = self.processor('whole')
+        whole.processPath(self.path)
+        whole.close()
+        resumed = self.run_interrupted(jobs, checkpoints)
+        self.assertEqual(resumed.results.as_dict(), whole.results.as_dict())
+        self.assertEqual(resumed._counters[1][0,5,10], whole._counters[1][0,5,10])
+        self.assertEqual(self.read('resumed'), self.read('whole'))
+
+    def test_resume(self):
+        self.assertResumed(1, 2)
+
+    def test_resume_jobs(self):
+        self.assertResumed(2, 3)
+
+    def test_other_configuration(self):
+        checkpoint = os.path.join(self.directory, 'checkpoint.gz')
+        processor = self.processor('stats')
+        processor.enableCheckpoints(checkpoint)
+        processor.processPath(self.path)
+        processor.close()
+        processor = Processor(English(), 0, 50, os.path.join(self.directory, 'stats'))
+        with self.assertRaises(ValueError):
+            processor.enableCheckpoints(checkpoint, resume=True)
+
+    def test_results(self):
+        results = Results(11, 0, 10)
+        results.ranges = [Results(6, 0, 5)]
+        results.add([[3, 5], [20], (1,0,0,0,0,0,0,0,0,0,0,2), 1, {'dogs': 2}])
+        restored = Results.from_dict(results.as_dict())
+        self.assertEqual(restored.as_dict(), results.as_dict())
+        self.assertEqual(restored.counter[3,5,20], [1,1,0])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,173 @@
+import os
+import io
+import bz2
+import gzip
+import shutil
+import tarfile
+import tempfile
+import unittest
+
+import corpus
+from corpus import open_corpus, resolve, MappedCorpus
+from parallel import shard_ranges
+
+class CorpusTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.text = u''.join(u'{0}\tSentence number {0} with 5 äpfel.\r\n'.format(i)
+                             for i in range(1, 5000))
+        self.data = self.text.encode('utf8')
+        self.corpus = os.path.join(self.directory, 'news_1M')
+        os.mkdir(self.corpus)
+        self.path = os.path.join(self.corpus, 'news_1M-sentences.txt')
+        with io.open(self.path, 'wb') as f:
+            f.write(self.data)
+        with io.open(self.path, 'r', encoding='utf8') as f:
+            self.lines = f.readlines()
+        self.old_block_size = corpus.block_size
+        corpus.block_size = 1000 # many blocks
+
+    def tearDown(self):
+        corpus.block_size = self.old_block_size
+        shutil.rmtree(self.directory)
+
+    def assertLines(self, path):
+        with open_corpus(path) as f:
+            self.assertEqual(f.readlines(), self.lines)
+
+    def test_plain(self):
+        self.assertLines(self.path)
+
+    def test_gzip(self):
+        path = self.path + '.gz'
+        with gzip.open(path, 'wb') as f:
+            f.write(self.data)
+        self.assertLines(path)
+
+    def test_bzip2(self):
+        path = self.path + '.bz2'
+        with bz2.BZ2File(path, 'wb') as f:
+            f.write(self.data)
+        self.assertLines(path)
+
+    def assertLineReader(self, path):
+        with corpus.LineReader(path) as reader:
+            lines, offsets = [], []
+            for line in reader:
+                lines.append(line)
+                offsets.append(reader.offset)
+        self.assertEqual(lines, self.lines)
+        self.assertEqual(offsets[-1], len(self.data))
+        # continue reading after the 1000th line
+        with corpus.LineReader(path, offsets[999]) as reader:
+            self.assertEqual(list(reader), self.lines[1000:])
+
+    def test_line_reader(self):
+        self.assertLineReader(self.path)
+
+    def test_line_reader_gzip(self):
+        path = self.path + '.gz'
+        with gzip.open(path, 'wb') as f:
+            f.write(self.data)
+        self.assertLineReader(path)
+
+    def test_line_reader_newlines(self):
+        with io.open(self.path, 'wb') as f:
+            f.write(b'1\tone\r2\ttwo\r\n\n3\tthree\r')
+        with corpus.LineReader(self.path) as reader:
+            lines = [(line, reader.offset) for line in reader]
+        self.assertEqual(lines, [(u'1\tone\n', None), (u'2\ttwo\n', 13), (u'\n', 14),
+                                 (u'3\tthree\n', 22)])
+
+    @unittest.skipIf(corpus.lzma is None, 'no lzma support')
+    def test_xz(self):
+        path = self.path + '.xz'
+        with corpus.lzma.open(path, 'wb') as f:
+            f.write(self.data)
+        self.assertLines(path)
+
+    def test_archive(self):
+        path = self.corpus + '.tar.gz'
+        with io.open(os.path.join(self.corpus, 'news_1M-words.txt'), 'w') as f:
+            f.write(u'1\tword\n')
+        archive = tarfile.open(path, 'w:gz')
+        archive.add(os.path.join(self.corpus, 'news_1M-words.txt'), 'news_1M/news_1M-words.txt')
+        archive.add(self.path, 'news_1M/news_1M-sentences.txt')
+        archive.close()
+        self.assertLines(path)
+
+    def test_archive_without_sentences(self):
+        path = os.path.join(self.directory, 'empty.tar.gz')
+        tarfile.open(path, 'w:gz').close()
+        self.assertRaises(IOError, open_corpus, path)
+
+    def test_early_close(self):
+        path = self.path + '.gz'
+        with gzip.open(path, 'wb') as f:
+            f.write(self.data)
+        with open_corpus(path) as f:
+            self.assertEqual(f.readline(), self.lines[0])
+
+    def test_resolve(self):
+        self.assertEqual(resolve(self.path), self.path)
+        self.assertEqual(resolve(self.corpus), self.path)
+        self.assertRaises(IOError, resolve, os.path.join(self.directory, 'missing'))
+        os.environ['WORTSCHATZ_ROOT'] = self.directory
+        try:
+            self.assertEqual(resolve('news_1M'), self.path)
+            shutil.rmtree(self.corpus)
+            open(self.corpus + '.tar.gz', 'w').close()
+            self.assertEqual(resolve('news_1M'), self.corpus + '.tar.gz')
+        finally:
+            del os.environ['WORTSCHATZ_ROOT']
+
+class MappedCorpusTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'corpus.txt')
+        self.old_block_size = corpus.block_size
+
+    def tearDown(self):
+        corpus.block_size = self.old_block_size
+        shutil.rmtree(self.directory)
+
+    def expected(self, data):
+        with io.open(self.path, 'r', encoding='utf8', newline='\n') as f:
+            lines = [line.split('\t')[1] if '\t' in line else line for line in f]
+        return [line.rstrip('\n') for line in lines]
+
+    def assertSentences(self, data):
+        with io.open(self.path, 'wb') as f:
+            f.write(data.encode('utf8'))
+        with MappedCorpus(self.path) as mapping:
+            self.assertEqual(list(mapping.sentences()), self.expected(data))
+
+    def test_sentences(self):
+        self.assertSentences(u'1\tFünf Äpfel.\n2\tZwei\tIgnored\nno id\r\n\n3\t\n')
+
+    def test_unterminated(self):
+        self.assertSentences(u'1\tone\n2\ttwo')
+        self.assertSentences(u'only line')
+
+    def test_empty(self):
+        self.assertSentences(u'')
+
+    def test_blocks(self):
+        corpus.block_size = 7
+        self.assertSentences(u''.join(u'{0}\tSentence {0}\n'.format(i) for i in range(100)))
+        self.assertSentences(u'a very long line without any tabulator\nshort\nlast')
+
+    def test_shards(self):
+        data = u''.join(u'{0}\tSentence {0} with ß.\n'.format(i) for i in range(100))
+        with io.open(self.path, 'wb') as f:
+            f.write(data.encode('utf8'))
+        sentences = []
+        with MappedCorpus(self.path) as mapping:
+            for start, end in shard_ranges(self.path, 7):
+                sentences.extend(mapping.sentences(start, end))
+        self.assertEqual(sentences, self.expected(data))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -66,3 +66,74 @@ class CounterTest(unittest.TestCase):
         self.assertEqual(self.counter[1],1)
         self.counter.reset()
         self.assertEqual(self.counter[1],0)
+
+    def test_min_value(self):
+        counter = Counter(5,10)
+        counter([4,5,10,11])
+        self.assertEqual(counter[4],0)
+        self.assertEqual(counter[5],1)
+        self.assertEqual(counter[10],1)
+        self.assertEqual(counter.sum(),2)
+
+    def test_update(self):
+        counter = Counter(-10,100)
+        values = [i % 120 - 10 for i in range(1000)]
+        counter.update(iter(values))
+        self.assertEqual(counter[-10],9)
+        self.assertEqual(counter[100],8)
+        self.assertEqual(counter[105],0)
+        self.assertEqual(counter.sum(),sum(1 for v in values if v <= 100))
+
+    def test_merge(self):
+        counter = Counter(0,10)
+        counter([0,5,10])
+        other = Counter(5,15)
+        other([5,10,15])
+        counter.merge(other)
+        self.assertEqual(counter[0,5,10,15],[1,2,2,0])
+        self.assertEqual(other[5,10,15],[1,1,1])
+
+    def test_to_array(self):
+        counter = Counter(1,4)
+        counter(1,2,2,4)
+        self.assertEqual(list(counter.to_array()),[1,2,0,1])
+
+    def test_sparse_tail(self):
+        counter = Counter(0,10**9,head=100)
+        counter([5,5,1000,10**9,10**9+1])
+        counter(123456789)
+        self.assertIsNotNone(counter.tail)
+        self.assertEqual(counter[5,1000,123456789,10**9,10**9+1],[2,1,1,1,0])
+        self.assertEqual(counter[99:102],[0,0,0])
+        self.assertEqual(counter.sum(),5)
+        self.assertEqual(counter.sum(6),3)
+        other = Counter.from_dict(counter.as_dict())
+        counter.merge(other)
+        self.assertEqual(counter[5,1000,10**9],[4,2,2])
+
+    def test_wide_range(self):
+        counter = Counter(0,10**9)
+        self.assertEqual(counter.head,Counter.dense_limit-1)
+        counter([1,10**8])
+        self.assertEqual(counter[1,10**8],[1,1])
+
+    def test_update_counts(self):
+        for counter in (Counter(1,10), Counter(0,10**9,head=100),
+                        Counter(0,10**9,head=100,sketch=256)):
+            counter.update([1,5,1000,-3],[2,3,4,5])
+            self.assertEqual(counter[1,5],[2,3])
+            self.assertEqual(counter.sum(),5 if counter.tail is None else 9)
+
+    def test_sketch_tail(self):
+        values = [i*i for i in range(2000)]
+        counter = Counter(0,10**9,head=1000,sketch=256)
+        counter.update(values)
+        exact = Counter(0,10**9,head=1000)
+        exact.update(values)
+        self.assertEqual(counter.sum(),exact.sum())
+        self.assertEqual(counter[0:1001],exact[0:1001])
+        error = counter.tail.error()
+        for value in values:
+            self.assertTrue(exact[value] <= counter[value] <= exact[value] + error)
+        with self.assertRaises(ValueError):
+            counter.merge(exact)
@@ -0,0 +1,119 @@
+import os
+import io
+import shutil
+import random
+import tempfile
+import unittest
+
+from dedup import Dedup, HashSet, BloomFilter, line_hashes
+from languages import English
+from parallel import shard_ranges, open_shard
+from processor import Processor
+
+def first_occurrences(lines):
+    seen, first = set(), []
+    for line in lines:
+        sentence = line.rstrip('\n').split('\t')[1]
+        if sentence not in seen:
+            seen.add(sentence)
+            first.append(line)
+    return first
+
+class HashSetTest(unittest.TestCase):
+
+    def test_add_contains(self):
+        hashes = HashSet()
+        for start in range(0, 1000, 70):
+            hashes.add(range(start, min(start + 70, 1000), 2))
+        self.assertEqual(len(hashes), 500)
+        self.assertEqual(list(hashes.contains([0, 1, 998, 999, 1000])),
+                         [True, False, True, False, False])
+        self.assertEqual(list(hashes.values()), list(range(0, 1000, 2)))
+
+    def test_merge_intersection(self):
+        first, second = HashSet([1, 2, 3]), HashSet([3, 4])
+        self.assertEqual(list(first.intersection(second.values()).values()), [3])
+        first.merge(second)
+        self.assertEqual(list(first.values()), [1, 2, 3, 4])
+
+class BloomFilterTest(unittest.TestCase):
+
+    def test_false_positives(self):
+        bloom = BloomFilter(1000, 0.01)
+        bloom.add(line_hashes([str(i) for i in range(1000)]))
+        self.assertTrue(all(bloom.contains(line_hashes([str(i) for i in range(1000)]))))
+        positives = sum(bloom.contains(line_hashes([str(-i) for i in range(1, 10001)])))
+        self.assertLess(positives, 300)
+        self.assertAlmostEqual(len(bloom), 1000, delta=50)
+
+    def test_merge(self):
+        first, second = BloomFilter(100, 0.01), BloomFilter(100, 0.01)
+        first.add(line_hashes(['a', 'b']))
+        second.add(line_hashes(['c']))
+        first.merge(second)
+        self.assertTrue(all(first.contains(line_hashes(['a', 'b', 'c']))))
+        self.assertRaises(ValueError, first.merge, BloomFilter(1000, 0.01))
+
+class DedupTest(unittest.TestCase):
+
+    def setUp(self):
+        generator = random.Random(7)
+        self.lines = [u'{0}\tSentence {1} with 5 äpfel.\n'.format(i, generator.randrange(300))
+                      for i in range(2000)]
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'corpus.txt')
+        with io.open(self.path, 'w', encoding='utf8') as f:
+            f.write(u''.join(self.lines))
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_filter(self):
+        for capacity in (None, 1000):
+            dedup = Dedup(capacity)
+            kept = []
+            for start in range(0, len(self.lines), 300):
+                kept.extend(dedup.filter(self.lines[start:start + 300]))
+            self.assertEqual(kept, first_occurrences(self.lines))
+
+    def test_without_ids(self):
+        dedup = Dedup()
+        self.assertEqual(dedup.filter(['a b\n', 'a b', 'b a\n'], split_ids=False),
+                         ['a b\n', 'b a\n'])
+
+    def test_shards(self):
+        for capacity in (None, 1000):
+            dedup = Dedup(capacity)
+            dedup.filter(self.lines[:100]) # seen in an earlier file
+            ranges = shard_ranges(self.path, 5)
+            summaries = []
+            for start, end in ranges:
+                with open_shard(self.path, start, end) as shard:
+                    summaries.append(dedup.summary(shard))
+            kept = []
+            for (start, end), seen in zip(ranges, dedup.shard_states(summaries)):
+                worker = Dedup(capacity)
+                worker.seen = seen
+                with open_shard(self.path, start, end) as shard:
+                    kept.extend(worker.filter(list(shard)))
+            earlier = set(line.split('\t')[1] for line in self.lines[:100])
+            self.assertEqual(kept, [line for line in first_occurrences(self.lines)
+                                    if line.split('\t')[1] not in earlier])
+            self.assertEqual(dedup.filter(self.lines), [])
+
+    def test_exclusive(self):
+        combinations = [
+            lambda processor: processor.enableCache(os.path.join(self.directory, 'cache')),
+            lambda processor: processor.enableCheckpoints(os.path.join(self.directory, 'checkpoint')),
+            lambda processor: processor.enableSampling(0.5),
+            lambda processor: setattr(processor, '_from_wordlist_flag', True)
+        ]
+        for enable in combinations:
+            processor = Processor(English(), write_matches=False)
+            processor.verbosity = 0
+            processor.enableDedup()
+            enable(processor)
+            self.assertRaises(ValueError, processor.processPath, self.path)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -52,6 +52,46 @@ class EnglishTest(unittest.TestCase):
         matches = self.en.match_numbers(sentence)
         self.assertEqual(matches, [2])
     
+    def test_numeral_candidate(self):
+        self.en.precompile_regex(1, 100)
+        self.assertTrue(self.en.has_numeral_candidate("You only want $2?"))
+        self.assertTrue(self.en.has_numeral_candidate("Twenty-two people came."))
+        self.assertTrue(self.en.has_numeral_candidate("a one-off event"))
+        self.assertFalse(self.en.has_numeral_candidate("No numerals in this sentence."))
+        self.assertFalse(self.en.has_numeral_candidate("someone is lonely"))
+
+    def test_numberword_values(self):
+        self.en.precompile_regex(1, 200)
+        self.en.unit_index.update([('people', 'organism')])
+        values = [match.value for match in
+                  self.en.iter_matches("Twenty-One people, one hundred and five people and FIVE people.")]
+        self.assertEqual(values, [21, 105, 5])
+
+    def test_long_s(self):
+        self.en.precompile_regex(1, 100)
+        self.en.unit_index.update([('people', 'organism')])
+        values = [match.value for match in
+                  self.en.iter_matches("about \u017fix people and twenty-\u017feven people")]
+        self.assertEqual(values, [6, 27])
+
+    def test_units(self):
+        from results import Results
+        self.en.precompile_regex(1, 200)
+        self.en.unit_index.update([('people', 'organism'), ('cars', None)])
+        lines = ["Twenty-One people and 105 cars came.", "About 20 people, 3 cars and five people."]
+        expression = Results(size=201, max=200)
+        match = Results(size=201, max=200)
+        block = Results(size=201, max=200)
+        for lineno, line in enumerate(lines):
+            expression.add(self.en.match_expression(line))
+            for m in self.en.iter_matches(line, lineno):
+                match.add_match(m)
+        block.add_matches([m for lineno, line in enumerate(lines)
+                           for m in self.en.iter_matches(line, lineno)])
+        self.assertEqual(expression.unit_info, {'people': 3})
+        self.assertEqual(match.unit_info, expression.unit_info)
+        self.assertEqual(block.unit_info, expression.unit_info)
+
     def test_wordnet_dog_car(self):
         self.assertFalse(self.en.is_in_category('dog', 'car'))
 
@@ -0,0 +1,53 @@
+import os
+import sys
+import subprocess
+import threading
+import unittest
+
+from lazy import LazyModule, LazyAttribute, optional_import
+
+NUMERALS = os.path.join(os.path.dirname(os.path.dirname(os.path.realpath(__file__))), 'numerals')
+
+'''Modules that must not be imported before they are needed.'''
+DEFERRED = ['nltk', 'num2words', 'digify', 'matplotlib']
+
+
+class LazyTest(unittest.TestCase):
+
+    def test_module(self):
+        module = LazyModule('colorsys')
+        self.assertEqual(module.rgb_to_hsv(0, 0, 0), (0, 0, 0.0))
+        self.assertIs(module._module, sys.modules['colorsys'])
+
+    def test_attribute(self):
+        calls = []
+        def load():
+            calls.append(None)
+            return 42
+        class Example(object):
+            value = LazyAttribute(load)
+        self.assertEqual(calls, [])
+        threads = [threading.Thread(target=lambda: Example().value) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(Example.value, 42)
+        self.assertEqual(len(calls), 1)
+
+    def test_optional_import(self):
+        self.assertIsNone(optional_import('no_such_module_for_numerals'))
+
+
+class ImportTest(unittest.TestCase):
+
+    def test_deferred_imports(self):
+        script = ('import sys\n'
+                  'import languages, processor, count_numbers\n'
+                  'print(" ".join(m for m in {0!r} if m in sys.modules))\n').format(DEFERRED)
+        output = subprocess.check_output([sys.executable, '-c', script], cwd=NUMERALS)
+        self.assertEqual(output.decode().strip(), '')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,90 @@
+import random
+import re
+import unittest
+
+from languages import English
+from matchers import RegexMatcher, TokenMatcher, _unicode_variants
+
+SENTENCES = [
+    "About 20 people came, five people left.",
+    "Twenty-One people, one hundred and five people and FIVE people.",
+    "handsome 5 people and around about 5 people",
+    "more than 100 people and less than twenty-one cars",
+    "roughly around 50 dogs, roughly 50 dogs, exactly 3.5 dogs",
+    "some hundreds of people, 3 hundred people, 3 thousand people",
+    "1,0000 people, 1,000 people, 12:30 pm, 2.5 km",
+    "a one-off event, a 20-year-old woman, 5-",
+    "twenty-ones, twentyone people, eighty-eight? ninety-nine!",
+    "ABOUT  20  people, about 20  people, about-20 people",
+    "ſome 20 people, İ saw 20 people, abıut 5 dogs",
+    "at least 7 people (at most nine people)",
+    "nearly 0 people, zero people, one thousand people",
+    "to be precise 42 people, to be precise forty-two people",
+]
+
+WORDS = ['the', 'people', 'about', 'some', 'around', 'roughly', 'more', 'than',
+         'less', 'at', 'least', 'exactly', 'one', 'twenty', 'twenty-one', 'five',
+         'hundred', 'thousand', 'hundreds', 'cars', 'km', '-', ',', '.', ':', '?',
+         'FIVE', 'About', 'handsome']
+
+
+def sentences(count, seed=0):
+    '''Random sentences of words, numbers and separators.'''
+    rand = random.Random(seed)
+    result = []
+    for _ in range(count):
+        tokens = []
+        for _ in range(rand.randint(1, 12)):
+            if rand.random() < 0.3:
+                tokens.append(str(rand.choice([0, 1, 5, 20, 42, 100, 1000, 2018])))
+            else:
+                tokens.append(rand.choice(WORDS))
+        result.append(''.join(token + rand.choice([' ', ' ', ' ', '', '  ', '-'])
+                              for token in tokens))
+    return result
+
+
+class MatcherTest(unittest.TestCase):
+
+    def check(self, language, lines):
+        regex, tokens = RegexMatcher(language), TokenMatcher(language)
+        for line in lines:
+            self.assertEqual(list(tokens.finditer(line)), list(regex.finditer(line)), line)
+
+    def test_sentences(self):
+        for min, max in ((1, 100), (0, 1000)):
+            en = English()
+            en.precompile_regex(min, max)
+            self.check(en, SENTENCES)
+
+    def test_random(self):
+        for min, max in ((1, 100), (0, 1000)):
+            en = English()
+            en.precompile_regex(min, max)
+            self.check(en, sentences(2000))
+
+    def test_flat_alternation(self):
+        en = English()
+        en._use_trie_flag = False
+        en.precompile_regex(1, 100)
+        self.check(en, SENTENCES + sentences(500, seed=1))
+
+    def test_unicode_variants(self):
+        letters = set('abcdefghijklmnopqrstuvwxyz-\xe4\xdf')
+        pattern = re.compile('[' + re.escape(''.join(sorted(letters))) + ']', re.IGNORECASE)
+        expected = set(c for c in map(chr, range(128, 0x110000))
+                       if pattern.match(c) and len(c.lower()) == 1 and c.lower() not in letters)
+        self.assertEqual(_unicode_variants(letters), expected)
+
+    def test_set_matcher(self):
+        en = English()
+        en.precompile_regex(1, 100)
+        en.unit_index.update([('people', 'organism')])
+        expected = list(en.iter_matches(SENTENCES[1]))
+        en.set_matcher('tokens')
+        self.assertIsInstance(en._matcher, TokenMatcher)
+        self.assertEqual(list(en.iter_matches(SENTENCES[1])), expected)
+        self.assertRaises(ValueError, en.set_matcher, 'grep')
+
+if __name__ == '__main__':
+    unittest.main()
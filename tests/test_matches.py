@@ -0,0 +1,65 @@
+import unittest
+
+from matches import Match, is_counted, triple_index, match_file
+from results import Results
+
+def match(line, approximator, value, kind='num', category='group', discrete=True):
+    return Match(line, 'text', approximator, value, kind,
+                 None if value is None else value % 5 == 0, 'unit',
+                 category, discrete if category else None, str(value))
+
+class MatchTest(unittest.TestCase):
+
+    def test_counted(self):
+        self.assertTrue(is_counted(match(0, 'null', 3)))
+        self.assertFalse(is_counted(match(0, 'null', None)))
+        self.assertFalse(is_counted(match(0, 'null', 3, category=None)))
+
+    def test_triple_index(self):
+        self.assertEqual(triple_index(match(0, 'prec', 20)), 0)
+        self.assertEqual(triple_index(match(0, 'prec', 20, discrete=False)), 1)
+        self.assertEqual(triple_index(match(0, 'impr', 21)), 6)
+        self.assertEqual(triple_index(match(0, 'null', 21, discrete=False)), 11)
+        self.assertIsNone(triple_index(match(0, 'asym', 20)))
+
+    def test_match_file(self):
+        self.assertEqual(match_file(match(0, 'impr', 20)), 'impr_roundnum_dis')
+        self.assertEqual(match_file(match(0, 'null', 3, 'word', discrete=False)),
+                         'null_nonrword_cont')
+
+    def test_add_match(self):
+        matches = [match(0, 'prec', 3), match(0, 'null', 5), match(1, 'null', 20, 'word'),
+                   match(1, 'asym', 7), match(2, 'impr', 500, discrete=False),
+                   match(2, 'null', 1, 'word', category=None), match(3, 'null', None)]
+        results = Results()
+        for m in matches:
+            results.add_match(m)
+        expected = Results()
+        expected.add([[3, 5], [], (0,0,1,0,0,0,0,0,1,0,0,0), 0, {}])
+        expected.add([[7], [20], (0,0,0,0,0,0,0,0,1,0,0,0), 1, {}])
+        expected.add([[500], [], (0,0,0,0,0,1,0,0,0,0,0,0), 0, {}])
+        self.assertEqual(results.matches, 3)
+        self.assertEqual(results.numbers, expected.numbers)
+        self.assertEqual(results.words, expected.words)
+        self.assertEqual(results.nums, expected.nums)
+        self.assertEqual(results.numwords, expected.numwords)
+        self.assertEqual(results.tripleMatches, expected.tripleMatches)
+        self.assertEqual(results.asym, expected.asym)
+        self.assertEqual(results.counter[1,3,5,7,20], expected.counter[1,3,5,7,20])
+
+    def test_add_matches(self):
+        matches = [match(0, 'prec', 3), match(0, 'null', 5), match(1, 'null', 20, 'word'),
+                   match(1, 'asym', 7), match(2, 'impr', 500, discrete=False),
+                   match(2, 'null', 1, 'word', category=None), match(3, 'null', None),
+                   match(4, 'null', 5), match(4, 'prec', 150, discrete=False)]
+        for unit_capacity in (None, 2):
+            expected = Results(unit_capacity=unit_capacity)
+            for m in matches:
+                expected.add_match(m)
+            results = Results(unit_capacity=unit_capacity)
+            results.add_matches(matches[:4])
+            results.add_matches(matches[4:])
+            self.assertEqual(results.as_dict(), expected.as_dict())
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,73 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from matches import Match
+from output import MatchWriter
+
+class MatchWriterTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.stats = os.path.join(self.directory, 'stats')
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def read(self, name):
+        with open(os.path.join(self.stats, name + '.txt')) as f:
+            return f.read()
+
+    def test_write(self):
+        with MatchWriter(self.stats) as writer:
+            writer.write('all_matches', 'about 20 people')
+            writer.write('all_matches', '3 dogs')
+            writer.write('impr_roundnum_dis', 'about 20 people')
+        self.assertEqual(self.read('all_matches'), 'about 20 people\n3 dogs\n')
+        self.assertEqual(self.read('impr_roundnum_dis'), 'about 20 people\n')
+
+    def test_append(self):
+        for text in ('one', 'two'):
+            writer = MatchWriter(self.stats)
+            writer.write('excluded', text)
+            writer.close()
+        self.assertEqual(self.read('excluded'), 'one\ntwo\n')
+
+    def test_flush(self):
+        writer = MatchWriter(self.stats)
+        writer.write('no_int', '1.5 litres')
+        writer.flush()
+        self.assertEqual(self.read('no_int'), '1.5 litres\n')
+        writer.close()
+
+    def test_disabled(self):
+        writer = MatchWriter(self.stats, enabled=False)
+        self.assertFalse(writer)
+        writer.write('all_matches', '3 dogs')
+        writer.close()
+        self.assertFalse(os.path.exists(self.stats))
+
+    def test_write_match(self):
+        with MatchWriter(self.stats) as writer:
+            writer.write_match(Match(0, 'About 20 People', 'impr', 20, 'num',
+                                     True, 'People', 'group', True, '20'))
+            writer.write_match(Match(1, '3 dogs', 'null', None, 'num',
+                                     None, 'dogs', None, None, '3'))
+            writer.write_match(Match(2, 'over 7 days', 'asym', 7, 'num',
+                                     False, 'days', 'time_unit', False, '7'))
+        self.assertEqual(self.read('all_matches'), 'About 20 People\n3 dogs\nover 7 days\n')
+        self.assertEqual(self.read('impr_roundnum_dis'), 'about 20 people\n')
+        self.assertEqual(self.read('excluded'), '3 dogs\n')
+        self.assertEqual(sorted(os.listdir(self.stats)),
+                         ['all_matches.txt', 'excluded.txt', 'impr_roundnum_dis.txt'])
+
+    def test_write_matches(self):
+        matches = [Match(0, '20 people', 'null', 20, 'num', True, 'people', 'group', True, '20'),
+                   Match(1, u'20 \xe4pfel', 'null', 20, 'num', True, u'\xe4pfel', 'group', True, '20')]
+        with MatchWriter(self.stats, encoding='ascii') as writer:
+            self.assertEqual(writer.write_matches(matches), matches[:1])
+        self.assertEqual(self.read('all_matches'), '20 people\n')
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,80 @@
+import os
+import io
+import shutil
+import tempfile
+import unittest
+
+from parallel import shard_ranges, open_shard
+from results import Results
+
+class ShardTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'corpus.txt')
+        self.text = u''.join(u'{0}\tSentence number {0} with 5 äpfel.\n'.format(i)
+                             for i in range(1, 200))
+        with io.open(self.path, 'w', encoding='utf8') as f:
+            f.write(self.text)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_ranges(self):
+        ranges = shard_ranges(self.path, 7)
+        self.assertEqual(len(ranges), 7)
+        self.assertEqual(ranges[0][0], 0)
+        self.assertEqual(ranges[-1][1], os.path.getsize(self.path))
+        for (_, end), (start, _) in zip(ranges, ranges[1:]):
+            self.assertEqual(end, start)
+
+    def test_line_boundaries(self):
+        lines = []
+        for start, end in shard_ranges(self.path, 7):
+            with open_shard(self.path, start, end) as shard:
+                lines.extend(shard)
+        with io.open(self.path, 'r', encoding='utf8') as f:
+            self.assertEqual(lines, f.readlines())
+
+    def test_small_file(self):
+        with io.open(self.path, 'w', encoding='utf8') as f:
+            f.write(u'1\tone line\n')
+        ranges = shard_ranges(self.path, 4)
+        self.assertEqual(ranges, [(0, os.path.getsize(self.path))])
+
+class ResultsTest(unittest.TestCase):
+
+    def test_merge(self):
+        lines = [
+            [[3, 5], [], (1,0,0,0,0,0,0,0,0,0,0,0), 0, {}],
+            [[], [20], (0,0,0,0,0,0,0,0,1,0,0,0), 1, {}],
+            [[500], [1], (0,0,0,0,0,0,0,0,0,0,0,2), 0, {}]
+        ]
+        whole = Results()
+        for info in lines:
+            whole.add(info)
+        first, second = Results(), Results()
+        first.add(lines[0])
+        second.add(lines[1])
+        second.add(lines[2])
+        first.merge(second)
+        self.assertEqual(first.nums, whole.nums)
+        self.assertEqual(first.numwords, whole.numwords)
+        self.assertEqual(first.tripleMatches, whole.tripleMatches)
+        self.assertEqual(first.asym, whole.asym)
+        self.assertEqual(first.matches, 2)
+        self.assertEqual(first.counter[0,1,3,5,20,500], [0,1,1,1,1,0])
+
+    def test_merge_ranges(self):
+        first, second = Results(), Results()
+        first.ranges, second.ranges = [Results()], [Results()]
+        first.ranges[0].add([[3], [], (0,)*12, 0, {}])
+        second.ranges[0].add([[3, 7], [2], (0,)*12, 1, {}])
+        first.merge(second)
+        self.assertEqual(first.ranges[0].nums[3], 2)
+        self.assertEqual(first.ranges[0].nums[7], 1)
+        self.assertEqual(first.ranges[0].numwords[2], 1)
+        self.assertEqual(first.ranges[0].asym, 1)
+
+if __name__ == '__main__':
+    unittest.main()
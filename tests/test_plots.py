@@ -0,0 +1,56 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+import plots
+from counter import Counter
+from results import Results
+from lazy import optional_import
+
+class PlotsTest(unittest.TestCase):
+
+    def test_bin_edges(self):
+        self.assertEqual(plots.bin_edges(1,10),list(range(1,12)))
+        edges = plots.bin_edges(1,10**6)
+        self.assertEqual(len(edges),plots.max_bars+1)
+        self.assertEqual((edges[0],edges[-1]),(1,10**6+1))
+        self.assertEqual(plots.bin_edges(0,99,bins=10),list(range(0,101,10)))
+
+    def test_log_bin_edges(self):
+        edges = plots.bin_edges(0,10**9,log=True)
+        self.assertEqual((edges[0],edges[1],edges[-1]),(0,1,10**9+1))
+        self.assertLessEqual(len(edges),plots.log_bins+2)
+        self.assertEqual(edges,sorted(set(edges)))
+
+    def test_histogram(self):
+        counts = [0,1,2,3,4,5,6,7,8,9,10]
+        edges, sums = plots.histogram(counts,1,10,bins=3)
+        self.assertEqual(len(sums),3)
+        self.assertEqual(sum(sums),55)
+
+    def test_histogram_sketch(self):
+        counter = Counter(0,10**9,head=1000,sketch=256)
+        counter.update([i*i for i in range(2000)])
+        edges, sums = plots.histogram(counter,0,10**9,bins=10)
+        self.assertEqual(edges[-2:],[1001,10**9+1])
+        self.assertEqual(sum(sums),2000)
+        self.assertEqual(sums[-1],2000-32)
+
+    @unittest.skipIf(optional_import('matplotlib') is None, 'matplotlib is not installed')
+    def test_export(self):
+        results = Results(10**6 + 1, 0, 10**6)
+        results.add([[3, 5000, 10**5], [20], (1,0,0,0,0,0,0,0,0,0,0,2), 0, {}])
+        directory = tempfile.mkdtemp()
+        try:
+            paths = plots.export_results(results, {'n_range': [0, 10**6]}, directory,
+                                         'r-', 'svg', log=True)
+            self.assertEqual([os.path.basename(path) for path in paths],
+                             ['r-0-1000000-{}.svg'.format(name) for name, _ in plots.charts])
+            for path in paths:
+                self.assertGreater(os.path.getsize(path), 0)
+        finally:
+            shutil.rmtree(directory)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,90 @@
+import os
+import sys
+import re
+import json
+import shutil
+import subprocess
+import tempfile
+import unittest
+
+from profiling import Profile, TimedPattern
+
+class Adder:
+    def add(self, a, b):
+        return a + b
+
+class ProfileTest(unittest.TestCase):
+
+    def test_instrument(self):
+        profile = Profile()
+        adder = Adder()
+        profile.instrument(adder, 'add', 'adding')
+        self.assertEqual(adder.add(1, 2), 3)
+        self.assertEqual(adder.add(3, b=4), 7)
+        self.assertEqual(profile.stages['adding'][1], 2)
+        self.assertEqual(Adder().add(1, 1), 2) # other objects are not affected
+
+    def test_pattern(self):
+        profile = Profile()
+        pattern = TimedPattern(re.compile(r'\d+'), profile, 'regex')
+        self.assertEqual([m.group(0) for m in pattern.finditer('1 and 22')], ['1', '22'])
+        self.assertIsNotNone(pattern.search('a 3'))
+        self.assertEqual(pattern.pattern, r'\d+')
+        self.assertEqual(profile.stages['regex'][1], 2)
+        self.assertEqual(profile.matches, 2)
+
+    def test_detach(self):
+        profile = Profile()
+        adder = Adder()
+        profile.instrument(adder, 'add', 'adding')
+        adder.add(1, 2)
+        detached = profile.detach()
+        adder.add(1, 2)
+        self.assertEqual(detached.stages['adding'][1], 1)
+        self.assertEqual(profile.stages['adding'][1], 1)
+        detached.merge(profile)
+        self.assertEqual(detached.stages['adding'][1], 2)
+
+    def test_report(self):
+        profile = Profile()
+        adder = Adder()
+        profile.instrument(adder, 'add', 'convert')
+        profile.start()
+        adder.add(1, 2)
+        profile.stop(10)
+        report = profile.report()
+        self.assertEqual(report.lines, 10)
+        self.assertEqual([stage['name'] for stage in report.stages], ['convert'])
+        self.assertEqual(report.stages[0]['calls'], 1)
+        self.assertIn('convert', report.format())
+        json.dumps(report.as_dict())
+
+    def test_cprofile(self):
+        profile = Profile(cprofile=True)
+        self.assertIsNone(profile.report().cprofile)
+        profile.start()
+        Adder().add(1, 2)
+        profile.stop(1)
+        self.assertIn('add', profile.report().cprofile)
+
+class CommandLineTest(unittest.TestCase):
+
+    def test_profile_before_file(self):
+        directory = tempfile.mkdtemp()
+        try:
+            path = os.path.join(directory, 'corpus.txt')
+            with open(path, 'w') as f:
+                f.write('No numerals in this sentence.\nNor in this one.\n')
+            script = os.path.join(os.path.dirname(os.path.dirname(os.path.realpath(__file__))),
+                                  'numerals', 'count_numbers.py')
+            process = subprocess.Popen([sys.executable, script, '--no-match-files',
+                                        '--profile', path], cwd=directory,
+                                       stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+            output, errors = process.communicate()
+            self.assertEqual(process.returncode, 0, errors.decode())
+            self.assertIn('prefilter', errors.decode())
+        finally:
+            shutil.rmtree(directory)
+
+if __name__ == '__main__':
+    unittest.main()
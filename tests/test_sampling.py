@@ -0,0 +1,77 @@
+import os
+import io
+import shutil
+import tempfile
+import unittest
+
+import sampling
+from sampling import Sample
+from matches import Match
+
+class SampleTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'corpus.txt')
+        self.lines = [u'{0}\tSentence number {0} with 5 äpfel.\n'.format(i) for i in range(20000)]
+        with io.open(self.path, 'w', encoding='utf8') as f:
+            f.writelines(self.lines)
+        self.old_block_size = sampling.block_size
+        sampling.block_size = 1000
+
+    def tearDown(self):
+        sampling.block_size = self.old_block_size
+        shutil.rmtree(self.directory)
+
+    def test_uniform(self):
+        sample = Sample(0.1, seed=3)
+        lines = list(sample.select(self.lines))
+        self.assertTrue(1700 < len(lines) < 2300)
+        self.assertEqual(lines, sorted(lines, key=self.lines.index))
+        self.assertEqual((sample.lines, sample.total_lines), (len(lines), 20000))
+        self.assertEqual(list(Sample(1.0).select(self.lines)), self.lines)
+
+    def test_reservoir(self):
+        sample = Sample(method='reservoir', size=500, seed=3)
+        lines = list(sample.select(self.lines))
+        self.assertEqual(len(set(lines)), 500)
+        indices = [self.lines.index(line) for line in lines]
+        self.assertEqual(indices, sorted(indices))
+        self.assertGreater(indices[-1], 15000) # not only the first lines
+        self.assertEqual(len(list(Sample(method='reservoir', size=10).select(self.lines[:5]))), 5)
+
+    def test_blocks(self):
+        lines = list(Sample(1.0, 'blocks').select(Sample(1.0, 'blocks').blocks(self.path)))
+        self.assertEqual(lines, self.lines)
+        sample = Sample(0.2, 'blocks', seed=3)
+        lines = list(sample.select(sample.blocks(self.path)))
+        self.assertTrue(set(lines) <= set(self.lines))
+        self.assertEqual(len(set(lines)), len(lines))
+        self.assertTrue(15000 < sample.total_lines < 25000)
+
+    def match(self, line, value, approximator='null', kind='num'):
+        return Match(line, '', approximator, value, kind, value % 5 == 0, 'dogs',
+                     'organism', True, str(value))
+
+    def test_estimates(self):
+        sample = Sample(0.5, seed=3)
+        lines = list(sample.select(self.lines))
+        for line in range(len(lines)):
+            sample.add_match(self.match(line, 5 if line % 2 else 7))
+            if line % 3 == 0:
+                sample.add_match(self.match(line, 100, 'asym', 'word'))
+        estimates = sample.estimates(6, 100)
+        n = len(lines)
+        self.assertEqual([values[:2] for values in estimates.nums],
+                         [[5, 2.0 * (n // 2)], [7, 2.0 * (n - n // 2)]])
+        self.assertEqual(estimates.totals['numbers'][0], 2.0 * n)
+        self.assertEqual(estimates.totals['numbers_of_interest'][0], 2.0 * (n - n // 2))
+        self.assertEqual(estimates.asym[0], estimates.totals['words'][0])
+        self.assertEqual(estimates.tripleMatches[8][0], 2.0 * (n // 2)) # null-round-dis
+        self.assertEqual(estimates.tripleMatches[0], [0.0, 0.0, 0.0])
+        for values in [estimates.totals['numbers'], estimates.asym] + estimates.tripleMatches:
+            self.assertTrue(values[1] <= values[0] <= values[2])
+        self.assertIn('null-round-dis', estimates.format(bins=2))
+
+if __name__ == '__main__':
+    unittest.main()
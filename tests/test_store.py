@@ -0,0 +1,90 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+import store
+from results import Results
+
+class StoreTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.metadata = {'language': 'English', 'range': [1, 100], 'ranges': [[0, 10]],
+                         'n_range': [1, 100], 'corpora': ['a.txt']}
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def results(self, lines):
+        results = Results(101, 1, 100)
+        results.ranges = [Results(11, 0, 10)]
+        for info in lines:
+            results.add(info)
+            results.ranges[0].add(info)
+        results.lines = results.ranges[0].lines = 10 * len(lines)
+        return results
+
+    def save(self, name, results, **metadata):
+        path = os.path.join(self.directory, name)
+        store.save(path, results, dict(self.metadata, **metadata))
+        return path
+
+    def test_round_trip(self):
+        results = self.results([[[3, 5, 200], [20], (1,0,0,0,0,0,0,0,0,0,0,2), 1, {u'Äpfel': 2}]])
+        results.duplicates = 4
+        loaded, metadata = store.load(self.save('a.nres', results))
+        self.assertEqual(loaded.as_dict(), results.as_dict())
+        self.assertEqual(metadata, self.metadata)
+
+    def test_unit_capacity(self):
+        results = Results(101, 1, 100, unit_capacity=2)
+        for unit in ['dogs', 'dogs', 'cars', 'dogs', 'people', 'cars', 'years']:
+            results.add_unit(unit)
+        loaded, _ = store.load(self.save('a.nres', results))
+        self.assertEqual(loaded.unit_capacity(), 2)
+        self.assertEqual(loaded.unit_error(), results.unit_error())
+        self.assertEqual(loaded.as_dict(), results.as_dict())
+
+    def test_long_unit(self):
+        results = Results(101, 1, 100)
+        unit = u'ä' * 40000 # longer than 65535 bytes in UTF-8
+        results.add_unit(unit, 3)
+        loaded, _ = store.load(self.save('a.nres', results))
+        self.assertEqual(loaded.unit_info, {unit: 3})
+
+    def test_wide_range(self):
+        results = Results(10**9 + 1, 0, 10**9, head=1000)
+        results.add([[3, 5000, 10**8], [20], (1,0,0,0,0,0,0,0,0,0,0,2), 0, {}])
+        loaded, _ = store.load(self.save('a.nres', results))
+        self.assertEqual(loaded.as_dict(), results.as_dict())
+        self.assertEqual(loaded.nums[3, 5000, 10**8], [1, 1, 1])
+        self.assertEqual(loaded.counter.sum(), 4)
+
+    def test_merge(self):
+        lines = [
+            [[3, 5], [], (1,0,0,0,0,0,0,0,0,0,0,0), 0, {'dogs': 1}],
+            [[], [20], (0,0,0,0,0,0,0,0,1,0,0,0), 1, {'dogs': 2, 'cars': 1}],
+            [[500], [1], (0,0,0,0,0,0,0,0,0,0,0,2), 0, {}]
+        ]
+        paths = [self.save('a.nres', self.results(lines[:1])),
+                 self.save('b.nres', self.results(lines[1:]), corpora=['b.txt'])]
+        merged, metadata = store.merge(paths)
+        self.assertEqual(merged.as_dict(), self.results(lines).as_dict())
+        self.assertEqual(metadata['corpora'], ['a.txt', 'b.txt'])
+
+    def test_incompatible(self):
+        paths = [self.save('a.nres', self.results([])),
+                 self.save('b.nres', self.results([]), ranges=[])]
+        with self.assertRaises(ValueError):
+            store.merge(paths)
+
+    def test_not_a_results_file(self):
+        path = os.path.join(self.directory, 'corpus.txt')
+        with open(path, 'w') as f:
+            f.write('1\tSome sentence.\n')
+        with self.assertRaises(ValueError):
+            store.load(path)
+
+if __name__ == '__main__':
+    unittest.main()
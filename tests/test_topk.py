@@ -0,0 +1,67 @@
+import random
+import unittest
+from collections import Counter
+
+from topk import TopK
+from results import Results
+
+class TopKTest(unittest.TestCase):
+
+    def stream(self, n=20000):
+        generator = random.Random(7)
+        return ['unit{}'.format(int(generator.paretovariate(1.2))) for _ in range(n)]
+
+    def assertBounds(self, summary, stream):
+        exact = Counter(stream)
+        bound = len(stream) / (summary.capacity + 1.0)
+        self.assertLessEqual(summary.error, bound)
+        self.assertLessEqual(len(summary), 2*summary.capacity)
+        for item, count in exact.items():
+            low, high = summary.bounds(item)
+            self.assertTrue(low <= count <= high)
+            if count > bound:
+                self.assertIn(item, summary)
+
+    def test_exact(self):
+        summary = TopK(10)
+        for item in 'abcabca':
+            summary.add(item)
+        self.assertEqual(summary.error, 0)
+        self.assertEqual(summary.most_common(), [('a', 3), ('b', 2), ('c', 2)])
+
+    def test_bounds(self):
+        stream = self.stream()
+        summary = TopK(20)
+        for item in stream:
+            summary.add(item)
+        self.assertGreater(summary.error, 0)
+        self.assertBounds(summary, stream)
+
+    def test_merge(self):
+        stream = self.stream()
+        shards = [TopK(20) for _ in range(4)]
+        for i, item in enumerate(stream):
+            shards[i % 4].add(item)
+        summary = shards[0]
+        for shard in shards[1:]:
+            summary.merge(shard)
+        self.assertBounds(summary, stream)
+
+    def test_results(self):
+        results = Results(101, 1, 100, unit_capacity=5)
+        exact = Results(101, 1, 100)
+        for unit in self.stream(2000):
+            results.add_unit(unit)
+            exact.add_unit(unit)
+        self.assertEqual(results.unit_capacity(), 5)
+        count, unit = exact.unit_list()[0]
+        self.assertEqual(results.unit_list()[0][1], unit)
+        low, high = results.unit_info.bounds(unit)
+        self.assertTrue(low <= count <= high)
+        restored = Results.from_dict(results.as_dict())
+        self.assertEqual(restored.as_dict(), results.as_dict())
+        exact.merge(results)
+        self.assertEqual(exact.unit_capacity(), 5)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,42 @@
+import re
+import unittest
+
+from trie import Trie, prefers_longest
+
+class TrieTest(unittest.TestCase):
+
+    words = ['twenty-two', 'twenty-one', 'twenty', 'twelve', 'two', 'one hundred', 'one']
+
+    def test_pattern(self):
+        self.assertEqual(Trie(['one']).pattern(), 'one')
+        self.assertEqual(Trie(['ab', 'a']).pattern(), 'a(?:b)?')
+        self.assertEqual(Trie(['ab', 'ac']).pattern(), 'a(?:b|c)')
+
+    def test_empty(self):
+        self.assertEqual(Trie().pattern(), '')
+
+    def test_same_matches(self):
+        sentence = "twenty-two or twenty one, twelve and one hundred or two hundred"
+        flat = re.compile(r'\b(' + '|'.join(self.words) + r')\b')
+        trie = re.compile(r'\b(' + Trie(self.words).pattern() + r')\b')
+        self.assertEqual(trie.findall(sentence), flat.findall(sentence))
+        self.assertEqual(trie.findall(sentence),
+                         ['twenty-two', 'twenty', 'one', 'twelve', 'one hundred', 'two'])
+
+    def test_backtracking(self):
+        # the longest word is tried first, then its prefixes
+        regex = re.compile('(' + Trie(['one hundred', 'one']).pattern() + ')(?! thousand)')
+        self.assertEqual(regex.match('one hundred thousand').group(1), 'one')
+
+    def test_special_characters(self):
+        regex = re.compile(Trie(['a.b', 'a+']).pattern())
+        self.assertIsNone(regex.match('axb'))
+        self.assertEqual(regex.match('a+').group(0), 'a+')
+
+    def test_prefers_longest(self):
+        self.assertTrue(prefers_longest(self.words))
+        self.assertTrue(prefers_longest(['roughly around', 'roughly']))
+        self.assertFalse(prefers_longest(['roughly', 'roughly around']))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,128 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from units import UnitIndex
+
+class Synset:
+    '''A minimal stand-in for an NLTK synset.'''
+
+    def __init__(self, *hypernyms):
+        self._hypernyms = list(hypernyms)
+        self._hyponyms = []
+        for h in hypernyms:
+            h._hyponyms.append(self)
+
+    def hypernyms(self):
+        return self._hypernyms
+
+    def hyponyms(self):
+        return self._hyponyms
+
+    def closure(self, rel):
+        result, todo = [], [self]
+        while todo:
+            for s in rel(todo.pop()):
+                if s not in result and s is not self:
+                    result.append(s)
+                    todo.append(s)
+        return result
+
+class WordNet:
+    '''A minimal stand-in for the NLTK WordNet corpus reader.'''
+
+    def __init__(self):
+        entity = Synset()
+        self.organism = Synset(entity)
+        self.group = Synset(entity)
+        animal = Synset(self.organism)
+        self.lemmas = {
+            'organism': [self.organism],
+            'group': [self.group],
+            'dog': [Synset(animal)],
+            'people': [Synset(self.group), Synset(self.organism)],
+            'idea': [Synset(entity)]
+        }
+        self.calls = 0
+
+    def synsets(self, lemma):
+        self.calls += 1
+        return self.lemmas.get(lemma.lower(), [])
+
+    def all_lemma_names(self):
+        return list(self.lemmas)
+
+    def get_version(self):
+        return '3.0'
+
+class UnitIndexTest(unittest.TestCase):
+
+    def setUp(self):
+        self.wn = WordNet()
+        self.index = UnitIndex(['organism', 'group'], self.wn)
+
+    def test_category(self):
+        self.assertEqual(self.index.category('dog'), 'organism')
+        self.assertEqual(self.index.category('Dog'), 'organism')
+
+    def test_first_category(self):
+        self.assertEqual(self.index.category('people'), 'organism')
+        index = UnitIndex(['group', 'organism'], self.wn)
+        self.assertEqual(index.category('people'), 'group')
+
+    def test_excluded(self):
+        self.assertIsNone(self.index.category('idea'))
+        self.assertIsNone(self.index.category('xyz'))
+        # a category is not in itself
+        self.assertIsNone(self.index.category('organism'))
+
+    def test_memo(self):
+        self.index.category('dog')
+        calls = self.wn.calls
+        for i in range(10):
+            self.index.category('dog')
+        self.assertEqual(self.wn.calls, calls)
+
+    def test_max_size(self):
+        self.index.max_size = 2
+        self.index.category('dog')
+        self.index.category('idea')
+        self.index.category('dog')
+        self.index.category('people')
+        self.assertEqual(len(self.index), 2)
+        self.assertIn('dog', self.index)
+        self.assertNotIn('idea', self.index)
+
+    def test_fingerprint(self):
+        loads = []
+        def load():
+            loads.append(1)
+            return self.wn
+        index = UnitIndex(['organism', 'group'], wordnet_loader=load,
+                          wordnet_version=lambda: '3.0')
+        fingerprint = index.fingerprint()
+        self.assertEqual(loads, []) # WordNet is not loaded
+        self.assertEqual(fingerprint, self.index.fingerprint())
+        index.category('dog')
+        self.assertEqual(loads, [1])
+        self.assertEqual(index.fingerprint(), fingerprint)
+        self.assertNotEqual(UnitIndex(['organism', 'group'], wordnet_loader=lambda: None,
+                                      wordnet_version=lambda: None).fingerprint(), fingerprint)
+
+    def test_save_load(self):
+        directory = tempfile.mkdtemp()
+        try:
+            path = os.path.join(directory, 'units.json')
+            self.index.precompute()
+            self.index.save(path)
+            index = UnitIndex(['organism', 'group'])
+            index.load(path)
+            self.assertEqual(index.category('dog'), 'organism')
+            self.assertIsNone(index.category('idea'))
+            self.assertRaises(ValueError, UnitIndex(['group']).load, path)
+        finally:
+            shutil.rmtree(directory)
+
+if __name__ == '__main__':
+    unittest.main()
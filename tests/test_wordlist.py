@@ -0,0 +1,107 @@
+import os
+import io
+import shutil
+import tarfile
+import tempfile
+import sys
+import unittest
+
+import corpus
+import wordlist
+from languages import English, German
+from counter import Counter
+from processor import Processor
+
+class WordlistTest(unittest.TestCase):
+
+    entries = [(u'the', 1000), (u'5', 30), (u'1,000', 7), (u'1000', 3), (u'1.5', 9),
+               (u'12,50', 4), (u'five', 20), (u'Five', 2), (u'twenty-one', 6),
+               (u'one hundred', 5), (u'zero', 8), (u'200', 11)]
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.corpus = os.path.join(self.directory, 'news_1M')
+        os.mkdir(self.corpus)
+        self.words = os.path.join(self.corpus, 'news_1M-words.txt')
+        with io.open(self.words, 'w', encoding='utf8') as f:
+            for index, (word, frequency) in enumerate(self.entries):
+                f.write(u'{0}\t{1}\t{2}\n'.format(index, word, frequency))
+            f.write(u'malformed line\n')
+        self.sentences = os.path.join(self.corpus, 'news_1M-sentences.txt')
+        io.open(self.sentences, 'w').close()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def processor(self, language, **options):
+        processor = Processor(language, write_matches=False, **options)
+        processor.verbosity = 0
+        processor._show_progress_flag = False
+        processor._from_wordlist_flag = True
+        return processor
+
+    def test_read(self):
+        with corpus.open_wordlist(self.words) as lines:
+            self.assertEqual(list(wordlist.read(lines)), self.entries)
+
+    def test_open(self):
+        with corpus.open_wordlist(self.sentences) as lines:
+            self.assertEqual(len(lines.readlines()), len(self.entries) + 1)
+        path = self.corpus + '.tar.gz'
+        archive = tarfile.open(path, 'w:gz')
+        archive.add(self.sentences, 'news_1M/news_1M-sentences.txt')
+        archive.add(self.words, 'news_1M/news_1M-words.txt')
+        archive.close()
+        with corpus.open_wordlist(path) as lines:
+            self.assertEqual(len(lines.readlines()), len(self.entries) + 1)
+        os.remove(self.words)
+        self.assertRaises(IOError, corpus.open_wordlist, self.sentences)
+
+    def test_count(self):
+        processor = self.processor(English(), min=0, max=1000, ranges=[(1, 10)])
+        nums, numwords = processor.processPath(self.sentences)
+        self.assertEqual((nums[5], nums[1000], nums[200], nums[1]), (30, 10, 11, 0))
+        self.assertEqual((numwords[5], numwords[21], numwords[0], numwords[100]), (22, 6, 8, 5))
+        results = processor.results
+        self.assertEqual((results.numbers, results.words), (51, 41))
+        self.assertEqual(results.counter.sum(), 92)
+        self.assertEqual(results.lines, len(self.entries))
+        self.assertEqual(results.tripleMatches, 12*[0])
+        narrow = results.ranges[0]
+        self.assertEqual((narrow.counter.sum(), narrow.words), (52, 22))
+        self.assertEqual(processor.metadata()['source'], 'wordlist')
+
+    def test_wide_range(self):
+        processor = self.processor(English(), min=0, max=10**9, head=100)
+        nums, numwords = processor.processPath(self.sentences)
+        self.assertEqual(nums[5, 200, 1000], [30, 11, 10])
+        self.assertEqual(numwords[5, 21], [22, 6])
+        self.assertEqual(processor.results.counter.sum(), 92)
+
+    def test_dense_limit(self):
+        dense_limit = Counter.dense_limit
+        Counter.dense_limit = 100
+        try:
+            processor = self.processor(English(), min=0, max=10**9)
+            self.assertEqual(max(processor.language._numberword_values.values()), 99)
+            processor.processPath(self.sentences)
+            stdout, sys.stdout = sys.stdout, io.StringIO()
+            try:
+                processor.reportStatistics(processor.results, 0, 10**9, processor.results.counter)
+                report = sys.stdout.getvalue()
+            finally:
+                sys.stdout = stdout
+            self.assertIn('number words were only matched up to 99', report)
+        finally:
+            Counter.dense_limit = dense_limit
+
+    def test_separator(self):
+        language = English()
+        language.thousandsSeparator = German.thousandsSeparator
+        processor = self.processor(language, min=0, max=2000)
+        nums, numwords = processor.processPath(self.sentences)
+        # "1,000" and "1.5" are no numbers then
+        self.assertEqual((nums[1000], nums[1], nums[15]), (3, 0, 0))
+
+if __name__ == '__main__':
+    unittest.main()